@@ -1,24 +1,78 @@
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+from .ad_cache import AdCache, AdCacheEntry
 from .ad_parser import BoatAd, CarAd, McAd, RecommerceAd
-from .blocket import BlocketAPI, Location
-from .constants import (
-    BoatSortOrder,
-    BoatType,
-    CarColor,
-    CarModel,
-    CarSortOrder,
-    CarTransmission,
-    Category,
-    McModel,
-    McSortOrder,
-    McType,
-    SortOrder,
-    SubCategory,
+from .blocket import AsyncBlocketAPI, BlocketAPI
+from .bulk import AdResult
+from .cache import CacheStats, ResponseCache
+from .concurrency import AdaptiveConcurrency
+from .constants import BoatSortOrder, CarSortOrder, Endpoint, McSortOrder, SortOrder
+from .crawl import CrawlResult
+from .decoding import SearchDoc
+from .metrics import (
+    Instrumentation,
+    Metrics,
+    ParseEvent,
+    ParseProfile,
+    RequestEvent,
+)
+from .ratelimit import RateLimit, RateLimiter
+from .scheduler import (
+    AsyncSearchScheduler,
+    SavedSearch,
+    SearchResult,
+    SearchScheduler,
 )
+from .search_stream import AsyncSearchStream, SearchStream
+from .seen import SeenIds
+from .watch import AsyncSearchWatcher, SearchWatcher, WatchState
+
+if TYPE_CHECKING:
+    from .export import arrow_schema, iter_batches, to_arrow, to_numpy, write_parquet
+    from .filters import (
+        BoatType,
+        CarColor,
+        CarModel,
+        CarTransmission,
+        Category,
+        Location,
+        McModel,
+        McType,
+        SubCategory,
+    )
+
+# Loaded on first access, to keep `import blocket_api` quick
+_LAZY = {
+    "BoatType": "filters",
+    "CarColor": "filters",
+    "CarModel": "filters",
+    "CarTransmission": "filters",
+    "Category": "filters",
+    "Location": "filters",
+    "McModel": "filters",
+    "McType": "filters",
+    "SubCategory": "filters",
+    "arrow_schema": "export",
+    "iter_batches": "export",
+    "to_arrow": "export",
+    "to_numpy": "export",
+    "write_parquet": "export",
+}
 
 __all__ = [
+    "AdaptiveConcurrency",
+    "AdCache",
+    "AdCacheEntry",
+    "AdResult",
+    "AsyncBlocketAPI",
+    "AsyncSearchScheduler",
+    "AsyncSearchStream",
+    "AsyncSearchWatcher",
     "BlocketAPI",
     "Location",
     "BoatAd",
+    "CacheStats",
     "CarAd",
     "BoatSortOrder",
     "BoatType",
@@ -26,12 +80,47 @@ __all__ = [
     "CarModel",
     "CarSortOrder",
     "CarTransmission",
+    "CrawlResult",
     "Category",
+    "Endpoint",
+    "Instrumentation",
+    "Metrics",
+    "ParseProfile",
+    "ParseEvent",
+    "RequestEvent",
     "SortOrder",
     "SubCategory",
+    "RateLimit",
+    "RateLimiter",
     "RecommerceAd",
+    "ResponseCache",
+    "SavedSearch",
+    "SearchDoc",
+    "SearchResult",
+    "SearchScheduler",
+    "SearchStream",
+    "SearchWatcher",
+    "SeenIds",
     "McModel",
     "McSortOrder",
     "McType",
     "McAd",
+    "WatchState",
+    "arrow_schema",
+    "iter_batches",
+    "to_arrow",
+    "to_numpy",
+    "write_parquet",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if (module := _LAZY.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from httpx import Headers
+
+if TYPE_CHECKING:
+    from .ad_parser import BoatAd, CarAd, McAd, RecommerceAd
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ads (
+    url TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def _cache_key(ad: RecommerceAd | CarAd | BoatAd | McAd) -> str:
+    # Car, boat and mc ads share their URLs, the ad type picks the parser.
+    # Entries are always full parses, so `fields` is not part of the key.
+    return f"{type(ad).__qualname__}:{ad.url}"
+
+
+@dataclass(frozen=True)
+class AdCacheEntry:
+    data: dict[str, Any]
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class AdCache:
+    """
+    On-disk (SQLite) cache of parsed ads keyed by ad type and URL, with the
+    `ETag`/`Last-Modified` validators of the response they were parsed from.
+
+    `get_ad` revalidates cached ads with a conditional request, so an
+    unchanged ad costs a `304 Not Modified` and no parsing. The database runs
+    in WAL mode and can be shared between threads and worker processes.
+    """
+
+    path: str | Path
+    timeout: float = 30.0
+    _local: threading.local = field(
+        default_factory=threading.local, init=False, repr=False
+    )
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and process, connections must not cross fork
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> AdCacheEntry | None:
+        row = (
+            self._connection()
+            .execute("SELECT data, etag, last_modified FROM ads WHERE url = ?", (key,))
+            .fetchone()
+        )
+        if row is None:
+            return None
+        data, etag, last_modified = row
+        return AdCacheEntry(json.loads(data), etag, last_modified)
+
+    def set(self, key: str, data: dict[str, Any], headers: Headers) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ads VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    json.dumps(data),
+                    headers.get("ETag"),
+                    headers.get("Last-Modified"),
+                    time.time(),
+                ),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM ads WHERE url = ?", (key,))
+
+    def close(self) -> None:
+        if conn := getattr(self._local, "conn", None):
+            conn.close()
+            self._local.conn = None
@@ -1,12 +1,262 @@
+from __future__ import annotations
+
 import json
 import re
+from collections.abc import Callable, Collection
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any, ClassVar
 
-from bs4 import BeautifulSoup, NavigableString, Tag
 from httpx import Response
 
 from .constants import SITE_URL
+from .extractor import (
+    _DEFAULT_BACKEND,
+    _GRID_CLASS,
+    _extract,
+    _MobilityExtractor,
+    _MobilityStream,
+)
+from .metrics import ParseProfile, _Step
+
+if TYPE_CHECKING:
+    # bs4 is imported when a page needs the soup, which keeps it, and lxml
+    # behind it, out of `import blocket_api`
+    from bs4 import BeautifulSoup, Tag
+
+_HYDRATION_MARKER = b"window.__staticRouterHydrationData"
+_JSON_PARSE_CALL = b"JSON.parse("
+_SCRIPT_END = b"</script>"
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_JSON_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_JSON_SCALAR = re.compile(r"[^,:{}\[\]\s]+")
+# Strings are matched whole, so the brackets inside them don't count
+_JSON_STRUCTURE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]]', re.DOTALL)
+# Fields of every mobility ad, besides its quick specs and `_extra_fields`
+_MOBILITY_FIELDS = (
+    "url",
+    "title",
+    "subtitle",
+    "price",
+    "description",
+    "specifications",
+    "seller_type",
+    "ad_id",
+)
+
+
+def _select(data: dict[str, Any], fields: Collection[str] | None) -> dict[str, Any]:
+    if fields is None:
+        return data
+    return {key: value for key, value in _ad_object(data).items() if key in fields}
+
+
+def _ad_object(data: dict[str, Any]) -> dict[str, Any]:
+    """
+    The ad in a recommerce payload, its `loaderData.<route>.itemData`. Data
+    without one, such as a parsed mobility ad, is the ad itself.
+    """
+    loader = data.get("loaderData")
+    if isinstance(loader, dict):
+        for route in loader.values():
+            if isinstance(route, dict) and isinstance(route.get("itemData"), dict):
+                return route["itemData"]
+    return data
+
+
+def _skip_whitespace(text: str, index: int) -> int:
+    return _JSON_WHITESPACE.match(text, index).end()  # type: ignore[union-attr]
+
+
+def _skip_value(text: str, index: int) -> int:
+    """Where the JSON value at `index` ends, found without decoding it."""
+    char = text[index : index + 1]
+    if char == '"':
+        match = _JSON_STRING.match(text, index)
+    elif char in ("{", "["):
+        depth = 0
+        for token in _JSON_STRUCTURE.finditer(text, index):
+            if token.group() in ("{", "["):
+                depth += 1
+            elif token.group() in ("}", "]"):
+                depth -= 1
+                if depth == 0:
+                    return token.end()
+        match = None
+    else:
+        match = _JSON_SCALAR.match(text, index)
+    if match is None:
+        raise ValueError(f"Invalid JSON value at {index}")
+    return match.end()
+
+
+def _walk_object(
+    text: str, index: int, member: Callable[[str, int], int | None]
+) -> int | None:
+    """
+    Calls `member(key, start)` for every member of the JSON object at
+    `index`, which returns where the value ends, or `None` to stop the walk.
+    Returns where the object ends, or `None` when stopped.
+    """
+    index = _skip_whitespace(text, index + 1)
+    if text[index : index + 1] == "}":
+        return index + 1
+    while True:
+        key, index = _JSON_DECODER.raw_decode(text, index)
+        index = _skip_whitespace(text, index)
+        if text[index : index + 1] != ":":
+            raise ValueError("Expected ':' in JSON object")
+        end = member(key, _skip_whitespace(text, index + 1))
+        if end is None:
+            return None
+        index = _skip_whitespace(text, end)
+        if text[index : index + 1] == "}":
+            return index + 1
+        if text[index : index + 1] != ",":
+            raise ValueError("Expected ',' or '}' in JSON object")
+        index = _skip_whitespace(text, index + 1)
+
+
+def _decode_fields(text: str, fields: Collection[str]) -> Any:
+    """
+    Decode only the `fields` members of the ad in the JSON payload `text`,
+    the same object `_select` picks. Every other member is skipped over
+    undecoded, and decoding stops as soon as the fields are found. Fields
+    found at the top level only end it once no `loaderData` can follow,
+    since the ad in there takes precedence.
+    """
+    index = _skip_whitespace(text, 0)
+    if text[index : index + 1] != "{":
+        return json.loads(text)
+
+    wanted = set(fields)
+    top: dict[str, Any] = {}
+    ad: dict[str, Any] | None = None
+
+    def _collect(
+        data: dict[str, Any], final: Callable[[int], bool]
+    ) -> Callable[[str, int], int | None]:
+        def _member(key: str, start: int) -> int | None:
+            if key not in wanted:
+                return _skip_value(text, start)
+            data[key], end = _JSON_DECODER.raw_decode(text, start)
+            return None if len(data) == len(wanted) and final(end) else end
+
+        return _member
+
+    def _item(key: str, start: int) -> int | None:
+        nonlocal ad
+        if key != "itemData" or not text.startswith("{", start):
+            return _skip_value(text, start)
+        ad = {}
+        _walk_object(text, start, _collect(ad, lambda end: True))
+        return None
+
+    def _route(key: str, start: int) -> int | None:
+        if not text.startswith("{", start):
+            return _skip_value(text, start)
+        return _walk_object(text, start, _item)
+
+    # no quoted key left rules loaderData out, a false match only walks on
+    collect_top = _collect(top, lambda end: text.find('"loaderData"', end) < 0)
+
+    def _top(key: str, start: int) -> int | None:
+        if key == "loaderData" and text.startswith("{", start):
+            end = _walk_object(text, start, _route)
+            return None if ad is not None else end
+        return collect_top(key, start)
+
+    _walk_object(text, index, _top)
+    return top if ad is None else ad
+
+
+def _parse_hydration_data(
+    content: bytes, fields: Collection[str] | None = None
+) -> dict[str, Any] | None:
+    """
+    Find the hydration payload straight in the raw page bytes, without
+    building a soup. The `JSON.parse("...")` argument is a string literal,
+    unescaped in one pass by the json scanner, which stops at its closing
+    quote. Returns `None` when the payload can't be found or decoded this way.
+    """
+    marker = content.find(_HYDRATION_MARKER)
+    if marker < 0:
+        return None
+    call = content.find(_JSON_PARSE_CALL, marker)
+    if call < 0:
+        return None
+    start = call + len(_JSON_PARSE_CALL)
+    end = content.find(_SCRIPT_END, start)
+
+    try:
+        text = content[start : end if end >= 0 else None].decode("utf-8")
+        payload, _ = _JSON_DECODER.raw_decode(text)
+        if not isinstance(payload, str):
+            return None
+        data = (
+            json.loads(payload) if fields is None else _decode_fields(payload, fields)
+        )
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+class _HydrationStream:
+    """
+    Buffers a recommerce page while it downloads. `feed` returns `True` once
+    the hydration script is complete, the rest of the page isn't needed.
+    """
+
+    def __init__(self, ad: RecommerceAd, fields: Collection[str] | None) -> None:
+        self.ad = ad
+        self.fields = fields
+        self._content = bytearray()
+        self._marker = -1
+        self._call = -1
+
+    def feed(self, chunk: bytes) -> bool:
+        content = self._content
+        # earlier chunks are searched already, except for a partial match
+        searched = len(content)
+        content += chunk
+        if self._marker < 0:
+            start = max(0, searched - len(_HYDRATION_MARKER) + 1)
+            if (marker := content.find(_HYDRATION_MARKER, start)) < 0:
+                return False
+            self._marker = searched = marker
+        if self._call < 0:
+            start = max(self._marker, searched - len(_JSON_PARSE_CALL) + 1)
+            if (call := content.find(_JSON_PARSE_CALL, start)) < 0:
+                return False
+            self._call = searched = call
+        start = max(self._call, searched - len(_SCRIPT_END) + 1)
+        return content.find(_SCRIPT_END, start) >= 0
+
+    def close(self) -> dict[str, Any]:
+        content = bytes(self._content)
+        if (data := _parse_hydration_data(content, self.fields)) is not None:
+            return data
+        return _select(self.ad._parse_soup(Response(200, content=content)), self.fields)
+
+
+class _SoupStream:
+    """
+    Buffers a whole mobility page for the soup extractors, for ads whose
+    `extend` the single pass extractor can't run.
+    """
+
+    def __init__(self, ad: MobilityAd, fields: Collection[str] | None) -> None:
+        self.ad = ad
+        self.fields = fields
+        self._content = bytearray()
+
+    def feed(self, chunk: bytes) -> bool:
+        self._content += chunk
+        return False
+
+    def close(self) -> dict[str, Any]:
+        response = Response(200, content=bytes(self._content))
+        return _select(self.ad._parse_soup(response), self.fields)
 
 
 @dataclass(frozen=True)
@@ -17,7 +267,24 @@ class RecommerceAd:
     def url(self) -> str:
         return f"{SITE_URL}/recommerce/forsale/item/{self.id}"
 
-    def parse(self, response: Response) -> dict[str, Any]:
+    def parse(
+        self, response: Response, *, fields: Collection[str] | None = None
+    ) -> dict[str, Any]:
+        """
+        `fields` limits the result to those keys of the ad, the
+        `loaderData.<route>.itemData` object of the payload. Only they are
+        decoded, and no further into the payload than needed to find them.
+        """
+        if (data := _parse_hydration_data(response.content, fields)) is not None:
+            return data
+        return _select(self._parse_soup(response), fields)
+
+    def _stream(self, *, fields: Collection[str] | None = None) -> _HydrationStream:
+        return _HydrationStream(self, fields)
+
+    def _parse_soup(self, response: Response) -> dict[str, Any]:
+        from bs4 import BeautifulSoup
+
         soup = BeautifulSoup(response.content, "html.parser")
         json_script_tag = soup.select_one(
             'script:-soup-contains("window.__staticRouterHydrationData")'
@@ -37,28 +304,122 @@ class RecommerceAd:
 class MobilityAd:
     id: int
 
+    # Fields `extend` adds, for the single pass extractor
+    _extra_fields: ClassVar[tuple[str, ...]] = ()
+
     @property
     def url(self) -> str:
         return f"{SITE_URL}/mobility/item/{self.id}"
 
-    def parse(self, response: Response) -> dict[str, Any]:
-        soup = BeautifulSoup(response.content, "html.parser")
-        grid = soup.find("div", class_="grid grid-cols-1 md:grid-cols-3 md:gap-x-32")
+    def parse(
+        self,
+        response: Response,
+        *,
+        backend: str | None = None,
+        fields: Collection[str] | None = None,
+        profile: ParseProfile | None = None,
+    ) -> dict[str, Any]:
+        """
+        Collects every field in a single pass over the page. `backend` picks
+        the HTML parser feeding it: "html.parser" (the default) or the faster
+        "lxml", while "soup" runs the BeautifulSoup based extractors. lxml
+        repairs broken markup its own way and can differ from the soup on
+        malformed pages.
+
+        `fields` limits the result to those keys, quick spec keys included.
+        Only the matching they need is done, and parsing stops as soon as
+        they are complete.
+
+        A `profile` gets the time of each parsing step and the fields the
+        result lacks.
+
+        Subclasses that override `extend` are always parsed with the soup,
+        the single pass extractor can't run it.
+        """
+        if backend == "soup" or self._own_extend():
+            data = _select(self._parse_soup(response, profile), fields)
+        else:
+            with _Step(profile, type(self).__name__, "extract") as step:
+                data = _extract(
+                    response.content,
+                    self._extractor(fields),
+                    backend or _DEFAULT_BACKEND,
+                )
+                step.empty = not data
+            data = _select(data, fields)
+        if profile is not None:
+            profile.record_result(
+                type(self).__name__,
+                [field for field in self._fields(fields) if field not in data],
+            )
+        return data
+
+    def _fields(self, fields: Collection[str] | None) -> list[str]:
+        """The fields a complete parse of a page of this kind has."""
+        every = [
+            *_MOBILITY_FIELDS,
+            *getattr(self, "quick_spec_mapping", {}).values(),
+            *self._extra_fields,
+        ]
+        return (
+            every if fields is None else [field for field in every if field in fields]
+        )
+
+    def _own_extend(self) -> bool:
+        """Whether `extend` comes from a subclass outside this module."""
+        return type(self).extend.__module__ != __name__
+
+    def _stream(
+        self, *, fields: Collection[str] | None = None
+    ) -> _MobilityStream | _SoupStream:
+        if self._own_extend():
+            return _SoupStream(self, fields)
+        return _MobilityStream(self._extractor(fields), _DEFAULT_BACKEND)
+
+    def _extractor(self, fields: Collection[str] | None) -> _MobilityExtractor:
+        return _MobilityExtractor(
+            self.url,
+            getattr(self, "quick_spec_mapping", {}),
+            self._extra_fields,
+            fields,
+        )
+
+    def _parse_soup(
+        self, response: Response, profile: ParseProfile | None = None
+    ) -> dict[str, Any]:
+        from bs4 import BeautifulSoup
+
+        parser = type(self).__name__
+        with _Step(profile, parser, "soup"):
+            soup = BeautifulSoup(response.content, "html.parser")
+        with _Step(profile, parser, "grid") as step:
+            grid = soup.find("div", class_=_GRID_CLASS)
+            step.empty = not grid
 
         if not grid:
             return {}
 
         data: dict[str, Any] = {"url": self.url}
 
-        self._extract_title_and_subtitle(grid, data)
-        self._extract_quick_specs(grid, data)
-        self._extract_price(grid, data)
-        self._extract_description(grid, data)
-        self._extract_specifications(grid, data)
-        self._extract_seller_type(soup, data)
-        self._extract_ad_id(soup, data)
+        steps: tuple[tuple[Callable[[Any, dict], None], Tag], ...] = (
+            (self._extract_title_and_subtitle, grid),
+            (self._extract_quick_specs, grid),
+            (self._extract_price, grid),
+            (self._extract_description, grid),
+            (self._extract_specifications, grid),
+            (self._extract_seller_type, soup),
+            (self._extract_ad_id, soup),
+        )
+        for extract, source in steps:
+            with _Step(profile, parser, extract.__name__) as step:
+                found = len(data)
+                extract(source, data)
+                step.empty = len(data) == found
 
-        self.extend(data, soup, grid)
+        with _Step(profile, parser, "extend") as step:
+            found = len(data)
+            self.extend(data, soup, grid)
+            step.empty = len(data) == found and bool(self._extra_fields)
 
         return data
 
@@ -126,6 +487,8 @@ class MobilityAd:
         )
 
     def _extract_ad_id(self, soup: BeautifulSoup, data: dict) -> None:
+        from bs4 import NavigableString
+
         label = next(
             (
                 p
@@ -144,6 +507,7 @@ class MobilityAd:
 
 
 class CarAd(MobilityAd):
+    _extra_fields = ("equipment",)
     quick_spec_mapping = {
         "Modellår": "model_year",
         "Miltal": "mileage",
@@ -152,6 +516,8 @@ class CarAd(MobilityAd):
     }
 
     def extend(self, data: dict, soup: BeautifulSoup, grid: Tag) -> None:
+        from bs4 import NavigableString
+
         equip_section = next(
             (
                 h2
@@ -169,6 +535,7 @@ class CarAd(MobilityAd):
 
 
 class BoatAd(MobilityAd):
+    _extra_fields = ("location",)
     quick_spec_mapping = {
         "Modellår": "model_year",
         "Längd": "length",
@@ -177,6 +544,8 @@ class BoatAd(MobilityAd):
     }
 
     def extend(self, data: dict, soup: BeautifulSoup, grid: Tag) -> None:
+        from bs4 import NavigableString
+
         if place_h2 := soup.find(
             "h2", text=lambda t: isinstance(t, NavigableString) and "Plats" in t
         ):
@@ -185,6 +554,7 @@ class BoatAd(MobilityAd):
 
 
 class McAd(MobilityAd):
+    _extra_fields = ("location",)
     quick_spec_mapping = {
         "Modellår": "model_year",
         "Motorvolym": "engine_volume",
@@ -192,6 +562,8 @@ class McAd(MobilityAd):
     }
 
     def extend(self, data: dict, soup: BeautifulSoup, grid: Tag) -> None:
+        from bs4 import NavigableString
+
         if place_h2 := soup.find(
             "h2", text=lambda t: isinstance(t, NavigableString) and "Plats" in t
         ):
@@ -1,28 +1,74 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any
+import inspect
+import time
+from collections.abc import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Collection,
+    Hashable,
+    Iterable,
+    Iterator,
+    Sequence,
+)
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import count
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Self, TypeVar
 
 import httpx
 from httpx import Response
 
-from .ad_parser import BoatAd, CarAd, McAd, RecommerceAd
+from .ad_cache import AdCache, _cache_key
+from .ad_parser import (
+    BoatAd,
+    CarAd,
+    McAd,
+    RecommerceAd,
+    _HydrationStream,
+    _select,
+    _SoupStream,
+)
+from .bulk import AdResult, _abounded_map, _bounded_map
+from .cache import ResponseCache
+from .coalesce import _AsyncSingleFlight, _SingleFlight
+from .concurrency import AdaptiveConcurrency
 from .constants import (
+    _FILTERS,
     HEADERS,
     SITE_URL,
-    BoatType,
-    CarColor,
-    CarModel,
     CarSortOrder,
-    CarTransmission,
-    Category,
-    Location,
-    McModel,
+    Endpoint,
     McSortOrder,
-    McType,
     SortOrder,
-    SubCategory,
 )
+from .crawl import CrawlResult, _acrawl, _Crawl, _crawl
+from .decoding import SearchDoc, _json_decoder
+from .extractor import _MobilityStream
+from .metrics import Instrumentation, ParseEvent, _observe, _TimedParser, _Timer
+from .pagination import _afetch_all, _aiter_docs, _fetch_all, _iter_docs
+from .ratelimit import RateLimiter
+from .search_stream import AsyncSearchStream, SearchStream
+
+if TYPE_CHECKING:
+    # also re-exported for `from blocket_api.blocket import CarModel`, see
+    # __getattr__
+    from .filters import (
+        BoatType,
+        CarColor,
+        CarModel,
+        CarTransmission,
+        Category,
+        Location,
+        McModel,
+        McType,
+        SubCategory,
+    )
+
+T = TypeVar("T")
 
 
 @dataclass(frozen=True)
@@ -31,46 +77,486 @@ class QueryParam:
     value: str | int
 
 
-def _request(*, url: str, params: list[QueryParam]) -> Response:
-    response = httpx.get(
+def _request(
+    client: httpx.Client,
+    *,
+    url: str,
+    params: list[QueryParam],
+    headers: dict[str, str] | None = None,
+    trace: Callable[[str, dict[str, Any]], Any] | None = None,
+) -> Response:
+    response = client.get(
+        url,
+        params=[(param.name, param.value) for param in params],
+        headers=headers,
+        extensions={"trace": trace} if trace else None,
+    )
+    # 304 is the answer to a conditional request, not an error
+    if response.status_code != httpx.codes.NOT_MODIFIED:
+        response.raise_for_status()
+    return response
+
+
+async def _arequest(
+    client: httpx.AsyncClient,
+    *,
+    url: str,
+    params: list[QueryParam],
+    headers: dict[str, str] | None = None,
+    trace: Callable[[str, dict[str, Any]], Awaitable[None]] | None = None,
+) -> Response:
+    response = await client.get(
+        url,
+        params=[(param.name, param.value) for param in params],
+        headers=headers,
+        extensions={"trace": trace} if trace else None,
+    )
+    if response.status_code != httpx.codes.NOT_MODIFIED:
+        response.raise_for_status()
+    return response
+
+
+def _stream_request(
+    client: httpx.Client,
+    *,
+    url: str,
+    parser: _HydrationStream | _MobilityStream | _SoupStream | _TimedParser,
+    headers: dict[str, str] | None = None,
+    trace: Callable[[str, dict[str, Any]], Any] | None = None,
+) -> tuple[Response, dict[str, Any]]:
+    # Leaving the block early closes the connection, the rest isn't downloaded
+    with client.stream(
+        "GET", url, headers=headers, extensions={"trace": trace} if trace else None
+    ) as response:
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            return response, {}
+        response.raise_for_status()
+        for chunk in response.iter_bytes():
+            if parser.feed(chunk):
+                break
+        return response, parser.close()
+
+
+async def _astream_request(
+    client: httpx.AsyncClient,
+    *,
+    url: str,
+    parser: _HydrationStream | _MobilityStream | _SoupStream | _TimedParser,
+    headers: dict[str, str] | None = None,
+    trace: Callable[[str, dict[str, Any]], Awaitable[None]] | None = None,
+) -> tuple[Response, dict[str, Any]]:
+    async with client.stream(
+        "GET", url, headers=headers, extensions={"trace": trace} if trace else None
+    ) as response:
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            return response, {}
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            if parser.feed(chunk):
+                break
+        return response, parser.close()
+
+
+def _search_params(
+    query: str,
+    *,
+    page: int,
+    sort_order: SortOrder,
+    locations: Sequence[Location],
+    category: Category | None,
+    sub_category: SubCategory | None,
+) -> tuple[str, list[QueryParam]]:
+    if category and sub_category:
+        raise AssertionError("Cannot specify both category and sub_categories")
+
+    url = f"{SITE_URL}/recommerce/forsale/search/api/search/{Endpoint.SEARCH}"
+
+    param_dict: dict[str, str | int | None] = {
+        "q": query,
+        "page": page,
+        "sort": sort_order.value,
+        "category": category.value if category else None,
+        "sub_category": sub_category.value if sub_category else None,
+    }
+
+    params = [QueryParam(k, v) for k, v in param_dict.items() if v is not None]
+
+    params.extend(QueryParam("location", loc.value) for loc in locations)
+
+    return url, params
+
+
+def _search_car_params(
+    query: str | None,
+    *,
+    page: int,
+    sort_order: CarSortOrder,
+    locations: Sequence[Location],
+    models: Sequence[CarModel],
+    price_from: int | None,
+    price_to: int | None,
+    year_from: int | None,
+    year_to: int | None,
+    milage_from: int | None,
+    milage_to: int | None,
+    colors: Sequence[CarColor],
+    transmissions: Sequence[CarTransmission],
+    org_id: int | None,
+) -> tuple[str, list[QueryParam]]:
+    url = f"{SITE_URL}/mobility/search/api/search/{Endpoint.SEARCH_CAR}"
+
+    param_dict: dict[str, str | int | None] = {
+        "q": query,
+        "page": page,
+        "sort": sort_order.value,
+        "price_from": price_from,
+        "price_to": price_to,
+        "year_from": year_from,
+        "year_to": year_to,
+        "milage_from": milage_from,
+        "milage_to": milage_to,
+        "orgId": org_id,
+    }
+
+    params = [QueryParam(k, v) for k, v in param_dict.items() if v is not None]
+
+    # Multi-value params
+    params.extend(QueryParam("location", loc.value) for loc in locations)
+    params.extend(QueryParam("make", model.value) for model in models)
+    params.extend(QueryParam("exterior_colour", color.value) for color in colors)
+    params.extend(QueryParam("transmission", t.value) for t in transmissions)
+
+    return url, params
+
+
+def _search_boat_params(
+    query: str | None,
+    *,
+    page: int,
+    sort_order: CarSortOrder,
+    types: Sequence[BoatType],
+    locations: Sequence[Location],
+    price_from: int | None,
+    price_to: int | None,
+    length_from: int | None,
+    length_to: int | None,
+    org_id: int | None,
+) -> tuple[str, list[QueryParam]]:
+    url = f"{SITE_URL}/mobility/search/api/search/{Endpoint.SEARCH_BOAT}"
+
+    param_dict: dict[str, str | int | None] = {
+        "q": query,
+        "page": page,
+        "sort": sort_order.value,
+        "price_from": price_from,
+        "price_to": price_to,
+        "length_feet_from": length_from,
+        "length_feet_to": length_to,
+        "orgId": org_id,
+    }
+
+    params = [QueryParam(k, v) for k, v in param_dict.items() if v is not None]
+
+    params.extend(QueryParam("class", t.value) for t in types)
+    params.extend(QueryParam("location", loc.value) for loc in locations)
+
+    return url, params
+
+
+def _search_mc_params(
+    query: str | None,
+    *,
+    page: int,
+    sort_order: McSortOrder,
+    models: Sequence[McModel],
+    types: Sequence[McType],
+    locations: Sequence[Location],
+    price_from: int | None,
+    price_to: int | None,
+    engine_volume_from: int | None,
+    engine_volume_to: int | None,
+    org_id: int | None,
+) -> tuple[str, list[QueryParam]]:
+    url = f"{SITE_URL}/mobility/search/api/search/{Endpoint.SEARCH_MC}"
+
+    param_dict: dict[str, str | int | None] = {
+        "q": query,
+        "page": page,
+        "sort": sort_order.value,
+        "price_from": price_from,
+        "price_to": price_to,
+        "engine_volume_from": engine_volume_from,
+        "engine_volume_to": engine_volume_to,
+        "orgId": org_id,
+    }
+
+    params = [QueryParam(k, v) for k, v in param_dict.items() if v is not None]
+
+    params.extend(QueryParam("make", m.value) for m in models)
+    params.extend(QueryParam("location", loc.value) for loc in locations)
+    params.extend(QueryParam("type", t.value) for t in types)
+
+    return url, params
+
+
+_SEARCH_PARAMS: dict[str, Callable[..., tuple[str, list[QueryParam]]]] = {
+    "search": _search_params,
+    "search_car": _search_car_params,
+    "search_boat": _search_boat_params,
+    "search_mc": _search_mc_params,
+}
+
+
+def _search_request(
+    search: Callable[..., Any], args: tuple[Any, ...], filters: dict[str, Any]
+) -> tuple[str, list[QueryParam]]:
+    """URL and params the `search*` method `search` would request."""
+    if (params := _SEARCH_PARAMS.get(getattr(search, "__name__", ""))) is None:
+        raise ValueError(f"Not a search method: {search!r}")
+    # the method's signature holds the defaults, the builder takes the same names
+    arguments = inspect.signature(search).bind(*args, **filters)
+    arguments.apply_defaults()
+    return params(**arguments.arguments)
+
+
+def _open_stream(
+    client: httpx.Client,
+    *,
+    url: str,
+    params: list[QueryParam],
+    trace: Callable[[str, dict[str, Any]], Any] | None = None,
+) -> Response:
+    request = client.build_request(
+        "GET",
+        url,
+        params=[(param.name, param.value) for param in params],
+        extensions={"trace": trace} if trace else None,
+    )
+    response = client.send(request, stream=True)
+    if response.is_error:
+        response.close()
+        response.raise_for_status()
+    return response
+
+
+async def _aopen_stream(
+    client: httpx.AsyncClient,
+    *,
+    url: str,
+    params: list[QueryParam],
+    trace: Callable[[str, dict[str, Any]], Awaitable[None]] | None = None,
+) -> Response:
+    request = client.build_request(
+        "GET",
         url,
-        headers=HEADERS,
         params=[(param.name, param.value) for param in params],
+        extensions={"trace": trace} if trace else None,
     )
-    response.raise_for_status()
+    response = await client.send(request, stream=True)
+    if response.is_error:
+        await response.aclose()
+        response.raise_for_status()
     return response
 
 
 @dataclass(frozen=True)
-class BlocketAPI:
+class _ClientConfig:
+    timeout: float = 10.0
+    http2: bool = False
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    cache: ResponseCache | None = field(default=None, compare=False)
+    ad_cache: AdCache | None = field(default=None, compare=False)
+    rate_limiter: RateLimiter | None = field(default=None, compare=False)
+    json_backend: str | None = None
+    typed_docs: bool = False
+    coalesce: bool = False
+    instrumentation: Instrumentation | None = field(default=None, compare=False)
+    _decode: Callable[[bytes], Any] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self, "_decode", _json_decoder(self.json_backend, typed=self.typed_docs)
+        )
+
+    def _parse(
+        self, url: str, parser: str, content: bytes, parse: Callable[[], T]
+    ) -> T:
+        if self.instrumentation is None:
+            return parse()
+        start = time.perf_counter()
+        value = parse()
+        self._parsed(url, parser, len(content), time.perf_counter() - start)
+        return value
+
+    def _parsed(self, url: str, parser: str, size: int, seconds: float) -> None:
+        if self.instrumentation is not None:
+            self.instrumentation.on_parse(
+                ParseEvent(Endpoint.from_url(url), parser, size, seconds)
+            )
+
+    def _stream_finished(
+        self,
+        url: str,
+        timer: _Timer | None,
+        response: Response,
+        seconds: float,
+        error: Exception | None,
+    ) -> None:
+        # the request of a streamed search is only over once its body is read
+        if self.instrumentation is None or timer is None:
+            return
+        self.instrumentation.on_request(timer.event(error))
+        if error is None:
+            self._parsed(url, "json", response.num_bytes_downloaded, seconds)
+
+    def _timed_stream(
+        self, ad: RecommerceAd | CarAd | BoatAd | McAd, fields: Collection[str] | None
+    ) -> _HydrationStream | _MobilityStream | _SoupStream | _TimedParser:
+        parser = ad._stream(fields=fields)
+        return parser if self.instrumentation is None else _TimedParser(parser)
+
+    def _stream_parsed(
+        self,
+        ad: RecommerceAd | CarAd | BoatAd | McAd,
+        parser: _HydrationStream | _MobilityStream | _SoupStream | _TimedParser,
+        response: Response,
+    ) -> None:
+        if isinstance(parser, _TimedParser):
+            self._parsed(
+                ad.url,
+                type(ad).__name__,
+                response.num_bytes_downloaded,
+                parser.seconds,
+            )
+
+    @staticmethod
+    def _ad_key(
+        ad: RecommerceAd | CarAd | BoatAd | McAd,
+        fields: Collection[str] | None,
+        stream: bool,
+    ) -> Hashable:
+        # the ad type picks the parser, mobility ads of every type share URLs
+        return type(ad), ad.url, None if fields is None else frozenset(fields), stream
+
+    def _convert_doc(self, doc: dict[str, Any]) -> Any:
+        return SearchDoc.from_dict(doc) if self.typed_docs else doc
+
+    def _client_kwargs(self) -> dict[str, Any]:
+        return {
+            "headers": HEADERS,
+            "http2": self.http2,
+            "timeout": self.timeout,
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+        }
+
+
+@dataclass(frozen=True)
+class BlocketAPI(_ClientConfig):
+    """
+    Client for blocket.se.
+
+    Owns a pooled `httpx.Client` so connections (TCP + TLS) are kept alive and
+    reused between calls. The client is thread safe and can be shared between
+    threads. Use as a context manager, or call `close()`, to release the pool.
+
+    With `coalesce`, identical searches or `get_ad` calls made while one is in
+    flight wait for it instead of sending their own request, and all callers
+    get the same result object.
+
+    An `instrumentation`, e.g. a `Metrics`, receives the timings, size and
+    status of every HTTP attempt and the parse time of every response.
+    """
+
+    _client: httpx.Client = field(init=False, repr=False, compare=False)
+    _flights: _SingleFlight = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        object.__setattr__(self, "_client", httpx.Client(**self._client_kwargs()))
+        object.__setattr__(self, "_flights", _SingleFlight())
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._client.close()
+
+    def _get(
+        self,
+        url: str,
+        params: list[QueryParam],
+        headers: dict[str, str] | None = None,
+    ) -> Response:
+        attempts = count()
+
+        def _send() -> Response:
+            with _observe(self.instrumentation, url, next(attempts)) as timer:
+                response = _request(
+                    self._client,
+                    url=url,
+                    params=params,
+                    headers=headers,
+                    trace=timer.trace if timer else None,
+                )
+                if timer:
+                    timer.response = response
+                return response
+
+        if self.rate_limiter is None:
+            return _send()
+        return self.rate_limiter.call(Endpoint.from_url(url), _send)
+
+    def _search(self, url: str, params: list[QueryParam]) -> dict[str, Any]:
+        if not self.coalesce:
+            return self._fetch_search(url, params)
+        return self._flights.call(
+            (url, tuple(params)), lambda: self._fetch_search(url, params)
+        )
+
+    def _fetch_search(self, url: str, params: list[QueryParam]) -> dict[str, Any]:
+        if self.cache is not None and (content := self.cache.get(url, params)):
+            return self._parse(url, "json", content, lambda: self._decode(content))
+
+        response = self._get(url, params)
+        if self.cache is not None:
+            self.cache.set(url, params, response.content)
+        return self._parse(
+            url, "json", response.content, lambda: self._decode(response.content)
+        )
+
     def search(
         self,
         query: str,
         *,
         page: int = 1,
         sort_order: SortOrder = SortOrder.RELEVANCE,
-        locations: list[Location] = [],
+        locations: Sequence[Location] = (),
         category: Category | None = None,
         sub_category: SubCategory | None = None,
     ) -> dict[str, Any]:
-        if category and sub_category:
-            raise AssertionError("Cannot specify both category and sub_categories")
-
-        url = f"{SITE_URL}/recommerce/forsale/search/api/search/SEARCH_ID_BAP_COMMON"
-
-        param_dict: dict[str, str | int | None] = {
-            "q": query,
-            "page": page,
-            "sort": sort_order.value,
-            "category": category.value if category else None,
-            "sub_category": sub_category.value if sub_category else None,
-        }
-
-        params = [QueryParam(k, v) for k, v in param_dict.items() if v is not None]
-
-        params.extend(QueryParam("location", loc.value) for loc in locations)
-
-        return _request(url=url, params=params).json()
+        url, params = _search_params(
+            query,
+            page=page,
+            sort_order=sort_order,
+            locations=locations,
+            category=category,
+            sub_category=sub_category,
+        )
+        return self._search(url, params)
 
     def search_car(
         self,
@@ -78,42 +564,35 @@ class BlocketAPI:
         *,
         page: int = 1,
         sort_order: CarSortOrder = CarSortOrder.RELEVANCE,
-        locations: list[Location] = [],
-        models: list[CarModel] = [],
+        locations: Sequence[Location] = (),
+        models: Sequence[CarModel] = (),
         price_from: int | None = None,
         price_to: int | None = None,
         year_from: int | None = None,
         year_to: int | None = None,
         milage_from: int | None = None,
         milage_to: int | None = None,
-        colors: list[CarColor] = [],
-        transmissions: list[CarTransmission] = [],
+        colors: Sequence[CarColor] = (),
+        transmissions: Sequence[CarTransmission] = (),
         org_id: int | None = None,
     ) -> dict[str, Any]:
-        url = f"{SITE_URL}/mobility/search/api/search/SEARCH_ID_CAR_USED"
-
-        param_dict: dict[str, str | int | None] = {
-            "q": query,
-            "page": page,
-            "sort": sort_order.value,
-            "price_from": price_from,
-            "price_to": price_to,
-            "year_from": year_from,
-            "year_to": year_to,
-            "milage_from": milage_from,
-            "milage_to": milage_to,
-            "orgId": org_id,
-        }
-
-        params = [QueryParam(k, v) for k, v in param_dict.items() if v is not None]
-
-        # Multi-value params
-        params.extend(QueryParam("location", loc.value) for loc in locations)
-        params.extend(QueryParam("make", model.value) for model in models)
-        params.extend(QueryParam("exterior_colour", color.value) for color in colors)
-        params.extend(QueryParam("transmission", t.value) for t in transmissions)
-
-        return _request(url=url, params=params).json()
+        url, params = _search_car_params(
+            query,
+            page=page,
+            sort_order=sort_order,
+            locations=locations,
+            models=models,
+            price_from=price_from,
+            price_to=price_to,
+            year_from=year_from,
+            year_to=year_to,
+            milage_from=milage_from,
+            milage_to=milage_to,
+            colors=colors,
+            transmissions=transmissions,
+            org_id=org_id,
+        )
+        return self._search(url, params)
 
     def search_boat(
         self,
@@ -121,70 +600,677 @@ class BlocketAPI:
         *,
         page: int = 1,
         sort_order: CarSortOrder = CarSortOrder.RELEVANCE,
-        types: list[BoatType] = [],
-        locations: list[Location] = [],
+        types: Sequence[BoatType] = (),
+        locations: Sequence[Location] = (),
         price_from: int | None = None,
         price_to: int | None = None,
         length_from: int | None = None,
         length_to: int | None = None,
         org_id: int | None = None,
     ) -> Any:
-        url = f"{SITE_URL}/mobility/search/api/search/SEARCH_ID_BOAT_USED"
-
-        param_dict: dict[str, str | int | None] = {
-            "q": query,
-            "page": page,
-            "sort": sort_order.value,
-            "price_from": price_from,
-            "price_to": price_to,
-            "length_feet_from": length_from,
-            "length_feet_to": length_to,
-            "orgId": org_id,
-        }
+        url, params = _search_boat_params(
+            query,
+            page=page,
+            sort_order=sort_order,
+            types=types,
+            locations=locations,
+            price_from=price_from,
+            price_to=price_to,
+            length_from=length_from,
+            length_to=length_to,
+            org_id=org_id,
+        )
+        return self._search(url, params)
 
-        params = [QueryParam(k, v) for k, v in param_dict.items() if v is not None]
+    def search_mc(
+        self,
+        query: str | None = None,
+        *,
+        page: int = 1,
+        sort_order: McSortOrder = McSortOrder.RELEVANCE,
+        models: Sequence[McModel] = (),
+        types: Sequence[McType] = (),
+        locations: Sequence[Location] = (),
+        price_from: int | None = None,
+        price_to: int | None = None,
+        engine_volume_from: int | None = None,
+        engine_volume_to: int | None = None,
+        org_id: int | None = None,
+    ) -> dict[str, Any]:
+        url, params = _search_mc_params(
+            query,
+            page=page,
+            sort_order=sort_order,
+            models=models,
+            types=types,
+            locations=locations,
+            price_from=price_from,
+            price_to=price_to,
+            engine_volume_from=engine_volume_from,
+            engine_volume_to=engine_volume_to,
+            org_id=org_id,
+        )
+        return self._search(url, params)
 
-        params.extend(QueryParam("class", t.value) for t in types)
-        params.extend(QueryParam("location", loc.value) for loc in locations)
+    def get_ad(
+        self,
+        ad: RecommerceAd | CarAd | BoatAd | McAd,
+        *,
+        fields: Collection[str] | None = None,
+        stream: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Fetch and parse an ad. `fields` limits the result to those keys, and
+        the parser skips the work for every other field. With an `ad_cache`,
+        ads are still parsed in full so the cache stays complete.
 
-        return _request(url=url, params=params).json()
+        With `stream`, the page is parsed while it downloads and the
+        connection is closed as soon as the result is complete. Recommerce
+        ads are complete after the hydration script, mobility ads once the
+        selected fields are found.
+        """
+        if not self.coalesce:
+            return self._get_ad(ad, fields=fields, stream=stream)
+        return self._flights.call(
+            self._ad_key(ad, fields, stream),
+            lambda: self._get_ad(ad, fields=fields, stream=stream),
+        )
 
-    def search_mc(
+    def _get_ad(
+        self,
+        ad: RecommerceAd | CarAd | BoatAd | McAd,
+        *,
+        fields: Collection[str] | None,
+        stream: bool,
+    ) -> dict[str, Any]:
+        if self.ad_cache is None:
+            _, data = self._fetch_ad(ad, fields=fields, stream=stream)
+            return data
+
+        cached = self.ad_cache.get(_cache_key(ad))
+        response, data = self._fetch_ad(
+            ad,
+            fields=None,
+            stream=stream,
+            headers=cached.conditional_headers if cached else None,
+        )
+        if cached and response.status_code == httpx.codes.NOT_MODIFIED:
+            return _select(cached.data, fields)
+
+        self.ad_cache.set(_cache_key(ad), data, response.headers)
+        return _select(data, fields)
+
+    def _fetch_ad(
+        self,
+        ad: RecommerceAd | CarAd | BoatAd | McAd,
+        *,
+        fields: Collection[str] | None,
+        stream: bool,
+        headers: dict[str, str] | None = None,
+    ) -> tuple[Response, dict[str, Any]]:
+        if not stream:
+            response = self._get(ad.url, [], headers)
+            if response.status_code == httpx.codes.NOT_MODIFIED:
+                return response, {}
+            return response, self._parse(
+                ad.url,
+                type(ad).__name__,
+                response.content,
+                lambda: ad.parse(response, fields=fields),
+            )
+
+        attempts = count()
+
+        def _send() -> tuple[Response, dict[str, Any]]:
+            parser = self._timed_stream(ad, fields)
+            with _observe(self.instrumentation, ad.url, next(attempts)) as timer:
+                response, data = _stream_request(
+                    self._client,
+                    url=ad.url,
+                    parser=parser,
+                    headers=headers,
+                    trace=timer.trace if timer else None,
+                )
+                if timer:
+                    timer.response = response
+            self._stream_parsed(ad, parser, response)
+            return response, data
+
+        if self.rate_limiter is None:
+            response, data = _send()
+        else:
+            response, data = self.rate_limiter.call(Endpoint.AD, _send)
+        return response, _select(data, fields)
+
+    def get_ads(
+        self,
+        ads: Iterable[RecommerceAd | CarAd | BoatAd | McAd],
+        *,
+        concurrency: int | AdaptiveConcurrency = 8,
+        ordered: bool = False,
+        fields: Collection[str] | None = None,
+        stream: bool = False,
+    ) -> Iterator[AdResult]:
+        """
+        Fetch many ads with at most `concurrency` requests in flight.
+
+        Results are yielded as they complete, or in input order if `ordered`.
+        A failing ad yields an `AdResult` with `error` set instead of raising.
+        `fields` and `stream` are passed on to `get_ad`.
+        """
+        for outcome in _bounded_map(
+            partial(self.get_ad, fields=fields, stream=stream),
+            ads,
+            concurrency=concurrency,
+            ordered=ordered,
+        ):
+            yield AdResult(outcome.item, data=outcome.value, error=outcome.error)
+
+    def iter_docs(
+        self,
+        search: Callable[..., dict[str, Any]],
+        /,
+        *args: Any,
+        start_page: int = 1,
+        prefetch: int = 2,
+        **filters: Any,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Lazily iterate over the docs of every result page of `search`, one of
+        the `search*` methods, called with `args` and `filters`.
+
+        Up to `prefetch` following pages are fetched in the background while
+        the current page is consumed. Iteration stops at the last page given
+        by the response paging metadata, or at the first empty page.
+
+            for doc in api.iter_docs(api.search_car, models=[CarModel.VOLVO]):
+                ...
+        """
+        return _iter_docs(
+            lambda page: search(*args, page=page, **filters),
+            start_page=start_page,
+            prefetch=prefetch,
+        )
+
+    def search_all(
+        self,
+        search: Callable[..., dict[str, Any]],
+        /,
+        *args: Any,
+        concurrency: int | AdaptiveConcurrency = 8,
+        **filters: Any,
+    ) -> list[dict[str, Any]]:
+        """
+        Fetch the docs of every result page of `search`, one of the `search*`
+        methods, called with `args` and `filters`.
+
+        Page 1 tells how many pages there are; the remaining pages are then
+        fetched concurrently, at most `concurrency` at a time. Docs are
+        returned in page order with duplicate ad ids removed.
+        """
+        return _fetch_all(
+            lambda page: search(*args, page=page, **filters),
+            concurrency=concurrency,
+        )
+
+    def crawl(
+        self,
+        search: Callable[..., dict[str, Any]],
+        /,
+        *args: Any,
+        concurrency: int | AdaptiveConcurrency = 8,
+        **filters: Any,
+    ) -> CrawlResult:
+        """
+        Like `search_all`, but for queries with more ads than pagination
+        returns. A query whose first page shows more matches than its pages
+        hold is split into disjoint sub-queries, recursively, until each
+        fits: its price range is bisected, then year, mileage, length or
+        engine volume ranges, then it fans out over locations and models.
+        All sub-queries and pages share one pool of at most `concurrency`
+        requests, and the docs are deduped by ad id.
+
+            result = api.crawl(api.search_car, models=[CarModel.VOLVO])
+            if not result.complete:
+                ...
+
+        Fanning out over locations or models leaves out ads without one of
+        their values, and bisecting a range those without a value for it.
+        Each split query's match count is checked against its sub-queries',
+        the ads lost are counted in `result.missing`, which makes the result
+        not `complete`.
+        """
+        return _crawl(
+            lambda task: search(*args, page=task[1], **task[0]),
+            _Crawl(search, filters),
+            concurrency=concurrency,
+        )
+
+    def stream_search(
+        self, search: Callable[..., dict[str, Any]], /, *args: Any, **filters: Any
+    ) -> SearchStream:
+        """
+        Request the same page as `search`, one of the `search*` methods, with
+        `args` and `filters`, but decode it one doc at a time while it
+        downloads. Memory then holds one doc rather than the whole page.
+
+            with api.stream_search(api.search_car, models=[CarModel.VOLVO]) as docs:
+                for doc in docs:
+                    ...
+                paging = docs.metadata["paging"]
+
+        Streamed pages bypass the response cache.
+        """
+        url, params = _search_request(search, args, filters)
+        attempts = count()
+        timer: _Timer | None = None
+
+        def _send() -> Response:
+            nonlocal timer
+            # reported once the body is read, see `_stream_finished`
+            with _observe(
+                self.instrumentation, url, next(attempts), defer=True
+            ) as timer:
+                response = _open_stream(
+                    self._client,
+                    url=url,
+                    params=params,
+                    trace=timer.trace if timer else None,
+                )
+                if timer:
+                    timer.response = response
+                return response
+
+        def _open() -> Response:
+            if self.rate_limiter is None:
+                return _send()
+            return self.rate_limiter.call(Endpoint.from_url(url), _send)
+
+        return SearchStream(
+            _open,
+            self._convert_doc,
+            lambda *args: self._stream_finished(url, timer, *args),
+        )
+
+
+@dataclass(frozen=True)
+class AsyncBlocketAPI(_ClientConfig):
+    """
+    asyncio twin of `BlocketAPI`, built on a pooled `httpx.AsyncClient`.
+
+    Every method has the same signature as its `BlocketAPI` counterpart and
+    shares the same param building and ad parsing.
+    """
+
+    _client: httpx.AsyncClient = field(init=False, repr=False, compare=False)
+    _flights: _AsyncSingleFlight = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        object.__setattr__(self, "_client", httpx.AsyncClient(**self._client_kwargs()))
+        object.__setattr__(self, "_flights", _AsyncSingleFlight())
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _get(
+        self,
+        url: str,
+        params: list[QueryParam],
+        headers: dict[str, str] | None = None,
+    ) -> Response:
+        attempts = count()
+
+        async def _send() -> Response:
+            with _observe(self.instrumentation, url, next(attempts)) as timer:
+                response = await _arequest(
+                    self._client,
+                    url=url,
+                    params=params,
+                    headers=headers,
+                    trace=timer.atrace if timer else None,
+                )
+                if timer:
+                    timer.response = response
+                return response
+
+        if self.rate_limiter is None:
+            return await _send()
+        return await self.rate_limiter.acall(Endpoint.from_url(url), _send)
+
+    async def _search(self, url: str, params: list[QueryParam]) -> dict[str, Any]:
+        if not self.coalesce:
+            return await self._fetch_search(url, params)
+        return await self._flights.call(
+            (url, tuple(params)), lambda: self._fetch_search(url, params)
+        )
+
+    async def _fetch_search(self, url: str, params: list[QueryParam]) -> dict[str, Any]:
+        if self.cache is not None and (content := self.cache.get(url, params)):
+            return self._parse(url, "json", content, lambda: self._decode(content))
+
+        response = await self._get(url, params)
+        if self.cache is not None:
+            self.cache.set(url, params, response.content)
+        return self._parse(
+            url, "json", response.content, lambda: self._decode(response.content)
+        )
+
+    async def search(
+        self,
+        query: str,
+        *,
+        page: int = 1,
+        sort_order: SortOrder = SortOrder.RELEVANCE,
+        locations: Sequence[Location] = (),
+        category: Category | None = None,
+        sub_category: SubCategory | None = None,
+    ) -> dict[str, Any]:
+        url, params = _search_params(
+            query,
+            page=page,
+            sort_order=sort_order,
+            locations=locations,
+            category=category,
+            sub_category=sub_category,
+        )
+        return await self._search(url, params)
+
+    async def search_car(
+        self,
+        query: str | None = None,
+        *,
+        page: int = 1,
+        sort_order: CarSortOrder = CarSortOrder.RELEVANCE,
+        locations: Sequence[Location] = (),
+        models: Sequence[CarModel] = (),
+        price_from: int | None = None,
+        price_to: int | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        milage_from: int | None = None,
+        milage_to: int | None = None,
+        colors: Sequence[CarColor] = (),
+        transmissions: Sequence[CarTransmission] = (),
+        org_id: int | None = None,
+    ) -> dict[str, Any]:
+        url, params = _search_car_params(
+            query,
+            page=page,
+            sort_order=sort_order,
+            locations=locations,
+            models=models,
+            price_from=price_from,
+            price_to=price_to,
+            year_from=year_from,
+            year_to=year_to,
+            milage_from=milage_from,
+            milage_to=milage_to,
+            colors=colors,
+            transmissions=transmissions,
+            org_id=org_id,
+        )
+        return await self._search(url, params)
+
+    async def search_boat(
+        self,
+        query: str | None = None,
+        *,
+        page: int = 1,
+        sort_order: CarSortOrder = CarSortOrder.RELEVANCE,
+        types: Sequence[BoatType] = (),
+        locations: Sequence[Location] = (),
+        price_from: int | None = None,
+        price_to: int | None = None,
+        length_from: int | None = None,
+        length_to: int | None = None,
+        org_id: int | None = None,
+    ) -> Any:
+        url, params = _search_boat_params(
+            query,
+            page=page,
+            sort_order=sort_order,
+            types=types,
+            locations=locations,
+            price_from=price_from,
+            price_to=price_to,
+            length_from=length_from,
+            length_to=length_to,
+            org_id=org_id,
+        )
+        return await self._search(url, params)
+
+    async def search_mc(
         self,
         query: str | None = None,
         *,
         page: int = 1,
         sort_order: McSortOrder = McSortOrder.RELEVANCE,
-        models: list[McModel] = [],
-        types: list[McType] = [],
-        locations: list[Location] = [],
+        models: Sequence[McModel] = (),
+        types: Sequence[McType] = (),
+        locations: Sequence[Location] = (),
         price_from: int | None = None,
         price_to: int | None = None,
         engine_volume_from: int | None = None,
         engine_volume_to: int | None = None,
         org_id: int | None = None,
     ) -> dict[str, Any]:
-        url = f"{SITE_URL}/mobility/search/api/search/SEARCH_ID_MC_USED"
-
-        param_dict: dict[str, str | int | None] = {
-            "q": query,
-            "page": page,
-            "sort": sort_order.value,
-            "price_from": price_from,
-            "price_to": price_to,
-            "engine_volume_from": engine_volume_from,
-            "engine_volume_to": engine_volume_to,
-            "orgId": org_id,
-        }
+        url, params = _search_mc_params(
+            query,
+            page=page,
+            sort_order=sort_order,
+            models=models,
+            types=types,
+            locations=locations,
+            price_from=price_from,
+            price_to=price_to,
+            engine_volume_from=engine_volume_from,
+            engine_volume_to=engine_volume_to,
+            org_id=org_id,
+        )
+        return await self._search(url, params)
+
+    async def get_ad(
+        self,
+        ad: RecommerceAd | CarAd | BoatAd | McAd,
+        *,
+        fields: Collection[str] | None = None,
+        stream: bool = False,
+    ) -> dict[str, Any]:
+        """See `BlocketAPI.get_ad`."""
+        if not self.coalesce:
+            return await self._get_ad(ad, fields=fields, stream=stream)
+        return await self._flights.call(
+            self._ad_key(ad, fields, stream),
+            lambda: self._get_ad(ad, fields=fields, stream=stream),
+        )
+
+    async def _get_ad(
+        self,
+        ad: RecommerceAd | CarAd | BoatAd | McAd,
+        *,
+        fields: Collection[str] | None,
+        stream: bool,
+    ) -> dict[str, Any]:
+        if self.ad_cache is None:
+            _, data = await self._fetch_ad(ad, fields=fields, stream=stream)
+            return data
+
+        cached = self.ad_cache.get(_cache_key(ad))
+        response, data = await self._fetch_ad(
+            ad,
+            fields=None,
+            stream=stream,
+            headers=cached.conditional_headers if cached else None,
+        )
+        if cached and response.status_code == httpx.codes.NOT_MODIFIED:
+            return _select(cached.data, fields)
+
+        self.ad_cache.set(_cache_key(ad), data, response.headers)
+        return _select(data, fields)
+
+    async def _fetch_ad(
+        self,
+        ad: RecommerceAd | CarAd | BoatAd | McAd,
+        *,
+        fields: Collection[str] | None,
+        stream: bool,
+        headers: dict[str, str] | None = None,
+    ) -> tuple[Response, dict[str, Any]]:
+        if not stream:
+            response = await self._get(ad.url, [], headers)
+            if response.status_code == httpx.codes.NOT_MODIFIED:
+                return response, {}
+            return response, self._parse(
+                ad.url,
+                type(ad).__name__,
+                response.content,
+                lambda: ad.parse(response, fields=fields),
+            )
+
+        attempts = count()
+
+        async def _send() -> tuple[Response, dict[str, Any]]:
+            parser = self._timed_stream(ad, fields)
+            with _observe(self.instrumentation, ad.url, next(attempts)) as timer:
+                response, data = await _astream_request(
+                    self._client,
+                    url=ad.url,
+                    parser=parser,
+                    headers=headers,
+                    trace=timer.atrace if timer else None,
+                )
+                if timer:
+                    timer.response = response
+            self._stream_parsed(ad, parser, response)
+            return response, data
+
+        if self.rate_limiter is None:
+            response, data = await _send()
+        else:
+            response, data = await self.rate_limiter.acall(Endpoint.AD, _send)
+        return response, _select(data, fields)
+
+    async def get_ads(
+        self,
+        ads: Iterable[RecommerceAd | CarAd | BoatAd | McAd],
+        *,
+        concurrency: int | AdaptiveConcurrency = 8,
+        ordered: bool = False,
+        fields: Collection[str] | None = None,
+        stream: bool = False,
+    ) -> AsyncIterator[AdResult]:
+        """See `BlocketAPI.get_ads`."""
+        async with aclosing(
+            _abounded_map(
+                partial(self.get_ad, fields=fields, stream=stream),
+                ads,
+                concurrency=concurrency,
+                ordered=ordered,
+            )
+        ) as outcomes:
+            async for outcome in outcomes:
+                yield AdResult(outcome.item, data=outcome.value, error=outcome.error)
+
+    def iter_docs(
+        self,
+        search: Callable[..., Awaitable[dict[str, Any]]],
+        /,
+        *args: Any,
+        start_page: int = 1,
+        prefetch: int = 2,
+        **filters: Any,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """See `BlocketAPI.iter_docs`."""
+        return _aiter_docs(
+            lambda page: search(*args, page=page, **filters),
+            start_page=start_page,
+            prefetch=prefetch,
+        )
+
+    async def search_all(
+        self,
+        search: Callable[..., Awaitable[dict[str, Any]]],
+        /,
+        *args: Any,
+        concurrency: int | AdaptiveConcurrency = 8,
+        **filters: Any,
+    ) -> list[dict[str, Any]]:
+        """See `BlocketAPI.search_all`."""
+        return await _afetch_all(
+            lambda page: search(*args, page=page, **filters),
+            concurrency=concurrency,
+        )
+
+    async def crawl(
+        self,
+        search: Callable[..., Awaitable[dict[str, Any]]],
+        /,
+        *args: Any,
+        concurrency: int | AdaptiveConcurrency = 8,
+        **filters: Any,
+    ) -> CrawlResult:
+        """See `BlocketAPI.crawl`."""
+        return await _acrawl(
+            lambda task: search(*args, page=task[1], **task[0]),
+            _Crawl(search, filters),
+            concurrency=concurrency,
+        )
+
+    def stream_search(
+        self,
+        search: Callable[..., Awaitable[dict[str, Any]]],
+        /,
+        *args: Any,
+        **filters: Any,
+    ) -> AsyncSearchStream:
+        """See `BlocketAPI.stream_search`, use with `async with` and `async for`."""
+        url, params = _search_request(search, args, filters)
+        attempts = count()
+        timer: _Timer | None = None
+
+        async def _send() -> Response:
+            nonlocal timer
+            with _observe(
+                self.instrumentation, url, next(attempts), defer=True
+            ) as timer:
+                response = await _aopen_stream(
+                    self._client,
+                    url=url,
+                    params=params,
+                    trace=timer.atrace if timer else None,
+                )
+                if timer:
+                    timer.response = response
+                return response
+
+        async def _open() -> Response:
+            if self.rate_limiter is None:
+                return await _send()
+            return await self.rate_limiter.acall(Endpoint.from_url(url), _send)
 
-        params = [QueryParam(k, v) for k, v in param_dict.items() if v is not None]
+        return AsyncSearchStream(
+            _open,
+            self._convert_doc,
+            lambda *args: self._stream_finished(url, timer, *args),
+        )
 
-        params.extend(QueryParam("make", m.value) for m in models)
-        params.extend(QueryParam("location", loc.value) for loc in locations)
-        params.extend(QueryParam("type", t.value) for t in types)
 
-        return _request(url=url, params=params).json()
+def __getattr__(name: str) -> Any:
+    # the filter enums load on first use, as they do from `constants`
+    if name in _FILTERS:
+        from . import filters
 
-    def get_ad(self, ad: RecommerceAd | CarAd | BoatAd | McAd) -> dict[str, Any]:
-        response = _request(url=ad.url, params=[])
-        return ad.parse(response)
+        return getattr(filters, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Awaitable, Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+from .ad_parser import BoatAd, CarAd, McAd, RecommerceAd
+from .concurrency import AdaptiveConcurrency
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass(frozen=True)
+class _Outcome(Generic[T, R]):
+    item: T
+    value: R | None = None
+    error: Exception | None = None
+    elapsed: float = 0.0
+
+
+@dataclass(frozen=True)
+class AdResult:
+    """Result of one ad in a bulk fetch. Exactly one of `data`/`error` is set."""
+
+    ad: RecommerceAd | CarAd | BoatAd | McAd
+    data: dict[str, Any] | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _window(concurrency: int | AdaptiveConcurrency) -> tuple[Callable[[], int], int]:
+    """The current window size, and the largest window there can be."""
+    if isinstance(concurrency, AdaptiveConcurrency):
+        return (lambda: concurrency.limit), concurrency.max_limit
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    return (lambda: concurrency), concurrency
+
+
+def _record(concurrency: int | AdaptiveConcurrency, outcome: _Outcome) -> None:
+    if isinstance(concurrency, AdaptiveConcurrency):
+        concurrency.record(outcome.elapsed, outcome.error)
+
+
+def _call(fn: Callable[[T], R], item: T) -> _Outcome[T, R]:
+    start = time.perf_counter()
+    try:
+        value = fn(item)
+    except Exception as e:  # noqa: BLE001
+        return _Outcome(item, error=e, elapsed=time.perf_counter() - start)
+    return _Outcome(item, value=value, elapsed=time.perf_counter() - start)
+
+
+def _bounded_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    concurrency: int | AdaptiveConcurrency,
+    ordered: bool,
+) -> Iterator[_Outcome[T, R]]:
+    """
+    Run `fn` over `items` in a thread pool with at most `concurrency` calls in
+    flight, yielding outcomes as they complete or in input order. With an
+    `AdaptiveConcurrency` the window follows its limit.
+    """
+    window, max_workers = _window(concurrency)
+    source = iter(items)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: deque[Future[_Outcome[T, R]]] = deque()
+
+        def _fill() -> None:
+            while len(pending) < window():
+                for item in source:
+                    pending.append(executor.submit(_call, fn, item))
+                    break
+                else:
+                    return
+
+        try:
+            _fill()
+            while pending:
+                if ordered:
+                    future = pending.popleft()
+                    outcome = future.result()
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    future = next(iter(done))
+                    pending.remove(future)
+                    outcome = future.result()
+                _record(concurrency, outcome)
+                _fill()
+                yield outcome
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+async def _acall(fn: Callable[[T], Awaitable[R]], item: T) -> _Outcome[T, R]:
+    start = time.perf_counter()
+    try:
+        value = await fn(item)
+    except Exception as e:  # noqa: BLE001
+        return _Outcome(item, error=e, elapsed=time.perf_counter() - start)
+    return _Outcome(item, value=value, elapsed=time.perf_counter() - start)
+
+
+async def _abounded_map(
+    fn: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    *,
+    concurrency: int | AdaptiveConcurrency,
+    ordered: bool,
+) -> AsyncGenerator[_Outcome[T, R], None]:
+    """asyncio version of `_bounded_map`."""
+    window, _ = _window(concurrency)
+    source = iter(items)
+    pending: deque[asyncio.Task[_Outcome[T, R]]] = deque()
+
+    def _fill() -> None:
+        while len(pending) < window():
+            for item in source:
+                pending.append(asyncio.ensure_future(_acall(fn, item)))
+                break
+            else:
+                return
+
+    try:
+        _fill()
+        while pending:
+            if ordered:
+                task = pending.popleft()
+                outcome = await task
+            else:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                task = next(iter(done))
+                pending.remove(task)
+                outcome = task.result()
+            _record(concurrency, outcome)
+            _fill()
+            yield outcome
+    finally:
+        for task in pending:
+            task.cancel()
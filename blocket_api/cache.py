@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Mapping, Sequence
+from dataclasses import dataclass, field
+
+from .constants import Endpoint
+
+_CacheKey = tuple[str, tuple[Hashable, ...]]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+@dataclass
+class ResponseCache:
+    """
+    In-memory TTL + LRU cache of search response bodies, keyed on URL + params.
+
+    `ttl` is the default time to live in seconds, `ttls` overrides it per
+    search endpoint. The least recently used entries are evicted once there
+    are more than `max_entries` entries or, if set, the cached bodies exceed
+    `max_bytes` in total. Safe to share between threads.
+    """
+
+    ttl: float = 60.0
+    ttls: Mapping[Endpoint, float] = field(default_factory=dict)
+    max_entries: int = 1024
+    max_bytes: int | None = None
+    clock: Callable[[], float] = time.monotonic
+    stats: CacheStats = field(default_factory=CacheStats, init=False)
+    _entries: OrderedDict[_CacheKey, tuple[float, bytes]] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _size: int = field(default=0, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    @staticmethod
+    def _key(url: str, params: Sequence[Hashable]) -> _CacheKey:
+        return url, tuple(params)
+
+    def get(self, url: str, params: Sequence[Hashable]) -> bytes | None:
+        key = self._key(url, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            expires_at, content = entry
+            if expires_at <= self.clock():
+                self._pop(key)
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return content
+
+    def set(self, url: str, params: Sequence[Hashable], content: bytes) -> None:
+        ttl = self.ttls.get(Endpoint.from_url(url), self.ttl)
+        if ttl <= 0:
+            return
+
+        key = self._key(url, params)
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (self.clock() + ttl, content)
+            self._size += len(content)
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _pop(self, key: _CacheKey) -> None:
+        _, content = self._entries.pop(key)
+        self._size -= len(content)
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._size > self.max_bytes)
+        ):
+            _, (_, content) = self._entries.popitem(last=False)
+            self._size -= len(content)
+            self.stats.evictions += 1
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+
+import httpx
+
+from .ratelimit import RETRY_STATUS_CODES
+
+
+def _is_overload(error: Exception | None) -> bool:
+    if isinstance(error, httpx.TimeoutException):
+        return True
+    return (
+        isinstance(error, httpx.HTTPStatusError)
+        and error.response.status_code in RETRY_STATUS_CODES
+    )
+
+
+@dataclass
+class AdaptiveConcurrency:
+    """
+    AIMD (additive increase, multiplicative decrease) concurrency limit for
+    the bulk methods, pass it as their `concurrency`.
+
+    The limit grows by one for every `limit` healthy completions, and is
+    multiplied by `backoff_ratio` on throttling (429/5xx), timeouts, or when a
+    request takes more than `latency_tolerance` times the smoothed latency.
+    After a decrease, further overload signals are ignored until the requests
+    started under the old limit have completed. Read `limit` for monitoring.
+    One instance can be shared between calls and threads.
+    """
+
+    initial: int = 4
+    min_limit: int = 1
+    max_limit: int = 64
+    backoff_ratio: float = 0.5
+    latency_tolerance: float = 2.0
+    smoothing: float = 0.1
+    _limit: float = field(init=False)
+    _latency: float | None = field(default=None, init=False)
+    _since_decrease: int = field(init=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        if not 1 <= self.min_limit <= self.initial <= self.max_limit:
+            raise ValueError("Expected 1 <= min_limit <= initial <= max_limit")
+        self._limit = float(self.initial)
+        self._since_decrease = self.initial
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def latency(self) -> float | None:
+        """Smoothed latency of healthy requests, in seconds."""
+        return self._latency
+
+    def record(self, elapsed: float, error: Exception | None = None) -> None:
+        with self._lock:
+            self._since_decrease += 1
+            spike = (
+                self._latency is not None
+                and elapsed > self._latency * self.latency_tolerance
+            )
+            if _is_overload(error) or spike:
+                if self._since_decrease >= self._limit:
+                    self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+                    self._since_decrease = 0
+                if not spike:
+                    return
+
+            self._latency = (
+                elapsed
+                if self._latency is None
+                else self._latency + self.smoothing * (elapsed - self._latency)
+            )
+            if not spike:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
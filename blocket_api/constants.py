@@ -1,4 +1,19 @@
-from enum import IntEnum, StrEnum
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    # re-exported, see __getattr__
+    from .filters import (  # noqa: F401
+        BoatType,
+        CarColor,
+        CarModel,
+        CarTransmission,
+        Category,
+        Location,
+        McModel,
+        McType,
+        SubCategory,
+    )
 
 SITE_URL = "https://www.blocket.se"
 HEADERS = {
@@ -6,6 +21,21 @@ HEADERS = {
 }
 
 
+class Endpoint(StrEnum):
+    SEARCH = "SEARCH_ID_BAP_COMMON"
+    SEARCH_CAR = "SEARCH_ID_CAR_USED"
+    SEARCH_BOAT = "SEARCH_ID_BOAT_USED"
+    SEARCH_MC = "SEARCH_ID_MC_USED"
+    AD = "AD"
+
+    @classmethod
+    def from_url(cls, url: str) -> "Endpoint":
+        try:
+            return cls(url.rsplit("/", 1)[-1])
+        except ValueError:
+            return cls.AD
+
+
 class SortOrder(StrEnum):
     RELEVANCE = "RELEVANCE"
     PRICE_DESC = "PRICE_DESC"
@@ -60,458 +90,25 @@ class BoatSortOrder(StrEnum):
     YEAR_ASC = "YEAR_ASC"
 
 
-class Location(StrEnum):
-    BLEKINGE = "0.300010"
-    DALARNA = "0.300020"
-    GOTLAND = "0.300009"
-    GAVLEBORG = "0.300021"
-    HALLAND = "0.300013"
-    JAMTLAND = "0.300023"
-    JONKOPING = "0.300006"
-    KALMAR = "0.300008"
-    KRONOBERG = "0.300007"
-    NORRBOTTEN = "0.300025"
-    SKANE = "0.300012"
-    STOCKHOLM = "0.300001"
-    SODERMANLAND = "0.300004"
-    UPPSALA = "0.300003"
-    VARMLAND = "0.300017"
-    VASTERBOTTEN = "0.300024"
-    VASTERNORRLAND = "0.300022"
-    VASTMANLAND = "0.300019"
-    VASTRA_GOTALAND = "0.300014"
-    OREBRO = "0.300018"
-    OSTERGOTLAND = "0.300005"
-
-
-class Category(StrEnum):
-    AFFARSVERKSAMHET = "0.91"
-    DJUR_OCH_TILLBEHOR = "0.77"
-    ELEKTRONIK_OCH_VITVAROR = "0.93"
-    FORDONSTILLBEHOR = "0.90"
-    FRITID_HOBBY_OCH_UNDERHALLNING = "0.86"
-    FORALDRAR_OCH_BARN = "0.68"
-    KLADER_KOSMETIKA_OCH_ACCESSOARER = "0.71"
-    KONST_OCH_ANTIKT = "0.76"
-    MOBLER_OCH_INREDNING = "0.78"
-    SPORT_OCH_FRITID = "0.69"
-    TRADGARD_OCH_RENOVERING = "0.67"
-
-
-class SubCategory(StrEnum):
-    BUTIK_OCH_DETALJHANDEL = "1.91.3108"
-    CONTAINRAR_OCH_BARACKER = "1.91.3111"
-    DOMANER_OCH_SAJTER = "1.91.3106"
-    HALSA_OCH_FORSTA_HJALPEN = "1.91.8343"
-    JORDBRUK = "1.91.3114"
-    KONTORSUTRUSTNING_OCH_INREDNING = "1.91.3105"
-    LAST_OCH_TRANSPORT = "1.91.3113"
-    MASKINUTRUSTNING_OCH_RESERVDELAR = "1.91.3112"
-    SCEN = "1.91.3110"
-    STORKOK_OCH_RESTAURANG = "1.91.3103"
-    VERKSTAD_BYGG_OCH_KONSTRUKTION = "1.91.3102"
-    BILDELAR_OCH_TILLBEHOR = "1.90.82"
-    HUSVAGNS_OCH_HUSBILSDELAR = "1.90.70"
-    SLAP_OCH_TRAILER = "1.90.80"
-    BATDELAR_OCH_TILLBEHOR = "1.90.30"
-    AKVARIUM = "1.77.3976"
-    BURAR = "1.77.3977"
-    FISKAR = "1.77.5206"
-    FODER_DJURVARD_KENNLAR_OCH_STALL = "1.77.5186"
-    FAGLAR = "1.77.5205"
-    GNAGARE_OCH_KANINER = "1.77.5207"
-    HUNDAR = "1.77.5192"
-    HUNDTILLBEHOR = "1.77.5193"
-    HAST_OCH_RIDUTRUSTNING = "1.77.5195"
-    HASTAR = "1.77.5190"
-    KATTER = "1.77.5191"
-    KATTILLBEHOR = "1.77.5194"
-    LANTBRUKSDJUR = "1.77.9439"
-    REPTILER = "1.77.5210"
-    SPINDLAR_OCH_INSEKTER = "1.77.5208"
-    OVRIGA_DJUR = "1.77.5183"
-    OVRIGA_DJURTILLBEHOR = "1.77.5185"
-    DATORER = "1.93.3215"
-    FOTO_OCH_VIDEO = "1.93.3904"
-    HUSHALLSAPPARATER = "1.93.3216"
-    LJUD_OCH_BILD = "1.93.3906"
-    PERSONVARD = "1.93.9809"
-    TELEFONER_OCH_TILLBEHOR = "1.93.3217"
-    TV_SPEL_OCH_SPELKONSOLER = "1.93.3905"
-    VITVAROR = "1.93.3907"
-    ATV_RESERVDELAR = "1.90.3975"
-    MC_UTRUSTNING_OCH_RESERVDELAR = "1.90.20"
-    BILJETTER_OCH_RESOR = "1.86.7735"
-    BOCKER_OCH_TIDNINGAR = "1.86.5209"
-    HANTVERK = "1.86.7734"
-    MAT_OCH_DRYCK = "1.86.3972"
-    MODELLER_OCH_BYGGSATSER = "1.86.7732"
-    MUSIK_OCH_FILM = "1.86.3922"
-    MUSIKINSTRUMENT = "1.86.92"
-    RADIOSTYRDA_ENHETER = "1.86.7733"
-    SAMLAROBJEKT = "1.86.285"
-    SALLSKAPS_OCH_BRADSPEL = "1.86.5203"
-    BARNBOCKER = "1.68.8369"
-    BARNKLADER = "1.68.3913"
-    BARNMOBLER = "1.68.3916"
-    BARNSKOR = "1.68.3915"
-    BARNTILLBEHOR_OCH_SAKERHET = "1.68.3918"
-    BARNVAGNAR = "1.68.3914"
-    BILBARNSTOLAR_OCH_BABYSKYDD = "1.68.3911"
-    GRAVIDKLADER = "1.68.3948"
-    INREDNING_TILL_BARNRUM = "1.68.9445"
-    LEKSAKER = "1.68.3912"
-    ACCESSOARER = "1.71.9481"
-    DAMKLADER = "1.71.3941"
-    GLASOGON_OCH_SOLGLASOGON = "1.71.8344"
-    HERRKLADER = "1.71.3950"
-    HUD_HAR_OCH_KROPPSVARD = "1.71.8280"
-    KLOCKOR_OCH_ARMBANDSUR = "1.71.3945"
-    KOSMETIK = "1.71.8282"
-    MASKERADKLADER = "1.71.8349"
-    SKOR = "1.71.3949"
-    SMYCKEN_OCH_SMYCKESFORVARING = "1.71.7748"
-    VASKOR_OCH_PLANBOCKER = "1.71.3946"
-    ANTIKA_MOBLER = "1.76.5178"
-    KERAMIK_PORSLIN_OCH_GLAS = "1.76.5176"
-    KONST = "1.76.5177"
-    SILVERFOREMAL_OCH_SILVERBESTICK = "1.76.5179"
-    OVRIGA_ANTIKVITETER = "1.76.5175"
-    BORD_OCH_STOLAR = "1.78.5196"
-    DEKORATION_OCH_PRYDNADER = "1.78.5222"
-    GARDEROBER_OCH_FORVARING = "1.78.5198"
-    HYLLOR_OCH_BYRAER = "1.78.8345"
-    KOKSUTRUSTNING_OCH_PORSLIN = "1.78.5223"
-    LAMPOR = "1.78.5181"
-    MATTOR_OCH_TEXTILIER = "1.78.5180"
-    PYNT_TILL_HOGTIDER_OCH_FEST = "1.78.9760"
-    SOFFOR_OCH_FATOLJER = "1.78.7756"
-    SANGAR_OCH_MADRASSER = "1.78.5197"
-    OVRIGA_MOBLER_OCH_INREDNING = "1.78.3971"
-    BOLLSPORTER = "1.69.3961"
-    CYKEL = "1.69.3963"
-    EXTREMSPORT = "1.69.3938"
-    GOLF = "1.69.5164"
-    JAKT_FISKE_OCH_CAMPING = "1.69.3964"
-    KOSTTILLSKOTT = "1.69.8281"
-    RULLSKRIDSKOR_ISHOCKEY_OCH_KONSTAKNING = "1.69.8346"
-    SKYTTE = "1.69.3965"
-    SUPPORTERPRODUKTER = "1.69.3937"
-    TRANINGSKLOCKOR_OCH_AKTIVITETSARMBAND = "1.69.3967"
-    TRANINGSKLADER_OCH_SKOR = "1.69.3940"
-    TRANINGSUTRUSTNING = "1.69.5166"
-    VATTENSPORT = "1.69.7738"
-    VINTERSPORT = "1.69.3962"
-    OVRIGA_SPORTER = "1.69.3966"
-    BADRUM_OCH_BASTU = "1.67.7749"
-    BYGGMATERIAL_OCH_RENOVERING = "1.67.3899"
-    GARAGEDELAR_OCH_TILLBEHOR = "1.67.8348"
-    KOKSINREDNING_OCH_KOKSSTOMMAR = "1.67.3900"
-    LARM_OCH_SAKERHET = "1.67.8347"
-    TRADGARD_OCH_UTEMILJO = "1.67.3901"
-    UTRUSTNING_FOR_FRITIDSHUS = "1.67.3968"
-    VERKTYG = "1.67.5219"
-    VARME_OCH_VENTILATION = "1.67.5218"
-    OVRIGT = "1.67.3969"
-
-
-class CarModel(StrEnum):
-    ABARTH = "0.8093"
-    AC = "0.200673"
-    ACURA = "0.200674"
-    AIWAYS = "0.200681"
-    ALFA_ROMEO = "0.3233"
-    ALPINA = "0.8092"
-    AMC = "0.8103"
-    ARIEL = "0.8110"
-    ARMSTRONG_SIDDELEY = "0.1156"
-    ASTON_MARTIN = "0.6733"
-    AUDI = "0.744"
-    AUSTIN = "0.8076"
-    AUSTIN_HEALEY = "0.200688"
-    AUTO_UNION = "0.200689"
-    AUTOBIANCHI = "0.200690"
-    BEDFORD = "0.200693"
-    BENTLEY = "0.7166"
-    BMW = "0.749"
-    BUGATTI = "0.8111"
-    BUICK = "0.750"
-    BYD = "0.8101"
-    CADILLAC = "0.752"
-    CATERHAM = "0.200704"
-    CHEVROLET = "0.753"
-    CHRYSLER = "0.754"
-    CITROEN = "0.757"
-    CUPRA = "0.8106"
-    DACIA = "0.8079"
-    DAEWOO = "0.760"
-    DAF = "0.8090"
-    DAIHATSU = "0.762"
-    DAIMLER = "0.200711"
-    DATSUN = "0.8089"
-    DE_TOMASO = "0.8069"
-    DELOREAN = "0.8085"
-    DESOTO = "0.200715"
-    DFSK = "0.2174"
-    DKW = "0.200718"
-    DODGE = "0.764"
-    DS = "0.8091"
-    EDSEL = "0.200723"
-    ERSKINE = "0.200726"
-    EXCALIBUR = "0.200727"
-    FERRARI = "0.2999"
-    FIAT = "0.766"
-    FISKER = "0.8073"
-    FORD = "0.767"
-    FORDSON = "0.200730"
-    GAZ = "0.200734"
-    GINETTA = "0.200738"
-    GMC = "0.7547"
-    HEINKEL = "0.200745"
-    HILLMAN = "0.200746"
-    HOLDEN = "0.200747"
-    HONDA = "0.771"
-    HONGQI = "0.8107"
-    HUDSON = "0.200748"
-    HUMBER = "0.200749"
-    HUMMER = "0.7672"
-    HYUNDAI = "0.772"
-    INEOS = "0.2000665"
-    INFINITI = "0.8065"
-    INTERNATIONAL = "0.1160"
-    ISUZU = "0.7179"
-    IVECO = "0.7280"
-    JAC = "0.8114"
-    JAGUAR = "0.775"
-    JEEP = "0.776"
-    JENSEN = "0.774"
-    KAISER_JEEP = "0.1162"
-    KGM = "0.2000649"
-    KIA = "0.777"
-    KTM = "0.200761"
-    LADA = "0.779"
-    LAMBORGHINI = "0.6731"
-    LANCIA = "0.780"
-    LAND_ROVER = "0.781"
-    LEVC = "0.200764"
-    LEXUS = "0.782"
-    LEYLAND = "0.200765"
-    LINCOLN = "0.7153"
-    LOTUS = "0.7191"
-    LYNK_CO = "0.200769"
-    MAN = "0.8097"
-    MASERATI = "0.3001"
-    MAXUS = "0.8096"
-    MAZDA = "0.784"
-    MCLAREN = "0.8087"
-    MERCEDES_BENZ = "0.785"
-    MERCURY = "0.7554"
-    MESSERSCHMITT = "0.200774"
-    MG = "0.786"
-    MINI = "0.7147"
-    MINI_MARCOS = "0.200775"
-    MITSUBISHI = "0.787"
-    MORGAN = "0.788"
-    MORRIS = "0.789"
-    NIO = "0.8109"
-    NISSAN = "0.792"
-    OLDSMOBILE = "0.794"
-    OPEL = "0.795"
-    PACKARD = "0.8077"
-    PEUGEOT = "0.796"
-    PLYMOUTH = "0.797"
-    POLESTAR = "0.8102"
-    PONTIAC = "0.800"
-    PORSCHE = "0.801"
-    PRO_SPORT = "0.200792"
-    RADICAL = "0.8088"
-    RAM = "0.8100"
-    RENAULT = "0.804"
-    ROLLS_ROYCE = "0.7170"
-    ROVER = "0.805"
-    SAAB = "0.806"
-    SCION = "0.822"
-    SEAT = "0.807"
-    SERES = "0.8108"
-    SHELBY = "0.1142"
-    SIMCA = "0.200807"
-    SKODA = "0.808"
-    SMART = "0.7137"
-    SSANGYONG = "0.7190"
-    STANDARD = "0.200812"
-    STUDEBAKER = "0.200815"
-    SUBARU = "0.810"
-    SUZUKI = "0.811"
-    TESLA = "0.8078"
-    TOYOTA = "0.813"
-    TRABANT = "0.200824"
-    TRIUMPH = "0.814"
-    TVR = "0.820"
-    VAUXHALL = "0.200827"
-    VOLKSWAGEN = "0.817"
-    VOLVO = "0.818"
-    WILLYS = "0.200834"
-    XPENG = "0.8104"
-    ZEEKR = "0.200841"
-    ZIMMER = "0.200844"
-    OVRIGA = "0.2252"
-
-
-class CarColor(IntEnum):
-    BEIGE = 1
-    BLA = 2
-    BRONS = 3
-    BRUN = 4
-    GRA = 6
-    GRON = 5
-    GUL = 7
-    GULD = 8
-    VIT = 9
-    LILA = 10
-    ORANGE = 11
-    ROSA = 12
-    ROD = 13
-    SILVER = 15
-    SVART = 14
-    TURKOS = 16
-
-
-class CarTransmission(IntEnum):
-    AUTOMATIC = 2
-    MANUAL = 1
-
-
-class BoatType(IntEnum):
-    BOWRIDER = 7961
-    DAYCRUISER = 2184
-    FISKEBAT_ARBETSBAT = 6921
-    HYTTBAT = 7962
-    KABINBAT = 6923
-    POWERBOAT = 7960
-    RIB = 7343
-    SEGELBAT_MOTORSEGLARE = 2188
-    SMABAT_GUMMIBAT = 2186
-    SNIPA = 6922
-    STYRPULPETBAT = 3827
-    VATTENSKOTER = 2190
-    YACHT = 7959
-    ANNAT = 2258
-
-
-class McModel(IntEnum):
-    ADLY = 7902
-    AGIRRA = 8306
-    AIXAM = 8257
-    AJP = 8411
-    AJS = 1528
-    AMERICAN_IRON_HORSE = 8337
-    APRILIA = 2998
-    BAJAJ = 6722
-    BAOTIAN = 1546
-    BAROSSA = 1534
-    BENDA = 482
-    BENGHE = 7904
-    BETA = 8254
-    BIG_DOG = 8335
-    BIMOTA = 2997
-    BMW = 1481
-    BOSS_HOSS = 8008
-    BSA = 8114
-    BUELL = 7333
-    BULTACO = 7907
-    CAGIVA = 4328
-    CAKE = 8500
-    CAN_AM = 8245
-    CFMOTO = 8251
-    COBRA = 8004
-    DUCATI = 1484
-    ENDURO = 7918
-    ENERGICA = 8368
-    EUROSCOOTER = 7927
-    FANTIC = 1522
-    GASGAS = 8256
-    GILERA = 7354
-    GOES = 8310
-    HARLEY_DAVIDSON = 1486
-    HERO = 7903
-    HONDA = 1487
-    HUSABERG = 7356
-    HUSQVARNA = 7357
-    HYOSUNG = 6725
-    INDIAN = 8313
-    ITALJET = 8369
-    JAWA_CZ = 1488
-    KAWASAKI = 1489
-    KTM = 7771
-    KYMCO = 7363
-    LAMBRETTA = 8360
-    LIFAN = 8357
-    LIGIER = 8331
-    LYNX = 7920
-    MOTO_GUZZI = 1492
-    MV_AGUSTA = 7365
-    MZ = 8085
-    NIU = 8385
-    NORTON = 7367
-    OSET = 8401
-    PEUGEOT = 1494
-    PIAGGIO = 1495
-    POLARIS = 7922
-    QINGQI = 8236
-    QUADRO = 8378
-    REGAL_RAPTOR = 8210
-    RENAULT = 481
-    RIEJU = 7912
-    ROMET = 8362
-    ROYAL_ENFIELD = 8336
-    SEGWAY = 8407
-    SHERCO = 8255
-    SILENCE = 8508
-    SKI_DOO = 7926
-    SMC = 8242
-    STARK = 1192
-    SUPER_SOCO = 8388
-    SUR_RON = 8379
-    SUZUKI = 1497
-    SWM = 8394
-    SYM = 7915
-    TALARIA = 8519
-    TEN7 = 8502
-    TGB = 8205
-    THUNDER_BY_CITY_WHEELS = 8400
-    TM = 1516
-    TOMOS = 8235
-    TRIUMPH = 1500
-    URAL = 8512
-    V8_CHOPPERS = 8397
-    VERTIGO = 8408
-    VESPA = 7901
-    VIARELLI = 8366
-    VICTORY = 8317
-    VOGE = 8390
-    X_PRO = 8404
-    YADEA = 8503
-    YAMAHA = 1502
-    ZERO = 8351
-    ZONTES = 8516
-    ZUNDAPP = 7911
-    OVRIGA = 2045
-
-
-class McType(IntEnum):
-    ADVENTURE = 20
-    CHOPPER = 17
-    CROSS_ENDURO_TRIAL = 3
-    CRUISER = 16
-    CUSTOM = 4
-    KLASSISK_NAKEN = 2
-    LATT_MC = 5
-    MC_SCOOTER = 18
-    OFFROAD_MOTARD = 7
-    SPORT = 11
-    SUPERMOTO = 1547
-    TOURING = 12
-    TREHJULIG = 1549
-    TRIKE = 13
-    VETERAN = 14
-    ANNAT = 15
+# The filter enums, hundreds of members, are built on first access
+_FILTERS = frozenset(
+    {
+        "BoatType",
+        "CarColor",
+        "CarModel",
+        "CarTransmission",
+        "Category",
+        "Location",
+        "McModel",
+        "McType",
+        "SubCategory",
+    }
+)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _FILTERS:
+        from . import filters
+
+        return getattr(filters, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+from .bulk import _acall, _call, _Outcome, _record, _window
+from .concurrency import AdaptiveConcurrency
+from .pagination import _docs, _last_page, _match_count, _unique_docs
+
+# A sub-query, its filters and page, and the split it came from
+_Task = tuple[dict[str, Any], int, "_Group | None"]
+
+
+@dataclass(frozen=True)
+class CrawlResult:
+    """
+    Docs of a crawl, deduped by ad id. `match_count` is the number of ads
+    the whole query matched when it was first requested. `truncated` holds
+    the filters of sub-queries that no filter could split any further and
+    that had more ads than pagination returns. It is empty when nothing
+    was cut off.
+
+    `missing` counts the ads that splits lost: a query matched that many
+    more ads than its sub-queries together. Fanning out over an enum loses
+    ads whose value isn't a member, bisecting a range those without a
+    value. Ads published or removed during the crawl also show up here.
+    """
+
+    docs: list[dict[str, Any]]
+    match_count: int | None
+    queries: int
+    truncated: tuple[dict[str, Any], ...] = ()
+    missing: int = 0
+
+    @property
+    def complete(self) -> bool:
+        return not self.truncated and not self.missing
+
+
+class _Split(Protocol):
+    def split(self, filters: dict[str, Any]) -> list[dict[str, Any]] | None: ...
+
+
+@dataclass(frozen=True)
+class _Range:
+    """
+    Bisects the `<name>_from`/`<name>_to` filters, both inclusive. Past
+    `high` values keep doubling when `open`, else `high` is the last value.
+    """
+
+    name: str
+    low: int
+    high: int
+    open: bool = True
+
+    def split(self, filters: dict[str, Any]) -> list[dict[str, Any]] | None:
+        start, end = filters.get(f"{self.name}_from"), filters.get(f"{self.name}_to")
+        a = self.low if start is None else start
+        if end is not None:
+            b = end
+        else:
+            b = max(self.high, 2 * a) if self.open else self.high
+        if a >= b:
+            return None
+        middle = (a + b) // 2
+        return [
+            {**filters, f"{self.name}_to": middle},
+            {**filters, f"{self.name}_from": middle + 1},
+        ]
+
+
+@dataclass(frozen=True)
+class _Values:
+    """Fans a list filter out to one value each, every member when empty."""
+
+    name: str
+    members: Iterable[Any]
+
+    def split(self, filters: dict[str, Any]) -> list[dict[str, Any]] | None:
+        values = list(filters.get(self.name) or self.members)
+        if len(values) < 2:
+            return None
+        return [{**filters, self.name: [value]} for value in values]
+
+
+def _splits(search: str) -> list[_Split]:
+    """
+    How to split a query of the `search` method, in order of preference.
+    Ranges come first, they split evenly and keep every ad with a value.
+    Fanning out over enum members loses ads whose value isn't a member.
+    """
+    # the filter enums are only imported once a crawl needs them
+    from .filters import CarModel, Location, McModel
+
+    price = _Range("price", 0, 1_000_000)
+    locations = _Values("locations", Location)
+    if search == "search_car":
+        year = _Range("year", 1950, datetime.date.today().year + 1, open=False)
+        milage = _Range("milage", 0, 50_000)
+        return [price, year, milage, locations, _Values("models", CarModel)]
+    if search == "search_boat":
+        return [price, _Range("length", 0, 100), locations]
+    if search == "search_mc":
+        engine_volume = _Range("engine_volume", 0, 2_000)
+        return [price, engine_volume, locations, _Values("models", McModel)]
+    if search == "search":
+        return [locations]
+    raise ValueError(f"Not a search method: {search!r}")
+
+
+class _Group:
+    """The sub-queries one query was split into, and how many ads they match."""
+
+    def __init__(self, count: int, children: int) -> None:
+        self.count = count
+        self.left = children
+        self.found: int | None = 0
+
+    def take(self, count: int | None) -> int:
+        """Adds a child's match count, returns the ads lost once all are in."""
+        self.left -= 1
+        self.found = None if count is None or self.found is None else self.found + count
+        if self.left or self.found is None:
+            return 0
+        return max(0, self.count - self.found)
+
+
+class _Crawl:
+    """
+    Which sub-queries and pages are left to fetch. A query whose first page
+    shows more ads than its pages can hold is split into disjoint ones, with
+    the first filter that can still split it, and so on down. Shared by the
+    sync and asyncio crawls, not thread safe.
+    """
+
+    def __init__(self, search: Callable[..., Any], filters: dict[str, Any]) -> None:
+        if "page" in filters:
+            raise ValueError("A crawl sets its own page")
+        self.splits = _splits(getattr(search, "__name__", ""))
+        self.todo: deque[_Task] = deque([(filters, 1, None)])
+        self.pages: list[list[dict[str, Any]]] = []
+        self.truncated: list[dict[str, Any]] = []
+        self.match_count: int | None = None
+        self.queries = 0
+        self.missing = 0
+
+    def take(self, task: _Task, result: dict[str, Any]) -> None:
+        filters, page, group = task
+        docs = _docs(result)
+        self.pages.append(docs)
+        last = _last_page(result)
+        if page == 1:
+            self.queries += 1
+            count = _match_count(result)
+            if self.queries == 1:
+                self.match_count = count
+            if group is not None:
+                self.missing += group.take(count)
+            if count is not None and last is not None and count > last * len(docs):
+                if children := self._split(filters):
+                    split = _Group(count, len(children))
+                    self.todo.extend((child, 1, split) for child in children)
+                    return
+                self.truncated.append(filters)
+            if last is not None:
+                self.todo.extend((filters, page, None) for page in range(2, last + 1))
+                return
+        if docs and last is None:
+            # no paging metadata, walk on until an empty page
+            self.todo.append((filters, page + 1, None))
+
+    def _split(self, filters: dict[str, Any]) -> list[dict[str, Any]] | None:
+        for split in self.splits:
+            if children := split.split(filters):
+                return children
+        return None
+
+    def result(self) -> CrawlResult:
+        return CrawlResult(
+            _unique_docs(self.pages),
+            self.match_count,
+            self.queries,
+            tuple(self.truncated),
+            self.missing,
+        )
+
+
+def _crawl(
+    fetch: Callable[[_Task], dict[str, Any]],
+    crawl: _Crawl,
+    *,
+    concurrency: int | AdaptiveConcurrency,
+) -> CrawlResult:
+    """
+    Run the crawl's queries and pages in a thread pool, at most `concurrency`
+    at a time, starting the ones it finds as soon as there is room.
+    """
+    window, max_workers = _window(concurrency)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: set[Future[_Outcome[_Task, dict[str, Any]]]] = set()
+        try:
+            while crawl.todo or pending:
+                while crawl.todo and len(pending) < window():
+                    task = crawl.todo.popleft()
+                    pending.add(executor.submit(_call, fetch, task))
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    outcome = future.result()
+                    _record(concurrency, outcome)
+                    if outcome.error:
+                        raise outcome.error
+                    assert outcome.value is not None
+                    crawl.take(outcome.item, outcome.value)
+        finally:
+            for future in pending:
+                future.cancel()
+    return crawl.result()
+
+
+async def _acrawl(
+    fetch: Callable[[_Task], Awaitable[dict[str, Any]]],
+    crawl: _Crawl,
+    *,
+    concurrency: int | AdaptiveConcurrency,
+) -> CrawlResult:
+    """asyncio version of `_crawl`."""
+    window, _ = _window(concurrency)
+    pending: set[asyncio.Task[_Outcome[_Task, dict[str, Any]]]] = set()
+    try:
+        while crawl.todo or pending:
+            while crawl.todo and len(pending) < window():
+                task = crawl.todo.popleft()
+                pending.add(asyncio.ensure_future(_acall(fetch, task)))
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for future in done:
+                outcome = future.result()
+                _record(concurrency, outcome)
+                if outcome.error:
+                    raise outcome.error
+                assert outcome.value is not None
+                crawl.take(outcome.item, outcome.value)
+    finally:
+        for future in pending:
+            future.cancel()
+    return crawl.result()
@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import codecs
+import json
+import math
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import cache
+from importlib.util import find_spec
+from typing import Any
+
+# Fastest first
+_JSON_BACKENDS = ("orjson", "msgspec", "json")
+
+
+def _available_json_backends() -> list[str]:
+    """Installed JSON backends for search responses, fastest first."""
+    return [
+        backend
+        for backend in _JSON_BACKENDS
+        if backend == "json" or find_spec(backend) is not None
+    ]
+
+
+def _location(location: Any) -> str | None:
+    return location if isinstance(location, str) else None
+
+
+def _integer(value: Any) -> int | None:
+    """An integer field, also when sent as a float or a numeric string."""
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            return None
+    if isinstance(value, bool) or not isinstance(value, int | float):
+        return None
+    if isinstance(value, float):
+        return int(value) if math.isfinite(value) else None
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class SearchDoc:
+    """
+    Compact typed search result, what `typed_docs` decodes `docs` into
+    instead of dicts. `price` is the amount and `timestamp` is in
+    milliseconds since the epoch, both ints, also when the API sends a float
+    or a numeric string. Typed pages only hold `docs` and `metadata`.
+    """
+
+    id: str
+    heading: str | None = None
+    price: int | None = None
+    location: str | None = None
+    timestamp: int | None = None
+    canonical_url: str | None = None
+
+    @classmethod
+    def from_dict(cls, doc: dict[str, Any]) -> SearchDoc:
+        price = doc.get("price")
+        return cls(
+            id=str(doc["id"]),
+            heading=doc.get("heading"),
+            price=_integer(price.get("amount")) if isinstance(price, dict) else None,
+            location=_location(doc.get("location")),
+            timestamp=_integer(doc.get("timestamp")),
+            canonical_url=doc.get("canonical_url"),
+        )
+
+
+def _typed_page(page: Any) -> dict[str, Any]:
+    if not isinstance(page, dict):
+        return page
+    return {
+        "docs": [SearchDoc.from_dict(doc) for doc in page.get("docs") or []],
+        "metadata": page.get("metadata"),
+    }
+
+
+@cache
+def _msgspec_types() -> tuple[Any, Any]:
+    """
+    Page and doc structs declaring only what `SearchDoc` holds. The numbers
+    take any value, `_from_struct` normalises them like `from_dict` does.
+    """
+    import msgspec
+
+    price_type = msgspec.defstruct("_Price", [("amount", Any, None)])
+    doc_type: Any = msgspec.defstruct(
+        "_Doc",
+        [
+            ("id", str | int),
+            ("heading", str | None, None),
+            ("price", price_type | None, None),
+            ("location", Any, None),
+            ("timestamp", Any, None),
+            ("canonical_url", str | None, None),
+        ],
+    )
+    page_type = msgspec.defstruct(
+        "_Page",
+        [
+            ("docs", list[doc_type] | None, None),
+            ("metadata", dict[str, Any] | None, None),
+        ],
+    )
+    return page_type, doc_type
+
+
+def _from_struct(doc: Any) -> SearchDoc:
+    return SearchDoc(
+        id=str(doc.id),
+        heading=doc.heading,
+        price=_integer(doc.price.amount) if doc.price else None,
+        location=_location(doc.location),
+        timestamp=_integer(doc.timestamp),
+        canonical_url=doc.canonical_url,
+    )
+
+
+def _loads(backend: str | None) -> Callable[[bytes], Any]:
+    backend = backend or _available_json_backends()[0]
+    if backend == "orjson":
+        import orjson
+
+        return orjson.loads
+    if backend == "msgspec":
+        import msgspec
+
+        return msgspec.json.Decoder().decode
+    if backend == "json":
+        return json.loads
+    raise ValueError(f"Unknown JSON backend: {backend}")
+
+
+def _json_decoder(
+    backend: str | None = None, *, typed: bool = False
+) -> Callable[[bytes], Any]:
+    """Decoder for search response bodies, `None` picks the fastest installed."""
+    loads = _loads(backend)
+    if not typed:
+        return loads
+
+    if (backend or _available_json_backends()[0]) != "msgspec":
+        return lambda content: _typed_page(loads(content))
+
+    # msgspec skips everything the structs don't declare while decoding
+    import msgspec
+
+    decoder = msgspec.json.Decoder(_msgspec_types()[0])
+
+    def _decode(content: bytes) -> dict[str, Any]:
+        page = decoder.decode(content)
+        return {
+            "docs": [_from_struct(doc) for doc in page.docs or []],
+            "metadata": page.metadata,
+        }
+
+    return _decode
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_SCALAR_END = re.compile(r"[ \t\n\r,:\]}]")
+_STRING_SPECIAL = re.compile(r'["\\]')
+_STRUCTURE = re.compile(r'[{}\[\]"]')
+
+
+def _skip_whitespace(text: str, index: int) -> int:
+    match = _WHITESPACE.match(text, index)
+    return match.end() if match else index
+
+
+class _ValueScanner:
+    """
+    Finds where a JSON value ends in text that arrives in pieces. The bracket
+    depth, and whether it is inside a string or right after a backslash, carry
+    over from one piece to the next, so every character is scanned once.
+    """
+
+    def __init__(self) -> None:
+        self._started = False
+        self._scalar = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def scan(self, text: str, index: int) -> int | None:
+        """
+        Where the value, continued at `index`, ends in `text`, or `None` if
+        it goes on in the next piece. A number ends at the delimiter after it,
+        it could otherwise still continue.
+        """
+        if not self._started:
+            self._started = True
+            char = text[index]
+            if char in "{[":
+                self._depth = 1
+                index += 1
+            elif char == '"':
+                self._in_string = True
+                index += 1
+            else:
+                self._scalar = True
+        if self._scalar:
+            match = _SCALAR_END.search(text, index)
+            return match.start() if match else None
+
+        while True:
+            if self._escape:
+                if index >= len(text):
+                    return None
+                self._escape = False
+                index += 1
+            if self._in_string:
+                if not (match := _STRING_SPECIAL.search(text, index)):
+                    return None
+                index = match.end()
+                if match.group() == "\\":
+                    self._escape = True
+                    continue
+                self._in_string = False
+                if self._depth == 0:
+                    return index
+                continue
+            if not (match := _STRUCTURE.search(text, index)):
+                return None
+            index = match.end()
+            char = match.group()
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    return index
+
+
+class _DocStream:
+    """
+    Incremental decoder of a search response body, fed as it downloads. Each
+    doc is decoded once its closing bracket arrives and dropped right after,
+    so only one doc, or one other top level member, is held at a time. Of the
+    other members only `metadata` is decoded, the rest are skipped.
+
+    Values are delimited by `_ValueScanner`, which picks up where the previous
+    chunk left off, so a page costs the same however it is chunked. The
+    configured JSON backend can't tell where a value ends in a partial
+    document, complete values are decoded with the stdlib.
+    """
+
+    def __init__(self, convert_doc: Callable[[dict[str, Any]], Any]) -> None:
+        self.convert_doc = convert_doc
+        self.metadata: dict[str, Any] | None = None
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._state = "start"
+        self._key: str | None = None
+        # The value in progress, its scanner and the text of it so far
+        self._scanner: _ValueScanner | None = None
+        self._pending: list[str] = []
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """Returns the docs completed by `chunk`."""
+        text = self._decoder.decode(chunk)
+        docs: list[Any] = []
+        index = 0
+        if self._scanner is not None:
+            if (end := self._scanner.scan(text, 0)) is None:
+                self._pending.append(text)
+                return docs
+            self._pending.append(text[:end])
+            self._value("".join(self._pending), docs)
+            index = end
+
+        while (index := _skip_whitespace(text, index)) < len(text):
+            state = self._state
+            char = text[index]
+            if state == "start":
+                if char != "{":
+                    raise ValueError("Expected a JSON object")
+                index += 1
+                self._state = "key"
+            elif state == "key" and char == "}":
+                index += 1
+                self._state = "end"
+            elif state == "colon":
+                if char != ":":
+                    raise ValueError("Expected ':' in JSON object")
+                index += 1
+                self._state = "value"
+            elif state == "value" and self._key == "docs" and char == "[":
+                index += 1
+                self._state = "docs"
+            elif state == "docs" and char == "]":
+                index += 1
+                self._state = "member"
+            elif state in ("key", "value", "docs"):
+                if state == "key" and char != '"':
+                    raise ValueError("Expected a key in JSON object")
+                scanner = _ValueScanner()
+                if (end := scanner.scan(text, index)) is None:
+                    self._scanner = scanner
+                    self._pending = [text[index:]]
+                    break
+                self._value(text[index:end], docs)
+                index = end
+            elif state == "doc" and char in ",]":
+                index += 1
+                self._state = "docs" if char == "," else "member"
+            elif state == "member" and char in ",}":
+                index += 1
+                self._state = "key" if char == "," else "end"
+            else:
+                raise ValueError(f"Unexpected {char!r} in search response")
+        return docs
+
+    def _value(self, text: str, docs: list[Any]) -> None:
+        """Takes a complete key, doc or member value."""
+        self._scanner = None
+        self._pending = []
+        if self._state == "key":
+            self._key = json.loads(text)
+            self._state = "colon"
+        elif self._state == "docs":
+            docs.append(self.convert_doc(json.loads(text)))
+            self._state = "doc"
+        else:
+            if self._key == "metadata":
+                self.metadata = json.loads(text)
+            self._state = "member"
+
+    def close(self) -> None:
+        if (
+            self._state != "end"
+            or self._scanner is not None
+            or self._decoder.decode(b"", final=True)
+        ):
+            raise ValueError("Incomplete search response")
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections.abc import Iterable, Iterator
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .decoding import SearchDoc
+from .filters import CarModel, McModel
+
+if TYPE_CHECKING:
+    import numpy
+    import pyarrow  # type: ignore[import-untyped]
+
+_COLUMNS = ("id", "price", "year", "mileage", "location", "make", "published")
+
+_NOT_ALNUM = re.compile(r"[^A-Z0-9]+")
+
+
+def _member_name(make: str) -> str:
+    """ "Citroën" -> "CITROEN", "Lynk & Co" -> "LYNK_CO"."""
+    ascii_make = unicodedata.normalize("NFKD", make).encode("ascii", "ignore")
+    return _NOT_ALNUM.sub("_", ascii_make.decode().upper()).strip("_")
+
+
+@cache
+def _make_codes(models: type[CarModel | McModel]) -> dict[str, str]:
+    return {member.name: str(member.value) for member in models}
+
+
+def _int(value: Any) -> int | None:
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def _columns(
+    docs: Iterable[dict[str, Any] | SearchDoc],
+    models: type[CarModel | McModel],
+) -> dict[str, list[Any]]:
+    codes = _make_codes(models)
+    columns: dict[str, list[Any]] = {name: [] for name in _COLUMNS}
+    ids, prices, years, mileages, locations, makes, published = columns.values()
+    for doc in docs:
+        if isinstance(doc, SearchDoc):
+            ids.append(int(doc.id))
+            prices.append(doc.price)
+            years.append(None)
+            mileages.append(None)
+            locations.append(doc.location)
+            makes.append(None)
+            published.append(doc.timestamp)
+            continue
+
+        price = doc.get("price")
+        location = doc.get("location")
+        make = doc.get("make")
+        ids.append(int(doc["id"]))
+        prices.append(_int(price.get("amount")) if isinstance(price, dict) else None)
+        years.append(_int(doc.get("year")))
+        mileages.append(_int(doc.get("mileage")))
+        locations.append(location if isinstance(location, str) else None)
+        makes.append(codes.get(_member_name(make)) if isinstance(make, str) else None)
+        published.append(_int(doc.get("timestamp")))
+    return columns
+
+
+def _chunks(
+    docs: Iterable[dict[str, Any] | SearchDoc], batch_size: int
+) -> Iterator[list[dict[str, Any] | SearchDoc]]:
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    chunk: list[dict[str, Any] | SearchDoc] = []
+    for doc in docs:
+        chunk.append(doc)
+        if len(chunk) == batch_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def arrow_schema() -> pyarrow.Schema:
+    """
+    Schema of the exported batches. `price`, `year` and `mileage` are
+    integers, `published` is the ad's timestamp. `make` is the `CarModel` or
+    `McModel` value, as a string so that one column holds either.
+    """
+    import pyarrow
+
+    return pyarrow.schema(
+        [
+            ("id", pyarrow.int64()),
+            ("price", pyarrow.int64()),
+            ("year", pyarrow.int16()),
+            ("mileage", pyarrow.int32()),
+            ("location", pyarrow.dictionary(pyarrow.int32(), pyarrow.string())),
+            ("make", pyarrow.dictionary(pyarrow.int32(), pyarrow.string())),
+            ("published", pyarrow.timestamp("ms", tz="UTC")),
+        ]
+    )
+
+
+def iter_batches(
+    docs: Iterable[dict[str, Any] | SearchDoc],
+    *,
+    models: type[CarModel | McModel] = CarModel,
+    batch_size: int = 65536,
+) -> Iterator[pyarrow.RecordBatch]:
+    """
+    Arrow record batches of `batch_size` docs, read lazily from `docs`. Docs
+    are the dicts or `SearchDoc`s of any search, `models` maps their `make`
+    to a code. Fields a doc lacks are null, `SearchDoc`s only have `id`,
+    `price`, `location` and `published`. Requires `pyarrow`.
+    """
+    import pyarrow
+
+    schema = arrow_schema()
+    for chunk in _chunks(docs, batch_size):
+        columns = _columns(chunk, models)
+        yield pyarrow.RecordBatch.from_arrays(
+            [
+                pyarrow.array(columns[field.name]).cast(field.type)
+                if pyarrow.types.is_dictionary(field.type)
+                else pyarrow.array(columns[field.name], type=field.type)
+                for field in schema
+            ],
+            schema=schema,
+        )
+
+
+def to_arrow(
+    docs: Iterable[dict[str, Any] | SearchDoc],
+    *,
+    models: type[CarModel | McModel] = CarModel,
+    batch_size: int = 65536,
+) -> pyarrow.Table:
+    """All of `docs` as one Arrow table, see `iter_batches`."""
+    import pyarrow
+
+    return pyarrow.Table.from_batches(
+        iter_batches(docs, models=models, batch_size=batch_size),
+        schema=arrow_schema(),
+    )
+
+
+def to_numpy(
+    docs: Iterable[dict[str, Any] | SearchDoc],
+    *,
+    models: type[CarModel | McModel] = CarModel,
+) -> dict[str, numpy.ndarray]:
+    """
+    `docs` as one NumPy array per column, without `pyarrow`. `price`, `year`
+    and `mileage` are floats with NaN where missing, so `numpy.nanmean` and
+    friends skip them. `published` is `datetime64[ms]` with NaT where
+    missing, `id` is int64 and `location` and `make` are object arrays.
+    Requires `numpy`.
+    """
+    import numpy
+
+    columns = _columns(docs, models)
+
+    def _floats(values: list[int | None]) -> numpy.ndarray:
+        return numpy.array(
+            [numpy.nan if value is None else value for value in values],
+            dtype=numpy.float64,
+        )
+
+    return {
+        "id": numpy.array(columns["id"], dtype=numpy.int64),
+        "price": _floats(columns["price"]),
+        "year": _floats(columns["year"]),
+        "mileage": _floats(columns["mileage"]),
+        "location": numpy.array(columns["location"], dtype=object),
+        "make": numpy.array(columns["make"], dtype=object),
+        "published": numpy.array(
+            [
+                numpy.datetime64("NaT") if value is None else value
+                for value in columns["published"]
+            ],
+            dtype="datetime64[ms]",
+        ),
+    }
+
+
+def write_parquet(
+    docs: Iterable[dict[str, Any] | SearchDoc],
+    path: str | Path,
+    *,
+    models: type[CarModel | McModel] = CarModel,
+    batch_size: int = 65536,
+    compression: str = "zstd",
+) -> int:
+    """
+    Write `docs` to a Parquet file one batch at a time, so memory holds one
+    batch however many docs there are. Returns the number of rows written.
+    Pass `api.iter_docs(...)` to export a whole crawl. Requires `pyarrow`.
+    """
+    import pyarrow.parquet  # type: ignore[import-untyped]
+
+    rows = 0
+    with pyarrow.parquet.ParquetWriter(
+        path, arrow_schema(), compression=compression
+    ) as writer:
+        for batch in iter_batches(docs, models=models, batch_size=batch_size):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
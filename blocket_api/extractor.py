@@ -0,0 +1,580 @@
+from __future__ import annotations
+
+import codecs
+from collections.abc import Collection, Mapping
+from html.parser import HTMLParser
+from importlib.util import find_spec
+from typing import Any
+
+_GRID_CLASS = "grid grid-cols-1 md:grid-cols-3 md:gap-x-32"
+
+# Elements without an end tag, closed as soon as they start
+_VOID_ELEMENTS = frozenset(
+    {
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+    }
+)
+# Fields not named after a quick spec label
+_FIXED_FIELDS = frozenset(
+    {
+        "url",
+        "title",
+        "subtitle",
+        "price",
+        "description",
+        "specifications",
+        "seller_type",
+        "ad_id",
+        "equipment",
+        "location",
+    }
+)
+_FEED_SIZE = 16384
+# Strings inside these are left out of an ancestor's text, like `get_text()`
+_NON_TEXT_ELEMENTS = frozenset({"script", "style", "template", "rt", "rp"})
+
+
+class _Node:
+    """An element, kept only for as long as some extracted field refers to it."""
+
+    __slots__ = (
+        "children",
+        "class_list",
+        "classes",
+        "closed",
+        "last",
+        "next_p",
+        "order",
+        "parent",
+        "scopes",
+        "section",
+        "sole",
+        "string",
+        "style",
+        "tag",
+        "text_end",
+        "text_start",
+    )
+
+    def __init__(
+        self, tag: str, attrs: Mapping[str, str | None], order: int, text_start: int
+    ) -> None:
+        self.tag = tag
+        self.class_list = tuple((attrs.get("class") or "").split())
+        self.classes = " ".join(self.class_list)
+        self.style = attrs.get("style")
+        self.order = order
+        self.last = order
+        self.text_start = text_start
+        self.text_end = text_start
+        self.children = 0
+        self.closed = False
+        self.sole: str | None = None
+        self.string: str | None = None
+        self.parent: _Node | None = None
+        self.section: _Node | None = None
+        self.next_p: _Node | None = None
+        self.scopes = 0
+
+    def has_class(self, value: str) -> bool:
+        """Same as BeautifulSoup's `class_="..."` string match."""
+        return value in self.class_list or self.classes == value
+
+
+class _Scope:
+    """
+    An element whose descendants are searched: `slots` hold the first match of
+    each `find`, `scopes` the scopes opened on such a match and `items` the
+    scopes opened on every match of a `find_all`.
+    """
+
+    __slots__ = ("items", "kind", "scopes", "slots")
+
+    def __init__(self, kind: str) -> None:
+        self.kind = kind
+        self.slots: dict[str, _Node] = {}
+        self.scopes: dict[str, _Scope] = {}
+        self.items: list[_Scope] = []
+
+
+class _MobilityExtractor:
+    """
+    Single pass extraction of a mobility ad page.
+
+    Collects every field `MobilityAd.parse` returns from one stream of
+    start/end/data events, instead of running a `find` over a parsed tree per
+    field. The events can come from the stdlib `html.parser` or from any
+    parser supporting the lxml parser target interface. Each `find` of the
+    tree based extractors becomes a slot, filled by the first matching
+    descendant of an open scope element, and texts are read from the range of
+    page strings each element spans.
+
+    With `fields`, only the matching needed for those fields is done, and
+    `done` tells when they can no longer change so the rest of the page can
+    be skipped.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        quick_spec_mapping: Mapping[str, str],
+        extra_fields: Collection[str] = (),
+        fields: Collection[str] | None = None,
+    ) -> None:
+        self.url = url
+        self.quick_spec_mapping = quick_spec_mapping
+        self.extra_fields = extra_fields
+        self.fields = fields
+
+        def _wants(field: str) -> bool:
+            return fields is None or field in fields
+
+        self._title = _wants("title") or _wants("subtitle")
+        # quick spec keys come from the page, any unknown field may be one
+        self._quick_specs = fields is None or any(
+            field not in _FIXED_FIELDS for field in fields
+        )
+        self._price = _wants("price")
+        self._description = _wants("description")
+        self._specifications = _wants("specifications")
+        self._seller_type = _wants("seller_type")
+        self._ad_id = _wants("ad_id")
+        self._equipment = "equipment" in extra_fields and _wants("equipment")
+        self._location = "location" in extra_fields and _wants("location")
+        self._in_grid = (
+            self._title
+            or self._quick_specs
+            or self._price
+            or self._description
+            or self._specifications
+            or self._equipment
+        )
+
+        self._chunks: list[str] = []
+        self._pending: list[str] = []
+        self._order = 0
+        self._root = _Node("[document]", {}, 0, 0)
+        self._stack = [self._root]
+        self._scopes: list[_Scope] = []
+        self._non_text_depth = 0
+
+        self._grid: _Scope | None = None
+        self._grid_node: _Node | None = None
+        self._dealer = False
+        self._last_p: _Node | None = None
+        self._ad_id_label: _Node | None = None
+        self._grid_h2s: list[_Node] = []
+        self._lis: list[_Node] = []
+        self._place_h2: _Node | None = None
+
+    # lxml parser target interface
+
+    def start(self, tag: str, attrs: Mapping[str, str | None]) -> None:
+        self._flush()
+        parent = self._stack[-1]
+        parent.children += 1
+        parent.sole = None
+
+        self._order += 1
+        node = _Node(tag, attrs, self._order, len(self._chunks))
+        node.parent = parent
+        self._match(node)
+        self._stack.append(node)
+        if tag in _NON_TEXT_ELEMENTS:
+            self._non_text_depth += 1
+
+    def end(self, tag: str) -> None:
+        self._flush()
+        for i in range(len(self._stack) - 1, 0, -1):
+            if self._stack[i].tag == tag:
+                break
+        else:
+            return  # stray end tag
+        while len(self._stack) > i:
+            self._close(self._stack.pop())
+
+    def data(self, data: str) -> None:
+        self._pending.append(data)
+
+    def comment(self, text: str) -> None:
+        self._flush()
+        parent = self._stack[-1]
+        parent.children += 1
+        parent.sole = text
+
+    @property
+    def done(self) -> bool:
+        """Whether the rest of the page can't change the selected fields."""
+        if self._grid_node is None:
+            return False
+        if self._in_grid and not self._grid_node.closed:
+            return False
+        if self._seller_type and not self._dealer:
+            return False
+        if self._ad_id and not (
+            self._ad_id_label
+            and self._ad_id_label.next_p
+            and self._ad_id_label.next_p.closed
+            and not self._open("p")
+        ):
+            return False
+        if self._location and not (
+            self._place_h2
+            and self._place_h2.parent
+            and self._place_h2.parent.closed
+            and not self._open("h2")
+        ):
+            return False
+        if self._equipment and (h2 := self._equipment_h2()):
+            return h2.section is None or h2.section.closed
+        return True
+
+    def close(self) -> dict[str, Any]:
+        self._flush()
+        while len(self._stack) > 1:
+            self._close(self._stack.pop())
+        self._root.text_end = len(self._chunks)
+        return self._result()
+
+    # tree bookkeeping
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending.clear()
+
+        parent = self._stack[-1]
+        parent.children += 1
+        parent.sole = text
+        if self._non_text_depth == 0 and (stripped := text.strip()):
+            self._chunks.append(stripped)
+
+    def _open(self, tag: str) -> bool:
+        # an open element could still become the first match of a field
+        return any(node.tag == tag for node in self._stack)
+
+    def _close(self, node: _Node) -> None:
+        node.closed = True
+        node.last = self._order
+        node.text_end = len(self._chunks)
+        node.string = node.sole if node.children == 1 else None
+        if node.parent is not None and node.parent.children == 1:
+            node.parent.sole = node.string
+        if node.tag in _NON_TEXT_ELEMENTS:
+            self._non_text_depth -= 1
+        for _ in range(node.scopes):
+            self._scopes.pop()
+
+        if node.tag == "p" and node.string and "Annons-ID" in node.string:
+            if self._ad_id_label is None or node.order < self._ad_id_label.order:
+                self._ad_id_label = node
+        elif (
+            self._location
+            and node.tag == "h2"
+            and node.string
+            and "Plats" in node.string
+            and (self._place_h2 is None or node.order < self._place_h2.order)
+        ):
+            self._place_h2 = node
+
+    def _open_scope(self, node: _Node, kind: str) -> _Scope:
+        scope = _Scope(kind)
+        node.scopes += 1
+        self._scopes.append(scope)
+        return scope
+
+    def _text(self, node: _Node) -> str:
+        return "".join(self._chunks[node.text_start : node.text_end])
+
+    # matching, every element is matched once when it starts
+
+    def _match(self, node: _Node) -> None:
+        tag = node.tag
+        if tag == "div":
+            if self._seller_type and "dealer" in node.classes.lower():
+                self._dealer = True
+        elif tag == "p":
+            if self._ad_id:
+                if self._last_p is not None:
+                    self._last_p.next_p = node
+                self._last_p = node
+        elif tag == "li" and self._equipment:
+            self._lis.append(node)
+
+        if not self._scopes:
+            if self._grid is None and tag == "div" and node.has_class(_GRID_CLASS):
+                self._grid_node = node
+                if self._in_grid:
+                    self._grid = self._open_scope(node, "grid")
+                else:
+                    self._grid = _Scope("grid")
+            return
+
+        for scope in list(self._scopes):
+            slots = scope.slots
+            kind = scope.kind
+            if kind == "grid":
+                self._match_grid(scope, node)
+            elif kind == "specs_grid":
+                if tag == "div" and node.has_class("flex gap-16 hyphens-auto"):
+                    scope.items.append(self._open_scope(node, "quick_spec"))
+            elif kind == "quick_spec":
+                if tag == "span" and node.has_class("s-text-subtle"):
+                    slots.setdefault("label", node)
+                elif tag == "p" and node.has_class("m-0 font-bold"):
+                    slots.setdefault("value", node)
+            elif kind == "price":
+                if tag == "span" and node.has_class("t2"):
+                    slots.setdefault("price", node)
+            elif kind == "description":
+                if tag == "h2" and node.has_class("t3 mb-0"):
+                    slots.setdefault("h2", node)
+                elif tag == "div" and node.has_class("whitespace-pre-wrap"):
+                    slots.setdefault("description", node)
+            elif kind == "specifications":
+                if tag == "dl" and "dl" not in scope.scopes:
+                    scope.scopes["dl"] = self._open_scope(node, "dl")
+            elif kind == "dl":
+                if tag == "div" and node.style == "break-inside:avoid-column":
+                    scope.items.append(self._open_scope(node, "specification"))
+            elif kind == "specification" and tag in ("dt", "dd"):
+                slots.setdefault(tag, node)
+
+    def _match_grid(self, grid: _Scope, node: _Node) -> None:
+        slots = grid.slots
+        scopes = grid.scopes
+        tag = node.tag
+        if tag == "h1":
+            if self._title and "title" not in slots and "t1" in node.classes:
+                slots["title"] = node
+        elif tag == "p":
+            if (
+                self._title
+                and "subtitle" not in slots
+                and "s-text-subtle" in node.classes
+            ):
+                slots["subtitle"] = node
+        elif tag == "div":
+            if (
+                self._quick_specs
+                and "specs_grid" not in scopes
+                and "grid" in node.classes
+                and "gap-24" in node.classes
+            ):
+                scopes["specs_grid"] = self._open_scope(node, "specs_grid")
+            if (
+                self._price
+                and "price" not in scopes
+                and node.has_class("border-t pt-40 mt-40")
+            ):
+                scopes["price"] = self._open_scope(node, "price")
+        elif tag == "section":
+            if self._description and node.has_class("pt-40 border-t mt-40"):
+                grid.items.append(self._open_scope(node, "description"))
+            if (
+                self._specifications
+                and "specifications" not in scopes
+                and node.has_class("key-info-section")
+            ):
+                scopes["specifications"] = self._open_scope(node, "specifications")
+        elif tag == "h2" and self._equipment:
+            node.section = next(
+                (n for n in reversed(self._stack) if n.tag == "section"), None
+            )
+            self._grid_h2s.append(node)
+
+    # result, built in the same order as the tree based extractors
+
+    def _result(self) -> dict[str, Any]:
+        if self._grid is None:
+            return {}
+
+        grid = self._grid
+        data: dict[str, Any] = {"url": self.url}
+
+        if title := grid.slots.get("title"):
+            data["title"] = self._text(title)
+        if subtitle := grid.slots.get("subtitle"):
+            data["subtitle"] = self._text(subtitle)
+
+        if specs_grid := grid.scopes.get("specs_grid"):
+            for item in specs_grid.items:
+                label = item.slots.get("label")
+                value = item.slots.get("value")
+                if label and value:
+                    label_text = self._text(label)
+                    key = self.quick_spec_mapping.get(
+                        label_text, label_text.lower().replace(" ", "_")
+                    )
+                    data[key] = self._text(value)
+
+        if (price_section := grid.scopes.get("price")) and (
+            price := price_section.slots.get("price")
+        ):
+            data["price"] = self._text(price)
+
+        for section in grid.items:
+            h2 = section.slots.get("h2")
+            if h2 and "beskrivning" in self._text(h2).lower():
+                if description := section.slots.get("description"):
+                    data["description"] = self._text(description)
+                break
+
+        if (specs_section := grid.scopes.get("specifications")) and (
+            dl := specs_section.scopes.get("dl")
+        ):
+            specifications = {}
+            for item in dl.items:
+                dt = item.slots.get("dt")
+                dd = item.slots.get("dd")
+                if dt and dd:
+                    specifications[self._text(dt)] = self._text(dd)
+            if specifications:
+                data["specifications"] = specifications
+
+        if self._seller_type:
+            data["seller_type"] = "dealer" if self._dealer else "private"
+
+        if self._ad_id_label and (ad_id := self._ad_id_label.next_p):
+            data["ad_id"] = self._text(ad_id)
+
+        if self._equipment:
+            self._add_equipment(data)
+        if self._location:
+            self._add_location(data)
+
+        return data
+
+    def _equipment_h2(self) -> _Node | None:
+        return next(
+            (h2 for h2 in self._grid_h2s if h2.string and "Utrustning" in h2.string),
+            None,
+        )
+
+    def _add_equipment(self, data: dict[str, Any]) -> None:
+        if (h2 := self._equipment_h2()) and (section := h2.section):
+            items = [
+                self._text(li)
+                for li in self._lis
+                if section.order < li.order <= section.last
+            ]
+            if items:
+                data["equipment"] = items
+
+    def _add_location(self, data: dict[str, Any]) -> None:
+        if self._place_h2 and (parent := self._place_h2.parent):
+            data["location"] = self._text(parent)
+
+
+class _StdlibEvents(HTMLParser):
+    """Feeds `html.parser` events to a parser target, like BeautifulSoup does."""
+
+    def __init__(self, target: _MobilityExtractor) -> None:
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self.target.start(tag, {name: value or "" for name, value in attrs})
+        if tag in _VOID_ELEMENTS:
+            self.target.end(tag)
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self.target.start(tag, {name: value or "" for name, value in attrs})
+        self.target.end(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag not in _VOID_ELEMENTS:
+            self.target.end(tag)
+
+    def handle_data(self, data: str) -> None:
+        self.target.data(data)
+
+    def handle_comment(self, data: str) -> None:
+        self.target.comment(data)
+
+    def close(self) -> dict[str, Any]:  # type: ignore[override]
+        super().close()
+        return self.target.close()
+
+
+def _decode(content: bytes) -> str:
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        return content.decode("windows-1252", errors="replace")
+
+
+# lxml is faster, but repairs broken markup differently than BeautifulSoup,
+# so it can give another result on the odd page. html.parser matches it.
+_DEFAULT_BACKEND = "html.parser"
+
+
+def _available_backends() -> list[str]:
+    """Installed HTML backends for the mobility extractor, the default first."""
+    backends = [_DEFAULT_BACKEND]
+    if find_spec("lxml") is not None:
+        backends.append("lxml")
+    return backends
+
+
+class _MobilityStream:
+    """
+    Incremental extraction, fed the page while it downloads. `feed` returns
+    `True` once the rest of the page can't change the result.
+    """
+
+    def __init__(self, extractor: _MobilityExtractor, backend: str) -> None:
+        self.extractor = extractor
+        if backend == "lxml":
+            import lxml.etree  # type: ignore[import-untyped]
+
+            self._parser = lxml.etree.HTMLParser(target=extractor)
+        elif backend == "html.parser":
+            self._parser = _StdlibEvents(extractor)
+        else:
+            raise ValueError(f"Unknown HTML backend: {backend}")
+        # Fed as text, lxml would read undeclared encodings as latin-1
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._done = False
+
+    def feed(self, chunk: bytes) -> bool:
+        return self.feed_text(self._decoder.decode(chunk))
+
+    def feed_text(self, text: str) -> bool:
+        if not self._done:
+            self._parser.feed(text)
+            self._done = self.extractor.done
+        return self._done
+
+    def close(self) -> dict[str, Any]:
+        if self._done:
+            return self.extractor.close()
+        if tail := self._decoder.decode(b"", final=True):
+            self._parser.feed(tail)
+        return self._parser.close()
+
+
+def _extract(
+    content: bytes, extractor: _MobilityExtractor, backend: str
+) -> dict[str, Any]:
+    # Fed in chunks, so parsing stops once the fields are complete
+    stream = _MobilityStream(extractor, backend)
+    text = _decode(content)
+    for start in range(0, len(text), _FEED_SIZE):
+        if stream.feed_text(text[start : start + _FEED_SIZE]):
+            break
+    return stream.close()
@@ -0,0 +1,415 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from collections.abc import Collection, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Any, Self
+
+import httpx
+
+from .constants import Endpoint
+
+# Upper bounds in seconds, as Prometheus histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PARSE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+@dataclass(frozen=True)
+class RequestEvent:
+    """
+    One HTTP attempt, retries are separate events with `attempt` above 0.
+    `connect` covers DNS, TCP and TLS and is `None` on a reused connection,
+    `ttfb` runs to the response headers and `total` to the end of the body
+    read. `status` is `None` when no response came back.
+    """
+
+    endpoint: Endpoint
+    url: str
+    attempt: int
+    status: int | None
+    bytes: int
+    total: float
+    connect: float | None = None
+    ttfb: float | None = None
+    error: Exception | None = None
+
+
+@dataclass(frozen=True)
+class ParseEvent:
+    """Time spent parsing one response: `parser` is the ad class, or `json`."""
+
+    endpoint: Endpoint
+    parser: str
+    bytes: int
+    seconds: float
+
+
+class Instrumentation:
+    """
+    Receives an event per HTTP attempt and per parsed response. Subclass it
+    to forward events elsewhere, e.g. to OpenTelemetry, and pass it as the
+    client's `instrumentation`. Called from the requesting thread or task,
+    keep it quick.
+    """
+
+    def on_request(self, event: RequestEvent) -> None:
+        pass
+
+    def on_parse(self, event: ParseEvent) -> None:
+        pass
+
+
+class _Timer:
+    """Request timings, fed by httpcore's `trace` extension."""
+
+    def __init__(self, endpoint: Endpoint, url: str, attempt: int) -> None:
+        self.endpoint = endpoint
+        self.url = url
+        self.attempt = attempt
+        self.start = time.perf_counter()
+        self.connect_start: float | None = None
+        self.connect: float | None = None
+        self.ttfb: float | None = None
+        self.response: httpx.Response | None = None
+
+    def trace(self, name: str, info: dict[str, Any]) -> None:
+        if name == "connection.connect_tcp.started":
+            self.connect_start = time.perf_counter()
+        elif self.connect_start is not None and name in (
+            "connection.connect_tcp.complete",
+            "connection.start_tls.complete",
+        ):
+            self.connect = time.perf_counter() - self.connect_start
+        elif name.endswith(".receive_response_headers.complete"):
+            self.ttfb = time.perf_counter() - self.start
+
+    async def atrace(self, name: str, info: dict[str, Any]) -> None:
+        self.trace(name, info)
+
+    def event(self, error: Exception | None = None) -> RequestEvent:
+        response = self.response
+        return RequestEvent(
+            endpoint=self.endpoint,
+            url=self.url,
+            attempt=self.attempt,
+            status=response.status_code if response is not None else None,
+            bytes=response.num_bytes_downloaded if response is not None else 0,
+            total=time.perf_counter() - self.start,
+            connect=self.connect,
+            ttfb=self.ttfb,
+            error=error,
+        )
+
+
+@contextmanager
+def _observe(
+    instrumentation: Instrumentation | None,
+    url: str,
+    attempt: int,
+    *,
+    defer: bool = False,
+) -> Iterator[_Timer | None]:
+    """
+    Times the request made in the block, which sets the timer's `response`,
+    and reports it, failed or not. Yields `None` when not instrumented. With
+    `defer`, a request that succeeds is left for the caller to report, once
+    the body it streams is read.
+    """
+    if instrumentation is None:
+        yield None
+        return
+
+    timer = _Timer(Endpoint.from_url(url), url, attempt)
+    try:
+        yield timer
+    except httpx.HTTPStatusError as e:
+        timer.response = e.response
+        instrumentation.on_request(timer.event(e))
+        raise
+    except Exception as e:
+        instrumentation.on_request(timer.event(e))
+        raise
+    if not defer:
+        instrumentation.on_request(timer.event())
+
+
+class _TimedParser:
+    """Wraps an incremental parser, adding up the time spent in it."""
+
+    def __init__(self, parser: Any) -> None:
+        self.parser = parser
+        self.seconds = 0.0
+
+    def feed(self, chunk: bytes) -> bool:
+        start = time.perf_counter()
+        try:
+            return self.parser.feed(chunk)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+    def close(self) -> dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            return self.parser.close()
+        finally:
+            self.seconds += time.perf_counter() - start
+
+
+class _Histogram:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        cumulative, running = {}, 0
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            running += count
+            cumulative[bound] = running
+        return {"buckets": cumulative, "sum": self.sum, "count": self.count}
+
+
+@dataclass
+class _EndpointMetrics:
+    statuses: Counter[str] = field(default_factory=Counter)
+    retries: int = 0
+    bytes: int = 0
+    latency: dict[str, _Histogram] = field(
+        default_factory=lambda: {
+            phase: _Histogram(LATENCY_BUCKETS) for phase in ("connect", "ttfb", "total")
+        }
+    )
+
+
+@dataclass
+class Metrics(Instrumentation):
+    """
+    In-memory metrics registry: per endpoint, request counts by status,
+    retries, response bytes and connect/TTFB/total latency histograms; per
+    parser, parse time histograms. Recording is a few additions under a
+    lock, cheap enough to leave on. Read it with `snapshot()`, or serve
+    `prometheus()` from a scrape endpoint. Safe to share between threads
+    and clients.
+    """
+
+    _endpoints: defaultdict[Endpoint, _EndpointMetrics] = field(
+        default_factory=lambda: defaultdict(_EndpointMetrics), init=False, repr=False
+    )
+    _parsers: defaultdict[str, _Histogram] = field(
+        default_factory=lambda: defaultdict(lambda: _Histogram(PARSE_BUCKETS)),
+        init=False,
+        repr=False,
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def on_request(self, event: RequestEvent) -> None:
+        with self._lock:
+            metrics = self._endpoints[event.endpoint]
+            metrics.statuses[str(event.status or "error")] += 1
+            metrics.retries += event.attempt > 0
+            metrics.bytes += event.bytes
+            metrics.latency["total"].observe(event.total)
+            if event.connect is not None:
+                metrics.latency["connect"].observe(event.connect)
+            if event.ttfb is not None:
+                metrics.latency["ttfb"].observe(event.ttfb)
+
+    def on_parse(self, event: ParseEvent) -> None:
+        with self._lock:
+            self._parsers[event.parser].observe(event.seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        """The recorded metrics as plain dicts, keyed by endpoint and parser."""
+        with self._lock:
+            return {
+                "requests": {
+                    endpoint.value: {
+                        "statuses": dict(metrics.statuses),
+                        "retries": metrics.retries,
+                        "bytes": metrics.bytes,
+                        "latency": {
+                            phase: histogram.snapshot()
+                            for phase, histogram in metrics.latency.items()
+                        },
+                    }
+                    for endpoint, metrics in self._endpoints.items()
+                },
+                "parse": {
+                    parser: histogram.snapshot()
+                    for parser, histogram in self._parsers.items()
+                },
+            }
+
+    def prometheus(self, prefix: str = "blocket") -> str:
+        """The metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        requests, parse = snapshot["requests"], snapshot["parse"]
+        lines = [f"# TYPE {prefix}_requests_total counter"]
+        for endpoint, metrics in requests.items():
+            for status, count in metrics["statuses"].items():
+                lines.append(
+                    f'{prefix}_requests_total{{endpoint="{endpoint}",'
+                    f'status="{status}"}} {count}'
+                )
+        for name, key in (("retries", "retries"), ("response_bytes", "bytes")):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            for endpoint, metrics in requests.items():
+                lines.append(
+                    f'{prefix}_{name}_total{{endpoint="{endpoint}"}} {metrics[key]}'
+                )
+
+        def _histogram(name: str, labels: str, histogram: dict[str, Any]) -> None:
+            for bound, count in histogram["buckets"].items():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram['sum']}")
+            lines.append(f"{name}_count{{{labels}}} {histogram['count']}")
+
+        lines.append(f"# TYPE {prefix}_request_seconds histogram")
+        for endpoint, metrics in requests.items():
+            for phase, histogram in metrics["latency"].items():
+                _histogram(
+                    f"{prefix}_request_seconds",
+                    f'endpoint="{endpoint}",phase="{phase}"',
+                    histogram,
+                )
+        lines.append(f"# TYPE {prefix}_parse_seconds histogram")
+        for parser, histogram in parse.items():
+            _histogram(f"{prefix}_parse_seconds", f'parser="{parser}"', histogram)
+        return "\n".join(lines) + "\n"
+
+
+@dataclass
+class _StepMetrics:
+    seconds: _Histogram = field(default_factory=lambda: _Histogram(PARSE_BUCKETS))
+    max: float = 0.0
+    empty: int = 0
+
+
+class _Step:
+    """Times a parse step into `profile`, if any. Set `empty` if it found nothing."""
+
+    __slots__ = ("empty", "name", "parser", "profile", "start")
+
+    def __init__(self, profile: ParseProfile | None, parser: str, name: str) -> None:
+        self.profile = profile
+        self.parser = parser
+        self.name = name
+        self.empty = False
+        self.start = 0.0
+
+    def __enter__(self) -> Self:
+        if self.profile is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self.profile is not None and exc_type is None:
+            self.profile.record(
+                self.parser,
+                self.name,
+                time.perf_counter() - self.start,
+                empty=self.empty,
+            )
+
+
+@dataclass
+class ParseProfile:
+    """
+    Opt-in per step timings of the ad parsers, aggregated over a batch. Pass
+    it as `profile` to an ad's `parse`: the BeautifulSoup parser times the
+    soup construction and each `_extract_*` step and `extend` separately,
+    the single pass extractor, which finds every field in one walk, is
+    timed as one `extract` step. Steps that found nothing are counted as
+    empty, and the fields missing from each result are counted per parser,
+    a failed match after a markup change being the usual slow path. Read it
+    with `snapshot()` or `report()`. Safe to share between threads.
+    """
+
+    _steps: dict[tuple[str, str], _StepMetrics] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _parses: Counter[str] = field(default_factory=Counter, init=False, repr=False)
+    _missing: defaultdict[str, Counter[str]] = field(
+        default_factory=lambda: defaultdict(Counter), init=False, repr=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def record(
+        self, parser: str, step: str, seconds: float, *, empty: bool = False
+    ) -> None:
+        with self._lock:
+            if (metrics := self._steps.get((parser, step))) is None:
+                metrics = self._steps[parser, step] = _StepMetrics()
+            metrics.seconds.observe(seconds)
+            metrics.max = max(metrics.max, seconds)
+            metrics.empty += empty
+
+    def record_result(self, parser: str, missing: Collection[str]) -> None:
+        """Counts one parse by `parser`, whose result lacked `missing`."""
+        with self._lock:
+            self._parses[parser] += 1
+            self._missing[parser].update(missing)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Per parser: the parse count, missing field counts and step histograms."""
+        with self._lock:
+            parsers: dict[str, Any] = {
+                parser: {"parses": count, "missing": dict(self._missing[parser])}
+                for parser, count in self._parses.items()
+            }
+            for (parser, step), metrics in self._steps.items():
+                entry = parsers.setdefault(parser, {"parses": 0, "missing": {}})
+                entry.setdefault("steps", {})[step] = {
+                    **metrics.seconds.snapshot(),
+                    "max": metrics.max,
+                    "empty": metrics.empty,
+                }
+            return parsers
+
+    def report(self) -> str:
+        """The snapshot as a table, slowest steps first."""
+        lines = [
+            (
+                f"{'parser':<14} {'step':<28} {'count':>6} {'mean ms':>9} "
+                f"{'max ms':>9} {'total ms':>10} {'empty':>6}"
+            )
+        ]
+        for parser, entry in self.snapshot().items():
+            steps = sorted(
+                entry.get("steps", {}).items(), key=lambda item: -item[1]["sum"]
+            )
+            for step, metrics in steps:
+                mean = metrics["sum"] / metrics["count"] * 1000
+                lines.append(
+                    f"{parser:<14} {step:<28} {metrics['count']:>6} {mean:>9.3f} "
+                    f"{metrics['max'] * 1000:>9.3f} {metrics['sum'] * 1000:>10.2f} "
+                    f"{metrics['empty']:>6}"
+                )
+            if missing := entry["missing"]:
+                fields = ", ".join(
+                    f"{name} {count}/{entry['parses']}"
+                    for name, count in sorted(missing.items())
+                )
+                lines.append(f"{parser:<14} missing: {fields}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+)
+from contextlib import aclosing
+from itertools import chain, count, takewhile
+from typing import Any
+
+from .bulk import _abounded_map, _bounded_map
+from .concurrency import AdaptiveConcurrency
+from .decoding import SearchDoc
+
+
+def _docs(result: dict[str, Any]) -> list[dict[str, Any]]:
+    return result.get("docs") or []
+
+
+def _last_page(result: dict[str, Any]) -> int | None:
+    """Last page number according to the search response paging metadata."""
+    paging = (result.get("metadata") or {}).get("paging") or {}
+    last = paging.get("last")
+    return int(last) if last is not None else None
+
+
+def _match_count(result: dict[str, Any]) -> int | None:
+    """Number of ads matching the search, according to the response metadata."""
+    size = (result.get("metadata") or {}).get("result_size") or {}
+    count = size.get("match_count")
+    return int(count) if count is not None else None
+
+
+def _doc_id(doc: Any) -> Any:
+    return doc.id if isinstance(doc, SearchDoc) else doc.get("id")
+
+
+def _unique_docs(pages: Iterable[list[dict[str, Any]]]) -> list[dict[str, Any]]:
+    """Flatten pages of docs, dropping repeated ad ids."""
+    seen: set[Any] = set()
+    unique = []
+    for docs in pages:
+        for doc in docs:
+            if (ad_id := _doc_id(doc)) is not None:
+                if ad_id in seen:
+                    continue
+                seen.add(ad_id)
+            unique.append(doc)
+    return unique
+
+
+def _following_pages(first: dict[str, Any], start_page: int) -> Iterator[int]:
+    """
+    Pages after `start_page`, bounded by the paging metadata of the first page.
+    Without metadata the pages are unbounded and the caller stops at the first
+    empty page.
+    """
+    pages = count(start_page + 1)
+    if (last := _last_page(first)) is None:
+        return pages
+    return takewhile(lambda page: page <= last, pages)
+
+
+def _fetch_pages(
+    fetch_page: Callable[[int], dict[str, Any]],
+    pages: Iterator[int],
+    *,
+    prefetch: int | AdaptiveConcurrency,
+) -> Iterator[dict[str, Any]]:
+    if isinstance(prefetch, int) and prefetch < 1:
+        yield from map(fetch_page, pages)
+        return
+
+    for outcome in _bounded_map(fetch_page, pages, concurrency=prefetch, ordered=True):
+        if outcome.error:
+            raise outcome.error
+        assert outcome.value is not None
+        yield outcome.value
+
+
+def _iter_docs(
+    fetch_page: Callable[[int], dict[str, Any]],
+    *,
+    start_page: int,
+    prefetch: int,
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield docs page by page, keeping up to `prefetch` following pages in
+    flight while the current page is consumed.
+    """
+    first = fetch_page(start_page)
+    if not (docs := _docs(first)):
+        return
+    pages = _following_pages(first, start_page)
+    del first
+    yield from docs
+
+    for result in _fetch_pages(fetch_page, pages, prefetch=prefetch):
+        if not (docs := _docs(result)):
+            return
+        yield from docs
+
+
+def _fetch_all(
+    fetch_page: Callable[[int], dict[str, Any]],
+    *,
+    concurrency: int | AdaptiveConcurrency,
+) -> list[dict[str, Any]]:
+    """
+    Fetch every result page. Once page 1 has told us the last page, the rest
+    are requested concurrently and merged in page order, deduped by ad id.
+    """
+    first = fetch_page(1)
+    if not (first_docs := _docs(first)):
+        return []
+    pages = _following_pages(first, 1)
+
+    if _last_page(first) is None:
+        # Unknown page count, walk the pages with read-ahead instead
+        rest = map(_docs, _fetch_pages(fetch_page, pages, prefetch=concurrency))
+        return _unique_docs(chain([first_docs], takewhile(bool, rest)))
+
+    results = {1: first_docs}
+    for outcome in _bounded_map(
+        fetch_page, pages, concurrency=concurrency, ordered=False
+    ):
+        if outcome.error:
+            raise outcome.error
+        assert outcome.value is not None
+        results[outcome.item] = _docs(outcome.value)
+
+    return _unique_docs(results[page] for page in sorted(results))
+
+
+async def _afetch_pages(
+    fetch_page: Callable[[int], Awaitable[dict[str, Any]]],
+    pages: Iterator[int],
+    *,
+    prefetch: int | AdaptiveConcurrency,
+) -> AsyncGenerator[dict[str, Any], None]:
+    if isinstance(prefetch, int) and prefetch < 1:
+        for page in pages:
+            yield await fetch_page(page)
+        return
+
+    async with aclosing(
+        _abounded_map(fetch_page, pages, concurrency=prefetch, ordered=True)
+    ) as outcomes:
+        async for outcome in outcomes:
+            if outcome.error:
+                raise outcome.error
+            assert outcome.value is not None
+            yield outcome.value
+
+
+async def _aiter_docs(
+    fetch_page: Callable[[int], Awaitable[dict[str, Any]]],
+    *,
+    start_page: int,
+    prefetch: int,
+) -> AsyncIterator[dict[str, Any]]:
+    """asyncio version of `_iter_docs`."""
+    first = await fetch_page(start_page)
+    if not (docs := _docs(first)):
+        return
+    pages = _following_pages(first, start_page)
+    del first
+    for doc in docs:
+        yield doc
+
+    async with aclosing(_afetch_pages(fetch_page, pages, prefetch=prefetch)) as results:
+        async for result in results:
+            if not (docs := _docs(result)):
+                return
+            for doc in docs:
+                yield doc
+
+
+async def _afetch_all(
+    fetch_page: Callable[[int], Awaitable[dict[str, Any]]],
+    *,
+    concurrency: int | AdaptiveConcurrency,
+) -> list[dict[str, Any]]:
+    """asyncio version of `_fetch_all`."""
+    first = await fetch_page(1)
+    if not (first_docs := _docs(first)):
+        return []
+    pages = _following_pages(first, 1)
+
+    if _last_page(first) is None:
+        # Unknown page count, walk the pages with read-ahead instead
+        walked = [first_docs]
+        async with aclosing(
+            _afetch_pages(fetch_page, pages, prefetch=concurrency)
+        ) as responses:
+            async for response in responses:
+                if not (docs := _docs(response)):
+                    break
+                walked.append(docs)
+        return _unique_docs(walked)
+
+    results = {1: first_docs}
+    async with aclosing(
+        _abounded_map(fetch_page, pages, concurrency=concurrency, ordered=False)
+    ) as outcomes:
+        async for outcome in outcomes:
+            if outcome.error:
+                raise outcome.error
+            assert outcome.value is not None
+            results[outcome.item] = _docs(outcome.value)
+
+    return _unique_docs(results[page] for page in sorted(results))
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TypeVar
+
+import httpx
+
+from .constants import Endpoint
+
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """`rate` requests per second on average, with bursts of up to `burst`."""
+
+    rate: float
+    burst: int = 1
+
+
+@dataclass
+class _TokenBucket:
+    limit: RateLimit
+    clock: Callable[[], float]
+    _tokens: float = field(init=False)
+    _updated: float = field(init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def __post_init__(self) -> None:
+        self._tokens = float(self.limit.burst)
+        self._updated = self.clock()
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            elapsed = now - self._updated
+            self._tokens = min(
+                self.limit.burst, self._tokens + elapsed * self.limit.rate
+            )
+            self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token, returning how long to wait before it may be used."""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self._tokens -= 1
+            return (self._updated - now) + max(0.0, -self._tokens) / self.limit.rate
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for `seconds`, e.g. after a `Retry-After`."""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self._updated = max(self._updated, now + seconds)
+            self._tokens = min(self._tokens, 1.0)
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    if not (value := response.headers.get("Retry-After")):
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass
+class RateLimiter:
+    """
+    Client-side token bucket rate limiter with retries for throttled requests.
+
+    Each endpoint family (recommerce search, mobility search and ad pages) has
+    its own bucket; `None` leaves that family unlimited. Responses with a
+    status in `RETRY_STATUS_CODES` are retried up to `max_retries` times. A
+    `Retry-After` header pauses the whole family for that long, otherwise the
+    retry waits a jittered exponential backoff.
+    """
+
+    recommerce_search: RateLimit | None = RateLimit(rate=5.0, burst=10)
+    mobility_search: RateLimit | None = RateLimit(rate=5.0, burst=10)
+    ad_pages: RateLimit | None = RateLimit(rate=10.0, burst=20)
+    max_retries: int = 5
+    backoff_base: float = 0.5
+    backoff_max: float = 60.0
+    clock: Callable[[], float] = time.monotonic
+    _buckets: dict[Endpoint, _TokenBucket] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        families = {
+            (Endpoint.SEARCH,): self.recommerce_search,
+            (Endpoint.SEARCH_CAR, Endpoint.SEARCH_BOAT, Endpoint.SEARCH_MC): (
+                self.mobility_search
+            ),
+            (Endpoint.AD,): self.ad_pages,
+        }
+        for endpoints, limit in families.items():
+            if limit is None:
+                continue
+            bucket = _TokenBucket(limit, self.clock)
+            self._buckets.update(dict.fromkeys(endpoints, bucket))
+
+    def _reserve(self, endpoint: Endpoint) -> float:
+        bucket = self._buckets.get(endpoint)
+        return bucket.reserve() if bucket else 0.0
+
+    def _backoff(
+        self, endpoint: Endpoint, response: httpx.Response, attempt: int
+    ) -> float:
+        jitter = random.uniform(0, self.backoff_base)
+        if (retry_after := _retry_after(response)) is not None:
+            if bucket := self._buckets.get(endpoint):
+                bucket.pause(retry_after)
+            return retry_after + jitter
+        ceiling = min(self.backoff_max, self.backoff_base * 2**attempt)
+        return random.uniform(0, ceiling) + jitter
+
+    def _should_retry(self, error: httpx.HTTPStatusError, attempt: int) -> bool:
+        return (
+            error.response.status_code in RETRY_STATUS_CODES
+            and attempt < self.max_retries
+        )
+
+    def call(self, endpoint: Endpoint, send: Callable[[], T]) -> T:
+        attempt = 0
+        while True:
+            if wait := self._reserve(endpoint):
+                time.sleep(wait)
+            try:
+                return send()
+            except httpx.HTTPStatusError as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                time.sleep(self._backoff(endpoint, e.response, attempt))
+            attempt += 1
+
+    async def acall(self, endpoint: Endpoint, send: Callable[[], Awaitable[T]]) -> T:
+        attempt = 0
+        while True:
+            if wait := self._reserve(endpoint):
+                await asyncio.sleep(wait)
+            try:
+                return await send()
+            except httpx.HTTPStatusError as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                await asyncio.sleep(self._backoff(endpoint, e.response, attempt))
+            attempt += 1
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import inspect
+import math
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlsplit
+
+from .blocket import _SEARCH_PARAMS, AsyncBlocketAPI, BlocketAPI, _search_request
+from .bulk import _acall, _call, _Outcome, _record, _window
+from .concurrency import AdaptiveConcurrency
+
+# Longest wait while searches are held back by the budget. A finishing
+# search wakes the scheduler, but a shared `AdaptiveConcurrency` can also
+# widen the budget from elsewhere.
+_RECHECK = 1.0
+
+
+@dataclass(frozen=True)
+class SavedSearch:
+    """
+    A search to run every `interval` seconds. `search` names the vertical's
+    search method, `"search"`, `"search_car"`, `"search_boat"` or
+    `"search_mc"`, called with `args` and `filters`. When more searches are
+    due than the budget allows, lower `priority` values run first.
+    """
+
+    name: str
+    search: str = "search"
+    args: tuple[Any, ...] = ()
+    filters: Mapping[str, Any] = field(default_factory=dict)
+    interval: float = 300.0
+    priority: int = 0
+
+    def __post_init__(self) -> None:
+        if self.interval <= 0:
+            raise ValueError("interval must be positive")
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    """Result of one run of a saved search. Exactly one of `data`/`error` is set."""
+
+    search: SavedSearch
+    data: dict[str, Any] | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass(eq=False)
+class _Entry:
+    search: SavedSearch
+    host: str
+    slot: int
+    due: float
+    removed: bool = False
+
+
+def _host(api: BlocketAPI | AsyncBlocketAPI, search: SavedSearch) -> str:
+    if search.search not in _SEARCH_PARAMS:
+        raise ValueError(f"Not a search method: {search.search!r}")
+    method = getattr(api, search.search)
+    url, _ = _search_request(method, search.args, dict(search.filters))
+    return urlsplit(url).netloc
+
+
+def _phase(slot: int) -> float:
+    """
+    Offset into the interval, as a fraction of it, of the search in `slot`:
+    0, 1/2, 1/4, 3/4, 1/8, ... However many slots are taken, no gap between
+    their phases is more than twice the even spacing.
+    """
+    phase, scale = 0.0, 0.5
+    while slot:
+        if slot & 1:
+            phase += scale
+        slot >>= 1
+        scale /= 2
+    return phase
+
+
+class _Schedule:
+    """
+    Which saved searches are due, and which of those the per host budget
+    lets run. Shared by the sync and asyncio schedulers, not thread safe.
+    """
+
+    def __init__(
+        self,
+        api: BlocketAPI | AsyncBlocketAPI,
+        max_in_flight: int | AdaptiveConcurrency,
+        clock: Callable[[], float],
+    ) -> None:
+        self.api = api
+        self.max_in_flight = max_in_flight
+        self.window, _ = _window(max_in_flight)
+        self.clock = clock
+        self.entries: dict[str, _Entry] = {}
+        self.waiting: list[tuple[float, int, _Entry]] = []
+        self.ready: list[tuple[int, float, int, _Entry]] = []
+        self.in_flight: dict[str, int] = {}
+        # Phase slots taken per interval, freed slots are taken again first
+        self.slots: dict[float, set[int]] = {}
+        self.sequence = 0
+
+    def add(self, search: SavedSearch) -> None:
+        host = _host(self.api, search)
+        self.remove(search.name)
+        taken = self.slots.setdefault(search.interval, set())
+        slot = min(set(range(len(taken) + 1)) - taken)
+        taken.add(slot)
+        due = self.clock() + _phase(slot) * search.interval
+        entry = _Entry(search, host, slot, due)
+        self.entries[search.name] = entry
+        self._wait(entry)
+
+    def remove(self, name: str) -> None:
+        if (entry := self.entries.pop(name, None)) is not None:
+            entry.removed = True
+            self.slots[entry.search.interval].discard(entry.slot)
+
+    def _wait(self, entry: _Entry) -> None:
+        self.sequence += 1
+        heapq.heappush(self.waiting, (entry.due, self.sequence, entry))
+
+    def take_due(self) -> list[_Entry]:
+        """Entries to start now, counted as in flight."""
+        now = self.clock()
+        while self.waiting and self.waiting[0][0] <= now:
+            _, sequence, entry = heapq.heappop(self.waiting)
+            if not entry.removed:
+                heapq.heappush(
+                    self.ready, (entry.search.priority, entry.due, sequence, entry)
+                )
+
+        started, blocked = [], []
+        while self.ready:
+            item = heapq.heappop(self.ready)
+            entry = item[-1]
+            if entry.removed:
+                continue
+            if self.in_flight.get(entry.host, 0) >= self.window():
+                blocked.append(item)
+                continue
+            self.in_flight[entry.host] = self.in_flight.get(entry.host, 0) + 1
+            started.append(entry)
+        for item in blocked:
+            heapq.heappush(self.ready, item)
+        return started
+
+    def finish(self, entry: _Entry, outcome: _Outcome) -> SearchResult:
+        self.in_flight[entry.host] -= 1
+        _record(self.max_in_flight, outcome)
+        if not entry.removed:
+            # keep to the search's phase, skipping runs that are already late
+            interval = entry.search.interval
+            missed = max(0, math.floor((self.clock() - entry.due) / interval))
+            entry.due += (missed + 1) * interval
+            self._wait(entry)
+        return SearchResult(entry.search, data=outcome.value, error=outcome.error)
+
+    def timeout(self) -> float | None:
+        """
+        Seconds until `take_due` is worth calling again, `None` if no search
+        is waiting for anything. Searches held back by the budget start once
+        a running one finishes, or the budget widens, so while there are any
+        it is at most `_RECHECK`.
+        """
+        timeout = None
+        if self.waiting:
+            timeout = max(0.0, self.waiting[0][0] - self.clock())
+        if any(not item[-1].removed for item in self.ready):
+            timeout = _RECHECK if timeout is None else min(timeout, _RECHECK)
+        return timeout
+
+
+class SearchScheduler:
+    """
+    Runs saved searches on their intervals, from one place, at a steady rate.
+
+    Each search runs at a fixed phase of its interval. Searches with the same
+    interval take evenly spaced phases, so they are spread over it instead
+    of firing together. At most `max_in_flight` searches run against each host
+    at a time; `max_in_flight` can also be an `AdaptiveConcurrency`. When
+    more are due, lower `priority` values go first and the rest wait.
+
+        scheduler = SearchScheduler(api, on_result=handle)
+        scheduler.add(
+            SavedSearch("volvo", "search_car", filters={"models": [CarModel.VOLVO]})
+        )
+        scheduler.run()
+
+    A search first runs within its first interval. `on_result` gets a
+    `SearchResult` for every run, from a worker thread. `run()` blocks until
+    `stop()` is called.
+    """
+
+    def __init__(
+        self,
+        api: BlocketAPI,
+        on_result: Callable[[SearchResult], Any],
+        *,
+        searches: Iterable[SavedSearch] = (),
+        max_in_flight: int | AdaptiveConcurrency = 4,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.api = api
+        self.on_result = on_result
+        self._schedule = _Schedule(api, max_in_flight, clock)
+        self._condition = threading.Condition()
+        self._stopped = False
+        for search in searches:
+            self.add(search)
+
+    def add(self, search: SavedSearch) -> None:
+        """Schedule `search`, replacing any saved search of the same name."""
+        with self._condition:
+            self._schedule.add(search)
+            self._condition.notify()
+
+    def remove(self, name: str) -> None:
+        with self._condition:
+            self._schedule.remove(name)
+
+    def run_pending(self) -> float | None:
+        """
+        Start the searches that are due and within budget, returns the seconds
+        until the next is due, or `None` when there is nothing to wait for.
+        """
+        with self._condition:
+            return self._run_pending()
+
+    def _run_pending(self) -> float | None:
+        # called with the lock held
+        for entry in self._schedule.take_due():
+            threading.Thread(target=self._run, args=(entry,), daemon=True).start()
+        return self._schedule.timeout()
+
+    def _run(self, entry: _Entry) -> None:
+        outcome = _call(
+            lambda search: getattr(self.api, search.search)(
+                *search.args, **search.filters
+            ),
+            entry.search,
+        )
+        with self._condition:
+            result = self._schedule.finish(entry, outcome)
+            self._condition.notify()
+        self.on_result(result)
+
+    def run(self) -> None:
+        with self._condition:
+            self._stopped = False
+            while not self._stopped:
+                # the lock is held from taking the due searches until `wait`
+                # releases it, so a search can't finish unnoticed in between
+                self._condition.wait(self._run_pending())
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+
+class AsyncSearchScheduler:
+    """See `SearchScheduler`. `on_result` may be a coroutine function."""
+
+    def __init__(
+        self,
+        api: AsyncBlocketAPI,
+        on_result: Callable[[SearchResult], Any],
+        *,
+        searches: Iterable[SavedSearch] = (),
+        max_in_flight: int | AdaptiveConcurrency = 4,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.api = api
+        self.on_result = on_result
+        self._schedule = _Schedule(api, max_in_flight, clock)
+        self._wake = asyncio.Event()
+        self._stopped = False
+        self._tasks: set[asyncio.Task[None]] = set()
+        for search in searches:
+            self.add(search)
+
+    def add(self, search: SavedSearch) -> None:
+        """See `SearchScheduler.add`."""
+        self._schedule.add(search)
+        self._wake.set()
+
+    def remove(self, name: str) -> None:
+        self._schedule.remove(name)
+
+    def run_pending(self) -> float | None:
+        """See `SearchScheduler.run_pending`, needs a running event loop."""
+        for entry in self._schedule.take_due():
+            task = asyncio.ensure_future(self._run(entry))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return self._schedule.timeout()
+
+    async def _run(self, entry: _Entry) -> None:
+        def _search(search: SavedSearch) -> Awaitable[dict[str, Any]]:
+            return getattr(self.api, search.search)(*search.args, **search.filters)
+
+        outcome = await _acall(_search, entry.search)
+        result = self._schedule.finish(entry, outcome)
+        self._wake.set()
+        if inspect.isawaitable(handled := self.on_result(result)):
+            await handled
+
+    async def run(self) -> None:
+        """Run until `stop()`, then wait for the searches in flight."""
+        self._stopped = False
+        while not self._stopped:
+            timeout = self.run_pending()
+            self._wake.clear()
+            if self._stopped:
+                break
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wake.set()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from types import TracebackType
+from typing import Any, Self
+
+from httpx import Response
+
+from .decoding import _DocStream
+
+# Called once the response is closed, with the seconds spent decoding it and
+# the error that ended the stream, if any
+_Finished = Callable[[Response, float, Exception | None], None]
+
+
+class SearchStream:
+    """
+    The docs of one search page, decoded one at a time while the response
+    downloads, see `BlocketAPI.stream_search`.
+
+    Iterate it for the docs. `metadata` is set once the response has been
+    read past it. Use as a context manager, or call `close()`, when not
+    iterating to the end.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[], Response],
+        convert_doc: Callable[[dict[str, Any]], Any],
+        finished: _Finished | None = None,
+    ) -> None:
+        self._send = send
+        self._decoder = _DocStream(convert_doc)
+        self._finished = finished
+        self._response: Response | None = None
+
+    @property
+    def metadata(self) -> dict[str, Any] | None:
+        return self._decoder.metadata
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._response is not None:
+            raise RuntimeError("A search stream can only be iterated once")
+        response = self._response = self._send()
+        seconds, error = 0.0, None
+        try:
+            for chunk in response.iter_bytes():
+                start = time.perf_counter()
+                docs = self._decoder.feed(chunk)
+                seconds += time.perf_counter() - start
+                yield from docs
+            self._decoder.close()
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            response.close()
+            if self._finished is not None:
+                self._finished(response, seconds, error)
+
+    def close(self) -> None:
+        if self._response is not None:
+            self._response.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class AsyncSearchStream:
+    """See `SearchStream`."""
+
+    def __init__(
+        self,
+        send: Callable[[], Awaitable[Response]],
+        convert_doc: Callable[[dict[str, Any]], Any],
+        finished: _Finished | None = None,
+    ) -> None:
+        self._send = send
+        self._decoder = _DocStream(convert_doc)
+        self._finished = finished
+        self._response: Response | None = None
+
+    @property
+    def metadata(self) -> dict[str, Any] | None:
+        return self._decoder.metadata
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        if self._response is not None:
+            raise RuntimeError("A search stream can only be iterated once")
+        response = self._response = await self._send()
+        seconds, error = 0.0, None
+        try:
+            async for chunk in response.aiter_bytes():
+                start = time.perf_counter()
+                docs = self._decoder.feed(chunk)
+                seconds += time.perf_counter() - start
+                for doc in docs:
+                    yield doc
+            self._decoder.close()
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            await response.aclose()
+            if self._finished is not None:
+                self._finished(response, seconds, error)
+
+    async def aclose(self) -> None:
+        if self._response is not None:
+            await self._response.aclose()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.aclose()
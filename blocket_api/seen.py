@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self, TypeAlias, TypeVar
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+from .bulk import AdResult
+from .pagination import _doc_id
+
+T = TypeVar("T")
+
+_MAGIC = b"BLKSEEN1"
+# A container holds the ids sharing their high bits. It's a sorted array of
+# the low 16 bits while sparse, and a bitmap once that's smaller.
+_ARRAY_MAX = 4096
+_BITMAP_BYTES = 1 << 13
+_HEADER = struct.Struct("<IBI")  # key, is bitmap, array length
+
+_Container: TypeAlias = "array[int] | bytearray"
+
+
+def _to_bitmap(values: Iterable[int]) -> bytearray:
+    bitmap = bytearray(_BITMAP_BYTES)
+    for low in values:
+        bitmap[low >> 3] |= 1 << (low & 7)
+    return bitmap
+
+
+def _union(a: _Container, b: _Container) -> _Container:
+    if isinstance(a, bytearray) and isinstance(b, bytearray):
+        return bytearray(x | y for x, y in zip(a, b))
+    if isinstance(a, array) and isinstance(b, array):
+        values = sorted(set(a).union(b))
+        if len(values) <= _ARRAY_MAX:
+            return array("H", values)
+        return _to_bitmap(values)
+    bitmap, sparse = (a, b) if isinstance(a, bytearray) else (b, a)
+    union = bytearray(bitmap)
+    for low in sparse:
+        union[low >> 3] |= 1 << (low & 7)
+    return union
+
+
+def _little_endian(values: array[int]) -> bytes:
+    """The file holds little endian values, swap them on other machines."""
+    if sys.byteorder == "big":
+        values = array("H", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _cardinality(container: _Container) -> int:
+    if isinstance(container, array):
+        return len(container)
+    return sum(byte.bit_count() for byte in container)
+
+
+def _ad_id(ad_id: Any) -> int:
+    value = int(ad_id)
+    if value < 0:
+        raise ValueError(f"Ad ids can't be negative: {ad_id!r}")
+    return value
+
+
+@dataclass
+class SeenIds:
+    """
+    Compact set of integer ad ids, shared by many queries to skip ads that
+    were already seen under another one. Ids are kept roaring bitmap style:
+    a sorted array of 16 bit values per block of 65536 ids, switched to an
+    8 KB bitmap once denser, so a million ids take a few MB rather than the
+    tens of MB of a `set`.
+
+    With a `path`, the ids are loaded from it and `save()`, or leaving the
+    `with` block, writes them back. Saving merges in what other processes
+    saved meanwhile. Safe to share between threads.
+    """
+
+    path: str | Path | None = None
+    _containers: dict[int, _Container] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _count: int = field(default=0, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.path is not None and os.path.exists(self.path):
+            with open(self.path, "rb") as file:
+                self._merge(self._read(file.read()))
+
+    def __contains__(self, ad_id: Any) -> bool:
+        value = _ad_id(ad_id)
+        container = self._containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & 0xFFFF
+        if isinstance(container, bytearray):
+            return bool(container[low >> 3] >> (low & 7) & 1)
+        index = bisect_left(container, low)
+        return index < len(container) and container[index] == low
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, ad_id: Any) -> bool:
+        """Adds `ad_id`, returns whether it was new."""
+        value = _ad_id(ad_id)
+        key, low = value >> 16, value & 0xFFFF
+        with self._lock:
+            container = self._containers.get(key)
+            if container is None:
+                self._containers[key] = array("H", [low])
+            elif isinstance(container, bytearray):
+                byte, bit = low >> 3, 1 << (low & 7)
+                if container[byte] & bit:
+                    return False
+                container[byte] |= bit
+            else:
+                index = bisect_left(container, low)
+                if index < len(container) and container[index] == low:
+                    return False
+                container.insert(index, low)
+                if len(container) > _ARRAY_MAX:
+                    self._containers[key] = _to_bitmap(container)
+            self._count += 1
+            return True
+
+    def unseen(self, docs: Iterable[T]) -> Iterator[T]:
+        """
+        The docs of `docs` whose ad id wasn't seen yet, marking them seen.
+        Docs are search docs, `SearchDoc`s or `AdResult`s.
+        """
+        for doc in docs:
+            ad_id = doc.ad.id if isinstance(doc, AdResult) else _doc_id(doc)
+            if self.add(ad_id):
+                yield doc
+
+    def save(self) -> None:
+        """Write the ids to `path`, merged with the ids saved there meanwhile."""
+        if self.path is None:
+            raise ValueError("SeenIds has no path to save to")
+        with open(f"{self.path}.lock", "wb") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            if os.path.exists(self.path):
+                with open(self.path, "rb") as file:
+                    self._merge(self._read(file.read()))
+            with self._lock:
+                content = self._write()
+            temporary = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as file:
+                file.write(content)
+            os.replace(temporary, self.path)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self.path is not None:
+            self.save()
+
+    def _merge(self, containers: dict[int, _Container]) -> None:
+        with self._lock:
+            for key, container in containers.items():
+                if (own := self._containers.get(key)) is not None:
+                    container = _union(own, container)
+                    self._count -= _cardinality(own)
+                self._containers[key] = container
+                self._count += _cardinality(container)
+
+    def _write(self) -> bytes:
+        parts = [_MAGIC, struct.pack("<I", len(self._containers))]
+        for key in sorted(self._containers):
+            container = self._containers[key]
+            if isinstance(container, bytearray):
+                parts += [_HEADER.pack(key, True, 0), bytes(container)]
+            else:
+                parts += [
+                    _HEADER.pack(key, False, len(container)),
+                    _little_endian(container),
+                ]
+        return b"".join(parts)
+
+    @staticmethod
+    def _read(content: bytes) -> dict[int, _Container]:
+        if not content.startswith(_MAGIC):
+            raise ValueError("Not a SeenIds file")
+        offset = len(_MAGIC)
+        (count,) = struct.unpack_from("<I", content, offset)
+        offset += 4
+        containers: dict[int, _Container] = {}
+        for _ in range(count):
+            key, is_bitmap, length = _HEADER.unpack_from(content, offset)
+            offset += _HEADER.size
+            if is_bitmap:
+                containers[key] = bytearray(content[offset : offset + _BITMAP_BYTES])
+                offset += _BITMAP_BYTES
+            else:
+                values = array("H")
+                values.frombytes(content[offset : offset + 2 * length])
+                containers[key] = array("H", _little_endian(values))
+                offset += 2 * length
+        return containers
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+from .blocket import _search_request
+from .constants import BoatSortOrder, CarSortOrder, McSortOrder, SortOrder
+from .decoding import SearchDoc
+from .pagination import _doc_id, _docs, _last_page
+from .seen import SeenIds
+
+_PUBLISHED_DESC = {
+    "search": SortOrder.PUBLISHED_DESC,
+    "search_car": CarSortOrder.PUBLISHED_DESC,
+    "search_boat": BoatSortOrder.PUBLISHED_DESC,
+    "search_mc": McSortOrder.PUBLISHED_DESC,
+}
+
+
+def _doc_timestamp(doc: Any) -> int | None:
+    timestamp = doc.timestamp if isinstance(doc, SearchDoc) else doc.get("timestamp")
+    return timestamp if isinstance(timestamp, int) else None
+
+
+@dataclass(frozen=True)
+class WatchState:
+    """
+    Where a watched query stands: the newest publish timestamp seen, and the
+    ids of the most recently seen ads, newest first.
+    """
+
+    newest: int | None = None
+    recent_ids: tuple[str, ...] = ()
+
+
+def _query(
+    search: Callable[..., Any], args: tuple[Any, ...], filters: dict[str, Any]
+) -> tuple[Callable[..., Any], Hashable]:
+    """The `search` call sorted newest first, and a key for its saved query."""
+    name = getattr(search, "__name__", "")
+    if name not in _PUBLISHED_DESC:
+        raise ValueError(f"Not a search method: {search!r}")
+    if "page" in filters or "sort_order" in filters:
+        raise ValueError("A watched search sets its own page and sort_order")
+
+    sort_order = _PUBLISHED_DESC[name]
+    url, params = _search_request(search, args, {**filters, "sort_order": sort_order})
+    key = (url, tuple((p.name, p.value) for p in params if p.name != "page"))
+
+    def _fetch_page(page: int) -> Any:
+        return search(*args, page=page, sort_order=sort_order, **filters)
+
+    return _fetch_page, key
+
+
+class _Poll:
+    """Collects the new docs of one poll, page by page."""
+
+    def __init__(self, state: WatchState | None, *, max_pages: int) -> None:
+        self.state = state
+        self.max_pages = max_pages
+        self.seen = set(state.recent_ids) if state else set()
+        self.docs: list[Any] = []
+        self.pages = 0
+
+    def take(self, result: dict[str, Any]) -> bool:
+        """Adds the new docs of the next page, returns whether to fetch another."""
+        self.pages += 1
+        if not (docs := _docs(result)):
+            if self.state is None:
+                # an empty first poll is still a baseline, all later ads are new
+                self.state = WatchState()
+            return False
+        if self.state is None:
+            # first poll of the query, only remember where it stands
+            self.state = WatchState(
+                max(filter(None, map(_doc_timestamp, docs)), default=None),
+                tuple(str(_doc_id(doc)) for doc in docs),
+            )
+            return False
+        for doc in docs:
+            timestamp = _doc_timestamp(doc)
+            if str(_doc_id(doc)) in self.seen or (
+                timestamp is not None
+                and self.state.newest is not None
+                and timestamp < self.state.newest
+            ):
+                return False
+            self.seen.add(str(_doc_id(doc)))
+            self.docs.append(doc)
+        last = _last_page(result)
+        return self.pages < self.max_pages and (last is None or self.pages < last)
+
+    def result(self, memory: int) -> tuple[list[Any], WatchState | None]:
+        if self.state is None or not self.docs:
+            return self.docs, self.state
+        timestamps = [
+            timestamp
+            for doc in self.docs
+            if (timestamp := _doc_timestamp(doc)) is not None
+        ]
+        if self.state.newest is not None:
+            timestamps.append(self.state.newest)
+        recent_ids = tuple(str(_doc_id(doc)) for doc in self.docs)
+        return self.docs, WatchState(
+            max(timestamps, default=None),
+            (recent_ids + self.state.recent_ids)[:memory],
+        )
+
+
+@dataclass
+class _Watcher:
+    max_pages: int = 10
+    memory: int = 1000
+    states: dict[Hashable, WatchState] = field(default_factory=dict)
+    seen: SeenIds | None = None
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.max_pages < 1 or self.memory < 1:
+            raise ValueError("max_pages and memory must be at least 1")
+
+    def _start(self, key: Hashable) -> _Poll:
+        with self._lock:
+            return _Poll(self.states.get(key), max_pages=self.max_pages)
+
+    def _finish(self, key: Hashable, poll: _Poll) -> list[Any]:
+        docs, state = poll.result(self.memory)
+        if state is not None:
+            with self._lock:
+                self.states[key] = state
+        if self.seen is not None:
+            docs = list(self.seen.unseen(docs))
+        return docs
+
+
+@dataclass
+class SearchWatcher(_Watcher):
+    """
+    Finds the ads published since the last poll of a saved search. Each poll
+    runs the search sorted by `PUBLISHED_DESC` and stops paginating at the
+    first ad it has already seen, so a poll costs about one page per page of
+    new ads, whatever the size of the result set.
+
+        watcher = SearchWatcher()
+        while True:
+            for doc in watcher.poll(api.search_car, models=[CarModel.VOLVO]):
+                ...
+            time.sleep(60)
+
+    Queries are told apart by their filters. The first poll of a query only
+    records where it stands and returns nothing. A poll reads at most
+    `max_pages` pages, and `memory` ad ids are remembered per query. `states`
+    holds the position of every query and can be saved and passed back in to
+    resume. With `seen`, ads another query already returned are left out. With
+    a `cache` on the client, new ads show up once the cached
+    page expires.
+    """
+
+    def poll(
+        self, search: Callable[..., dict[str, Any]], /, *args: Any, **filters: Any
+    ) -> list[Any]:
+        """New docs of `search` with `args` and `filters`, newest first."""
+        fetch_page, key = _query(search, args, filters)
+        poll = self._start(key)
+        page = 1
+        while poll.take(fetch_page(page)):
+            page += 1
+        return self._finish(key, poll)
+
+
+@dataclass
+class AsyncSearchWatcher(_Watcher):
+    """See `SearchWatcher`."""
+
+    async def poll(
+        self,
+        search: Callable[..., Awaitable[dict[str, Any]]],
+        /,
+        *args: Any,
+        **filters: Any,
+    ) -> list[Any]:
+        """See `SearchWatcher.poll`."""
+        fetch_page, key = _query(search, args, filters)
+        poll = self._start(key)
+        page = 1
+        while poll.take(await fetch_page(page)):
+            page += 1
+        return self._finish(key, poll)
@@ -0,0 +1,82 @@
+"""
+Benchmark the time `import blocket_api` takes in a fresh interpreter.
+
+    python scripts/benchmark_import.py
+    python scripts/benchmark_import.py --max-ms 150
+
+Imports the package `--runs` times, each in a new process, and reports the
+median and the modules that took longest. Exits non-zero if a module that
+should load on first use got imported, or with `--max-ms`, if the median is
+over that budget.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+# the project isn't installed as a package, import it from the checkout
+ROOT = Path(__file__).resolve().parent.parent
+
+# Loaded on first use only: the HTML soup, and the big enums and export
+LAZY_MODULES = ("bs4", "lxml", "blocket_api.filters", "blocket_api.export")
+
+
+def import_times(env: dict[str, str]) -> dict[str, tuple[int, int]]:
+    """Self and cumulative microseconds per module imported by the package."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import blocket_api"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+        cwd=ROOT,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--top", type=int, default=10, help="slowest modules shown")
+    parser.add_argument("--max-ms", type=float, help="budget for the median import")
+    args = parser.parse_args()
+
+    # the first run writes the bytecode caches, it isn't counted
+    env = {**os.environ}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    import_times(env)
+
+    totals, own = [], defaultdict(list)
+    for _ in range(args.runs):
+        times = import_times(env)
+        totals.append(times["blocket_api"][1] / 1000)
+        for name, (self_us, _) in times.items():
+            own[name].append(self_us / 1000)
+
+    median = statistics.median(totals)
+    print(f"import blocket_api: {median:.1f} ms median of {args.runs} runs")
+    print(f"{'module':<40}{'self ms':>9}")
+    slowest = sorted(own.items(), key=lambda item: -statistics.median(item[1]))
+    for name, values in slowest[: args.top]:
+        print(f"{name:<40}{statistics.median(values):>9.2f}")
+
+    if loaded := [name for name in LAZY_MODULES if name in own]:
+        print(f"❌ Imported eagerly: {', '.join(loaded)}")
+        sys.exit(1)
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"❌ Over the {args.max_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
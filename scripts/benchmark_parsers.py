@@ -0,0 +1,229 @@
+"""
+Benchmark the ad parsers and search JSON decoding over the fixture corpus.
+
+    python scripts/benchmark_parsers.py
+    python scripts/benchmark_parsers.py --save baseline.json
+    python scripts/benchmark_parsers.py --compare baseline.json
+    python scripts/benchmark_parsers.py --profile --backend soup
+
+Reports throughput (pages/s, MB/s) and peak traced memory per parser. Each
+parser runs `--repeat` times and the fastest run counts, the others are noise
+from the rest of the machine. With `--compare`, exits non-zero if any parser
+got slower than the baseline by more than `--tolerance`. `--profile` adds the time of each parsing step of the
+mobility ads and the fields they came back without.
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+# the project isn't installed as a package, run from anywhere in the checkout
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from blocket_api import BoatAd, CarAd, McAd, ParseProfile, RecommerceAd
+from blocket_api.decoding import _json_decoder
+
+CORPUS_DIR = ROOT / "tests" / "fixtures" / "corpus"
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    pattern: str
+    parse: Callable[[bytes], Any]
+
+
+@dataclass(frozen=True)
+class Result:
+    name: str
+    pages: int
+    mb: float
+    seconds: float
+    peak_kb: float
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.mb / self.seconds
+
+
+def cases(backend: str | None, json_backend: str | None) -> list[Case]:
+    def _parser(ad: RecommerceAd | CarAd | BoatAd | McAd) -> Callable[[bytes], Any]:
+        if isinstance(ad, RecommerceAd):
+            return lambda content: ad.parse(httpx.Response(200, content=content))
+        return lambda content: ad.parse(
+            httpx.Response(200, content=content), backend=backend
+        )
+
+    return [
+        Case("RecommerceAd", "recommerce_*.html", _parser(RecommerceAd(1))),
+        Case("CarAd", "car_*.html", _parser(CarAd(1))),
+        Case("BoatAd", "boat_*.html", _parser(BoatAd(1))),
+        Case("McAd", "mc_*.html", _parser(McAd(1))),
+        Case("search json", "search_*.json", _json_decoder(json_backend)),
+        Case(
+            "search typed",
+            "search_*.json",
+            _json_decoder(json_backend, typed=True),
+        ),
+    ]
+
+
+def timed(case: Case, pages: list[bytes], min_time: float) -> tuple[int, float]:
+    """Rounds over `pages` done in at least `min_time`, and the seconds taken."""
+    rounds = 0
+    start = time.perf_counter()
+    while True:
+        for content in pages:
+            case.parse(content)
+        rounds += 1
+        if (elapsed := time.perf_counter() - start) >= min_time:
+            return rounds, elapsed
+
+
+def run(case: Case, pages: list[bytes], min_time: float, repeat: int) -> Result:
+    for content in pages:  # warm up
+        case.parse(content)
+
+    rounds, elapsed = min(
+        (timed(case, pages, min_time) for _ in range(repeat)),
+        key=lambda timing: timing[1] / timing[0],
+    )
+
+    # memory is traced in a separate pass, tracing slows parsing down
+    tracemalloc.start()
+    for content in pages:
+        case.parse(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    size = sum(len(content) for content in pages)
+    return Result(
+        name=case.name,
+        pages=rounds * len(pages),
+        mb=rounds * size / 1_000_000,
+        seconds=elapsed,
+        peak_kb=peak / 1000,
+    )
+
+
+def profile(corpus: Path, backend: str | None) -> ParseProfile:
+    """Per step timings of the mobility ad parsers, over one pass of the corpus."""
+    profile = ParseProfile()
+    for pattern, ad in [
+        ("car_*.html", CarAd(1)),
+        ("boat_*.html", BoatAd(1)),
+        ("mc_*.html", McAd(1)),
+    ]:
+        for path in sorted(corpus.glob(pattern)):
+            response = httpx.Response(200, content=path.read_bytes())
+            ad.parse(response, backend=backend, profile=profile)
+    return profile
+
+
+def report(results: list[Result], baseline: dict[str, dict] | None) -> None:
+    header = f"{'parser':<14}{'pages/s':>10}{'MB/s':>9}{'peak KB':>10}"
+    print(header + ("  vs baseline" if baseline else ""))
+    for result in results:
+        line = (
+            f"{result.name:<14}{result.pages_per_second:>10.1f}"
+            f"{result.mb_per_second:>9.2f}{result.peak_kb:>10.0f}"
+        )
+        if baseline and (base := baseline.get(result.name)):
+            change = result.pages_per_second / base["pages_per_second"] - 1
+            line += f"  {change:+.1%}"
+        print(line)
+
+
+def regressions(
+    results: list[Result], baseline: dict[str, dict], tolerance: float
+) -> list[str]:
+    return [
+        result.name
+        for result in results
+        if (base := baseline.get(result.name))
+        and result.pages_per_second < base["pages_per_second"] * (1 - tolerance)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus", type=Path, default=CORPUS_DIR)
+    parser.add_argument(
+        "--min-time", type=float, default=0.5, help="seconds per run of a parser"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="runs per parser, the fastest counts"
+    )
+    parser.add_argument(
+        "--backend", help="HTML backend for the mobility ads, default html.parser"
+    )
+    parser.add_argument(
+        "--json-backend", help="JSON backend for search pages, default the fastest"
+    )
+    parser.add_argument("--only", nargs="+", help="parsers to run, by name")
+    parser.add_argument("--save", type=Path, help="write the results as a baseline")
+    parser.add_argument("--compare", type=Path, help="baseline to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="allowed slowdown against the baseline, default 10%%",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time each parsing step, per extractor with --backend soup",
+    )
+    args = parser.parse_args()
+
+    results = []
+    for case in cases(args.backend, args.json_backend):
+        if args.only and case.name not in args.only:
+            continue
+        paths = sorted(args.corpus.glob(case.pattern))
+        if not paths:
+            print(f"Warning: no {case.pattern} in {args.corpus}, skipping")
+            continue
+        pages = [path.read_bytes() for path in paths]
+        results.append(run(case, pages, args.min_time, args.repeat))
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    report(results, baseline)
+
+    if args.profile:
+        print()
+        print(profile(args.corpus, args.backend).report(), end="")
+
+    if args.save:
+        args.save.write_text(
+            json.dumps(
+                {
+                    result.name: asdict(result)
+                    | {"pages_per_second": result.pages_per_second}
+                    for result in results
+                },
+                indent=2,
+            )
+        )
+        print(f"Saved baseline to {args.save}")
+
+    if baseline and (slower := regressions(results, baseline, args.tolerance)):
+        print(f"❌ Slower than the baseline: {', '.join(slower)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
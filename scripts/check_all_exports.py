@@ -44,10 +44,71 @@ def main() -> None:
         "parse",  # internal
         "url",  # internal
         "get_ad",  # used with api.get_ad()
+        "get_ads",  # used with api.get_ads()
+        "iter_docs",  # used with api.iter_docs()
+        "search_all",  # used with api.search_all()
+        "crawl",  # used with api.crawl()
+        "complete",  # used with CrawlResult.complete
+        "split",  # internal
+        "stream_search",  # used with api.stream_search()
+        "poll",  # used with SearchWatcher.poll()
+        "add",  # used with SeenIds.add()
+        "unseen",  # used with SeenIds.unseen()
+        "save",  # used with SeenIds.save()
+        "run",  # used with SearchScheduler.run()
+        "run_pending",  # used with SearchScheduler.run_pending()
+        "stop",  # used with SearchScheduler.stop()
+        "remove",  # used with SearchScheduler.remove()
+        "take_due",  # internal
+        "finish",  # internal
+        "timeout",  # internal
+        "take",  # internal
+        "on_request",  # used with Instrumentation.on_request()
+        "on_parse",  # used with Instrumentation.on_parse()
+        "snapshot",  # used with Metrics.snapshot()
+        "prometheus",  # used with Metrics.prometheus()
+        "record_result",  # used with ParseProfile.record_result()
+        "report",  # used with ParseProfile.report()
+        "trace",  # internal, httpcore trace extension
+        "atrace",  # internal, httpcore trace extension
+        "event",  # internal
+        "observe",  # internal
+        "result",  # internal
+        "metadata",  # used with SearchStream.metadata
+        "aclose",  # used with AsyncSearchStream.aclose()
+        "from_url",  # used with Endpoint.from_url()
+        "from_dict",  # used with SearchDoc.from_dict()
+        "get",  # used with ResponseCache.get()
+        "set",  # used with ResponseCache.set()
+        "clear",  # used with ResponseCache.clear()
+        "delete",  # used with AdCache.delete()
+        "conditional_headers",  # used with AdCacheEntry.conditional_headers
+        "call",  # internal, used by the api with a rate limiter
+        "reserve",  # internal
+        "pause",  # internal
+        "record",  # internal, fed by the bulk methods, also ParseProfile.record()
+        "limit",  # used with AdaptiveConcurrency.limit
+        "latency",  # used with AdaptiveConcurrency.latency
+        "has_class",  # internal
+        "start",  # internal, parser target interface
+        "end",  # internal, parser target interface
+        "data",  # internal, parser target interface
+        "comment",  # internal, parser target interface
+        "done",  # internal
+        "feed",  # internal, incremental ad parsing
+        "feed_text",  # internal, incremental ad parsing
+        "scan",  # internal, incremental search decoding
+        "handle_starttag",  # internal, html.parser events
+        "handle_startendtag",  # internal, html.parser events
+        "handle_endtag",  # internal, html.parser events
+        "handle_data",  # internal, html.parser events
+        "handle_comment",  # internal, html.parser events
+        "ok",  # used with AdResult.ok
         "search",  # used with api.search()
         "search_car",  # used with api.search_car()
         "search_boat",  # used with api.search_boat()
         "search_mc",  # used with api.search_mc()
+        "close",  # used with api.close()
     }
 
     package_dir = Path("blocket_api")
@@ -55,8 +116,25 @@ def main() -> None:
 
     source_files = [
         package_dir / "constants.py",
+        package_dir / "filters.py",
         package_dir / "ad_parser.py",
         package_dir / "blocket.py",
+        package_dir / "bulk.py",
+        package_dir / "pagination.py",
+        package_dir / "cache.py",
+        package_dir / "ad_cache.py",
+        package_dir / "ratelimit.py",
+        package_dir / "concurrency.py",
+        package_dir / "extractor.py",
+        package_dir / "decoding.py",
+        package_dir / "search_stream.py",
+        package_dir / "export.py",
+        package_dir / "watch.py",
+        package_dir / "seen.py",
+        package_dir / "scheduler.py",
+        package_dir / "coalesce.py",
+        package_dir / "metrics.py",
+        package_dir / "crawl.py",
     ]
 
     if not init_file.exists():
@@ -0,0 +1,371 @@
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+from bs4 import BeautifulSoup, Tag
+
+from blocket_api import BoatAd, CarAd, McAd, ParseProfile, RecommerceAd, extractor
+from blocket_api.extractor import _available_backends
+
+
+def _page(payload: dict) -> bytes:
+    # the page embeds the payload as an escaped JS string literal
+    literal = json.dumps(json.dumps(payload, ensure_ascii=False), ensure_ascii=False)
+    return (
+        "<html><head><script>window.__staticRouterHydrationData = "
+        f"JSON.parse({literal});</script></head><body></body></html>"
+    ).encode()
+
+
+class Test_RecommerceParse:
+    def test_fast_path_skips_soup(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        def no_soup(*args: object, **kwargs: object) -> None:
+            raise AssertionError("soup should not be built")
+
+        monkeypatch.setattr("bs4.BeautifulSoup", no_soup)
+        payload = {
+            "loaderData": {
+                "title": 'Soffa "Klippan" från IKEA – nästan ny',
+                "url": "https://www.blocket.se/recommerce/forsale/item/1",
+                "price": 2500,
+            }
+        }
+        response = httpx.Response(200, content=_page(payload))
+
+        assert RecommerceAd(1).parse(response) == payload
+
+    def test_falls_back_to_soup(self) -> None:
+        response = httpx.Response(
+            200,
+            content=b'<script>window.__staticRouterHydrationData = JSON.parse("{"a": 1}");</script>',
+        )
+        assert RecommerceAd(1).parse(response) == {"a": 1}
+
+    def test_missing_payload(self) -> None:
+        response = httpx.Response(200, content=b"<html><script></script></html>")
+        assert RecommerceAd(1).parse(response) == {}
+
+
+_MOBILITY_PAGE = """
+<html><head><title>Annons</title><script>var grid = "<div>";</script></head>
+<body>
+<div class="grid grid-cols-1 md:grid-cols-3 md:gap-x-32">
+    <h1 class="t1 text-xl">Buster <b>XL</b> &amp; trailer</h1>
+    <p class="s-text-subtle mt-8">Fin <!-- note --> båt</p>
+    <div class="grid gap-24">
+        <div class="flex gap-16 hyphens-auto">
+            <span class="s-text-subtle">Modellår</span>
+            <p class="m-0 font-bold">2018</p>
+        </div>
+        <div class="flex gap-16 hyphens-auto">
+            <span class="s-text-subtle">Längd</span>
+            <p class="m-0 font-bold"><span>5,5</span> m</p>
+        </div>
+        <div class="flex gap-16 hyphens-auto">
+            <span class="s-text-subtle">Utan värde</span>
+        </div>
+        <div class="flex gap-16 hyphens-auto">
+            <span class="s-text-subtle">Bränsle typ</span>
+            <p class="m-0 font-bold">Bensin</p>
+        </div>
+    </div>
+    <div class="border-t pt-40 mt-40">
+        <span class="t2">149 000 kr</span><span class="t2">Ignored</span>
+    </div>
+    <section class="pt-40 border-t mt-40">
+        <h2 class="t3 mb-0">Utrustning</h2>
+        <ul><li>Ekolod</li><li> GPS <i>plotter</i> </li></ul>
+    </section>
+    <section class="pt-40 border-t mt-40">
+        <h2 class="t3 mb-0">Beskrivning</h2>
+        <div class="whitespace-pre-wrap">Rad ett
+Rad två<br>Rad tre</div>
+    </section>
+    <section class="key-info-section">
+        <dl>
+            <div style="break-inside:avoid-column"><dt>Motor</dt><dd>Yamaha</dd></div>
+            <div style="break-inside:avoid-column"><dt>Hk</dt><dd>60</dd></div>
+            <div><dt>Skipped</dt><dd>-</dd></div>
+        </dl>
+    </section>
+</div>
+<div class="s-bg-dealer-subtle">Handlare</div>
+<div><h2>Plats</h2><a href="#">Stockholm</a> 11122</div>
+<p>Annons-ID</p><div><p><span>98765</span></p></div>
+</body></html>
+"""
+
+_BACKENDS = ["html.parser", "lxml"]
+
+
+class _HeadingsAd(CarAd):
+    def extend(self, data: dict, soup: BeautifulSoup, grid: Tag) -> None:
+        super().extend(data, soup, grid)
+        data["headings"] = [h2.get_text(strip=True) for h2 in soup.find_all("h2")]
+
+
+class Test_MobilityParse:
+    @pytest.mark.parametrize("backend", _BACKENDS)
+    @pytest.mark.parametrize("ad_class", [CarAd, BoatAd, McAd])
+    def test_matches_soup(self, ad_class: type[CarAd], backend: str) -> None:
+        if backend not in _available_backends():
+            pytest.skip(f"{backend} is not installed")
+        response = httpx.Response(200, content=_MOBILITY_PAGE.encode("utf-8"))
+        ad = ad_class(98765)
+
+        expected = ad.parse(response, backend="soup")
+        assert ad.parse(response, backend=backend) == expected
+
+    def test_fields(self) -> None:
+        response = httpx.Response(200, content=_MOBILITY_PAGE.encode("utf-8"))
+        result = BoatAd(98765).parse(response)
+        assert result == {
+            "url": "https://www.blocket.se/mobility/item/98765",
+            "title": "BusterXL& trailer",
+            "subtitle": "Finbåt",
+            "model_year": "2018",
+            "length": "5,5m",
+            "bränsle_typ": "Bensin",
+            "price": "149 000 kr",
+            "description": "Rad ett\nRad tvåRad tre",
+            "specifications": {"Motor": "Yamaha", "Hk": "60"},
+            "seller_type": "dealer",
+            "ad_id": "98765",
+            "location": "PlatsStockholm11122",
+        }
+
+    def test_equipment(self) -> None:
+        response = httpx.Response(200, content=_MOBILITY_PAGE.encode("utf-8"))
+        assert CarAd(1).parse(response)["equipment"] == ["Ekolod", "GPSplotter"]
+
+    @pytest.mark.parametrize("backend", [None, *_BACKENDS])
+    def test_subclass_extend(self, backend: str | None) -> None:
+        if backend is not None and backend not in _available_backends():
+            pytest.skip(f"{backend} is not installed")
+        response = httpx.Response(200, content=_MOBILITY_PAGE.encode("utf-8"))
+        result = _HeadingsAd(1).parse(response, backend=backend)
+        assert result["headings"] == ["Utrustning", "Beskrivning", "Plats"]
+        assert result["equipment"] == ["Ekolod", "GPSplotter"]
+
+    @pytest.mark.parametrize("backend", ["html.parser", "soup"])
+    def test_no_grid(self, backend: str) -> None:
+        response = httpx.Response(200, content=b"<html><body><p>Borttagen</p></body>")
+        assert CarAd(1).parse(response, backend=backend) == {}
+
+    def test_unknown_backend(self) -> None:
+        response = httpx.Response(200, content=_MOBILITY_PAGE.encode("utf-8"))
+        with pytest.raises(ValueError):
+            CarAd(1).parse(response, backend="selectolax")
+
+
+class Test_ParseProfile:
+    def test_soup_steps(self) -> None:
+        response = httpx.Response(200, content=_MOBILITY_PAGE.encode("utf-8"))
+        profile = ParseProfile()
+        for _ in range(2):
+            CarAd(1).parse(response, backend="soup", profile=profile)
+
+        car = profile.snapshot()["CarAd"]
+        assert car["parses"] == 2
+        assert list(car["steps"]) == [
+            "soup",
+            "grid",
+            "_extract_title_and_subtitle",
+            "_extract_quick_specs",
+            "_extract_price",
+            "_extract_description",
+            "_extract_specifications",
+            "_extract_seller_type",
+            "_extract_ad_id",
+            "extend",
+        ]
+        assert all(step["count"] == 2 for step in car["steps"].values())
+        assert all(step["empty"] == 0 for step in car["steps"].values())
+        # the page is a boat ad, without a car's quick specs
+        assert car["missing"] == {"mileage": 2, "transmission": 2, "fuel": 2}
+
+    @pytest.mark.parametrize("backend", ["html.parser", "soup"])
+    def test_empty_steps(self, backend: str) -> None:
+        response = httpx.Response(200, content=b"<html><body><p>Borttagen</p></body>")
+        profile = ParseProfile()
+        CarAd(1).parse(response, backend=backend, profile=profile)
+
+        car = profile.snapshot()["CarAd"]
+        step = "extract" if backend == "html.parser" else "grid"
+        assert car["steps"][step]["empty"] == 1
+        assert car["missing"]["title"] == 1
+
+    def test_extract_step_and_fields(self) -> None:
+        response = httpx.Response(200, content=_MOBILITY_PAGE.encode("utf-8"))
+        profile = ParseProfile()
+        BoatAd(1).parse(
+            response, backend="html.parser", fields={"price", "seats"}, profile=profile
+        )
+
+        boat = profile.snapshot()["BoatAd"]
+        assert list(boat["steps"]) == ["extract"]
+        assert boat["steps"]["extract"]["empty"] == 0
+        assert boat["missing"] == {"seats": 1}
+        report = profile.report()
+        assert "BoatAd         extract" in report
+        assert "BoatAd         missing: seats 1/1" in report
+
+
+class Test_Corpus:
+    """The benchmark corpus must keep parsing to complete ads."""
+
+    @pytest.mark.parametrize(
+        "pattern,ad_class",
+        [("car_*.html", CarAd), ("boat_*.html", BoatAd), ("mc_*.html", McAd)],
+    )
+    def test_mobility_pages(
+        self, pattern: str, ad_class: type[CarAd], corpus_dir: Path
+    ) -> None:
+        for path in sorted(corpus_dir.glob(pattern)):
+            response = httpx.Response(200, content=path.read_bytes())
+            result = ad_class(1).parse(response)
+            assert {"title", "price", "description", "specifications"} <= set(result)
+            assert result == ad_class(1).parse(response, backend="soup")
+
+    def test_recommerce_pages(self, corpus_dir: Path) -> None:
+        for path in sorted(corpus_dir.glob("recommerce_*.html")):
+            response = httpx.Response(200, content=path.read_bytes())
+            assert RecommerceAd(1).parse(response)["loaderData"]
+
+    def test_search_pages(self, corpus_dir: Path) -> None:
+        for path in sorted(corpus_dir.glob("search_*.json")):
+            assert json.loads(path.read_bytes())["docs"]
+
+
+_FIELD_SETS = [
+    {"price", "title", "mileage"},
+    {"model_year", "length"},
+    {"seller_type"},
+    {"ad_id"},
+    {"location"},
+    {"equipment"},
+    {"description", "specifications"},
+    set(),
+]
+
+
+class Test_ParseFields:
+    @pytest.mark.parametrize("backend", ["html.parser", "lxml", "soup"])
+    @pytest.mark.parametrize("fields", _FIELD_SETS)
+    def test_mobility_subset(
+        self, fields: set[str], backend: str, corpus_dir: Path
+    ) -> None:
+        if backend == "lxml" and backend not in _available_backends():
+            pytest.skip("lxml is not installed")
+        for ad_class, name in [(CarAd, "car_1"), (BoatAd, "boat_2"), (McAd, "mc_1")]:
+            content = (corpus_dir / f"{name}.html").read_bytes()
+            response = httpx.Response(200, content=content)
+            full = ad_class(1).parse(response)
+            expected = {k: v for k, v in full.items() if k in fields}
+            assert ad_class(1).parse(response, backend=backend, fields=fields) == (
+                expected
+            )
+
+    def test_mobility_stops_early(
+        self, monkeypatch: pytest.MonkeyPatch, corpus_dir: Path
+    ) -> None:
+        fed = []
+        feed = extractor._StdlibEvents.feed
+
+        def spy(self: extractor._StdlibEvents, data: str) -> None:
+            fed.append(len(data))
+            feed(self, data)
+
+        monkeypatch.setattr(extractor._StdlibEvents, "feed", spy)
+        monkeypatch.setattr(extractor, "_FEED_SIZE", 1024)
+        content = (corpus_dir / "car_1.html").read_bytes()
+        response = httpx.Response(200, content=content)
+
+        result = CarAd(1).parse(
+            response, backend="html.parser", fields={"title", "price"}
+        )
+        assert set(result) == {"title", "price"}
+        assert sum(fed) < len(content.decode())
+
+        # seller_type is only known to be "private" at the end of the page
+        fed.clear()
+        content = (corpus_dir / "car_2.html").read_bytes()
+        response = httpx.Response(200, content=content)
+        result = CarAd(1).parse(response, backend="html.parser", fields={"seller_type"})
+        assert result == {"seller_type": "private"}
+        assert sum(fed) == len(content.decode())
+
+    def test_recommerce_stops_decoding(self) -> None:
+        # everything after the selected keys is left undecoded, even if broken
+        literal = json.dumps('{"title": "Lampa", "price": 100, "rest": [1, 2')
+        response = httpx.Response(
+            200,
+            content=(
+                "<script>window.__staticRouterHydrationData = "
+                f"JSON.parse({literal});</script>"
+            ).encode(),
+        )
+        assert RecommerceAd(1).parse(response, fields=["price", "title"]) == {
+            "title": "Lampa",
+            "price": 100,
+        }
+
+    def test_recommerce_selects_from_the_ad(self, corpus_dir: Path) -> None:
+        for path in sorted(corpus_dir.glob("recommerce_*.html")):
+            response = httpx.Response(200, content=path.read_bytes())
+            item = RecommerceAd(1).parse(response)["loaderData"]["item-recommerce"]
+            result = RecommerceAd(1).parse(response, fields=["title", "price"])
+            assert result == {
+                "title": item["itemData"]["title"],
+                "price": item["itemData"]["price"],
+            }
+
+    def test_recommerce_skips_members_undecoded(self) -> None:
+        # the skipped members are never decoded, so `tru` goes unnoticed
+        payload = (
+            '{"loaderData": {"root": [], "item-recommerce": {"similar": [{"a": '
+            'tru, "b": "]}\\"", "c": {}}], "itemData": {"images": [[tru]], '
+            '"title": "Lampa", "meta": {"x": tru}, "price": 100}}}}'
+        )
+        response = httpx.Response(
+            200,
+            content=(
+                "<script>window.__staticRouterHydrationData = "
+                f"JSON.parse({json.dumps(payload)});</script>"
+            ).encode(),
+        )
+        assert RecommerceAd(1).parse(response, fields=["price", "title"]) == {
+            "title": "Lampa",
+            "price": 100,
+        }
+
+    def test_recommerce_prefers_the_ad_to_top_level_fields(self) -> None:
+        payload = '{"title": "top", "loaderData": {"r": {"itemData": {"title": "ad"}}}}'
+        response = httpx.Response(
+            200,
+            content=(
+                "<script>window.__staticRouterHydrationData = "
+                f"JSON.parse({json.dumps(payload)});</script>"
+            ).encode(),
+        )
+        assert RecommerceAd(1).parse(response, fields=["title"]) == {"title": "ad"}
+
+
+class Test_HydrationStream:
+    def test_byte_by_byte(self) -> None:
+        payload = {"title": "Lampa", "price": 100}
+        content = _page(payload)
+        stream = RecommerceAd(1)._stream()
+        fed = 0
+        for byte in content:
+            fed += 1
+            if stream.feed(bytes([byte])):
+                break
+        assert content[:fed].endswith(b"</script>")
+        assert stream.close() == payload
+
+    def test_incomplete_page_falls_back(self) -> None:
+        stream = RecommerceAd(1)._stream()
+        assert not stream.feed(b"<html><body>Borttagen</body></html>")
+        assert stream.close() == {}
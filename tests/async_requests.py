@@ -0,0 +1,191 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+import httpx
+import respx
+
+from blocket_api import AsyncBlocketAPI, CarAd, CarModel, Location, RecommerceAd
+from blocket_api.constants import SITE_URL
+
+
+class Test_AsyncSearch:
+    @respx.mock
+    def test_search(self) -> None:
+        expected_url = (
+            f"{SITE_URL}/recommerce/forsale/search/api/search/SEARCH_ID_BAP_COMMON"
+            "?q=audi+q5"
+            "&page=2"
+            "&sort=RELEVANCE"
+            "&location=0.300001"
+        )
+        respx.get(expected_url).mock(
+            return_value=httpx.Response(200, json={"status": "ok"})
+        )
+
+        async def run() -> dict:
+            async with AsyncBlocketAPI() as api:
+                return await api.search(
+                    "audi q5", page=2, locations=[Location.STOCKHOLM]
+                )
+
+        assert asyncio.run(run()) == {"status": "ok"}
+
+    @respx.mock
+    def test_search_car(self) -> None:
+        expected_url = (
+            f"{SITE_URL}/mobility/search/api/search/SEARCH_ID_CAR_USED"
+            "?page=1"
+            "&sort=RELEVANCE"
+            "&price_to=50000"
+            "&make=0.744"
+        )
+        respx.get(expected_url).mock(
+            return_value=httpx.Response(200, json={"status": "ok"})
+        )
+
+        async def run() -> dict:
+            async with AsyncBlocketAPI() as api:
+                return await api.search_car(models=[CarModel.AUDI], price_to=50000)
+
+        assert asyncio.run(run()) == {"status": "ok"}
+
+
+class Test_AsyncGetAd:
+    @respx.mock
+    def test_get_ad_recommerce(self) -> None:
+        respx.get(f"{SITE_URL}/recommerce/forsale/item/12345567").mock(
+            return_value=httpx.Response(
+                200,
+                content=b'<script>window.__staticRouterHydrationData = JSON.parse("{"some": "json here"}");</script>',
+            )
+        )
+
+        async def run() -> dict:
+            async with AsyncBlocketAPI() as api:
+                return await api.get_ad(RecommerceAd(12345567))
+
+        assert asyncio.run(run()) == {"some": "json here"}
+
+    @respx.mock
+    def test_get_ad_car_empty(self) -> None:
+        respx.get(f"{SITE_URL}/mobility/item/1").mock(
+            return_value=httpx.Response(200, content=b"<html></html>")
+        )
+
+        async def run() -> dict:
+            async with AsyncBlocketAPI() as api:
+                return await api.get_ad(CarAd(1))
+
+        assert asyncio.run(run()) == {}
+
+    @respx.mock
+    def test_get_ad_stream(self) -> None:
+        content = (
+            b"<html><script>window.__staticRouterHydrationData = "
+            b'JSON.parse("{"id": 1}");</script>' + b"<p>filler</p>" * 1000
+        )
+        sent = []
+
+        async def body() -> AsyncIterator[bytes]:
+            for start in range(0, len(content), 64):
+                sent.append(start)
+                yield content[start : start + 64]
+
+        respx.get(f"{SITE_URL}/recommerce/forsale/item/1").mock(
+            side_effect=lambda request: httpx.Response(200, content=body())
+        )
+
+        async def run() -> dict:
+            async with AsyncBlocketAPI() as api:
+                return await api.get_ad(RecommerceAd(1), stream=True)
+
+        assert asyncio.run(run()) == {"id": 1}
+        assert len(sent) < len(content) / 64
+
+
+class Test_AsyncGetAds:
+    @respx.mock
+    def test_get_ads_ordered(self) -> None:
+        respx.get(f"{SITE_URL}/mobility/item/3").mock(return_value=httpx.Response(500))
+        respx.get(url__regex=rf"{SITE_URL}/mobility/item/\d+").mock(
+            return_value=httpx.Response(200, content=b"<html></html>")
+        )
+
+        async def run() -> list:
+            async with AsyncBlocketAPI() as api:
+                ads = [CarAd(i) for i in range(6)]
+                return [r async for r in api.get_ads(ads, concurrency=2, ordered=True)]
+
+        results = asyncio.run(run())
+        assert [r.ad.id for r in results] == list(range(6))
+        assert [r.ok for r in results] == [True, True, True, False, True, True]
+
+
+class Test_AsyncIterDocs:
+    @respx.mock
+    def test_iter_docs(self) -> None:
+        url = f"{SITE_URL}/mobility/search/api/search/SEARCH_ID_MC_USED"
+        respx.get(url__startswith=url).mock(
+            side_effect=lambda request: httpx.Response(
+                200,
+                json={
+                    "docs": [{"page": int(request.url.params["page"])}],
+                    "metadata": {"paging": {"current": 1, "last": 4}},
+                },
+            )
+        )
+
+        async def run() -> list:
+            async with AsyncBlocketAPI() as api:
+                return [doc async for doc in api.iter_docs(api.search_mc, prefetch=3)]
+
+        assert asyncio.run(run()) == [{"page": p} for p in range(1, 5)]
+
+
+class Test_AsyncSearchAll:
+    @respx.mock
+    def test_search_all(self) -> None:
+        url = f"{SITE_URL}/mobility/search/api/search/SEARCH_ID_CAR_USED"
+        respx.get(url__startswith=url).mock(
+            side_effect=lambda request: httpx.Response(
+                200,
+                json={
+                    "docs": [{"id": request.url.params["page"]}],
+                    "metadata": {"paging": {"current": 1, "last": 7}},
+                },
+            )
+        )
+
+        async def run() -> list:
+            async with AsyncBlocketAPI() as api:
+                return await api.search_all(api.search_car, concurrency=4)
+
+        docs = asyncio.run(run())
+        assert [doc["id"] for doc in docs] == [str(p) for p in range(1, 8)]
+
+
+class Test_AsyncStreamSearch:
+    @respx.mock
+    def test_stream_search(self) -> None:
+        url = f"{SITE_URL}/mobility/search/api/search/SEARCH_ID_CAR_USED"
+        respx.get(url__startswith=url).mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "docs": [{"id": "1"}, {"id": "2"}],
+                    "metadata": {"paging": {"current": 1, "last": 1}},
+                },
+            )
+        )
+
+        async def run() -> tuple[list, dict | None]:
+            async with (
+                AsyncBlocketAPI() as api,
+                api.stream_search(api.search_car, page=1) as docs,
+            ):
+                return [doc async for doc in docs], docs.metadata
+
+        assert asyncio.run(run()) == (
+            [{"id": "1"}, {"id": "2"}],
+            {"paging": {"current": 1, "last": 1}},
+        )
@@ -0,0 +1,142 @@
+from pathlib import Path
+
+import httpx
+import respx
+
+from blocket_api import (
+    AdCache,
+    BlocketAPI,
+    CarAd,
+    CarModel,
+    Endpoint,
+    McAd,
+    RecommerceAd,
+    ResponseCache,
+)
+from blocket_api.ad_cache import _cache_key
+from blocket_api.blocket import QueryParam
+from blocket_api.constants import SITE_URL
+from tests.conftest import FakeClock
+
+CAR_URL = f"{SITE_URL}/mobility/search/api/search/{Endpoint.SEARCH_CAR}"
+MC_URL = f"{SITE_URL}/mobility/search/api/search/{Endpoint.SEARCH_MC}"
+
+
+class Test_ResponseCache:
+    def test_ttl_per_endpoint(self, clock: FakeClock) -> None:
+        cache = ResponseCache(ttl=60, ttls={Endpoint.SEARCH_CAR: 5}, clock=clock)
+        params = [QueryParam("page", 1)]
+        cache.set(CAR_URL, params, b"car")
+        cache.set(MC_URL, params, b"mc")
+
+        clock.now = 10
+        assert cache.get(CAR_URL, params) is None
+        assert cache.get(MC_URL, params) == b"mc"
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    def test_lru_eviction(self) -> None:
+        cache = ResponseCache(max_entries=2)
+        cache.set(CAR_URL, [QueryParam("page", 1)], b"1")
+        cache.set(CAR_URL, [QueryParam("page", 2)], b"2")
+        cache.get(CAR_URL, [QueryParam("page", 1)])
+        cache.set(CAR_URL, [QueryParam("page", 3)], b"3")
+
+        assert cache.get(CAR_URL, [QueryParam("page", 2)]) is None
+        assert cache.get(CAR_URL, [QueryParam("page", 1)]) == b"1"
+        assert cache.stats.evictions == 1
+
+    def test_max_bytes(self) -> None:
+        cache = ResponseCache(max_bytes=10)
+        cache.set(CAR_URL, [QueryParam("page", 1)], b"x" * 6)
+        cache.set(CAR_URL, [QueryParam("page", 2)], b"x" * 6)
+        assert len(cache) == 1
+        assert cache.get(CAR_URL, [QueryParam("page", 2)]) is not None
+
+
+class Test_CachedSearch:
+    @respx.mock
+    def test_repeated_search_hits_cache(self) -> None:
+        route = respx.get(url__startswith=CAR_URL).mock(
+            return_value=httpx.Response(200, json={"docs": []})
+        )
+        api = BlocketAPI(cache=ResponseCache())
+
+        assert api.search_car(models=[CarModel.VOLVO]) == {"docs": []}
+        assert api.search_car(models=[CarModel.VOLVO]) == {"docs": []}
+        api.search_car(models=[CarModel.AUDI])
+
+        assert route.call_count == 2
+        assert api.cache is not None
+        assert api.cache.stats.hits == 1
+
+
+class Test_AdCache:
+    @respx.mock
+    def test_get_ad_revalidates_with_etag(self, tmp_path: Path) -> None:
+        ad = RecommerceAd(123)
+        content = (
+            b"<script>window.__staticRouterHydrationData = "
+            b'JSON.parse("{"title": "Lampa"}");</script>'
+        )
+
+        def respond(request: httpx.Request) -> httpx.Response:
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, content=content, headers={"ETag": '"v1"'})
+
+        route = respx.get(ad.url).mock(side_effect=respond)
+        path = tmp_path / "ads.sqlite"
+
+        assert BlocketAPI(ad_cache=AdCache(path)).get_ad(ad) == {"title": "Lampa"}
+        # a fresh client, as in another worker process, shares the same store
+        assert BlocketAPI(ad_cache=AdCache(path)).get_ad(ad) == {"title": "Lampa"}
+
+        assert route.call_count == 2
+        assert route.calls[1].response.status_code == 304
+
+    @respx.mock
+    def test_get_ad_fields_caches_full_ad(self, tmp_path: Path) -> None:
+        ad = RecommerceAd(123)
+        respx.get(ad.url).mock(
+            return_value=httpx.Response(
+                200,
+                content=(
+                    b"<script>window.__staticRouterHydrationData = "
+                    b'JSON.parse("{"title": "Lampa", "price": 100}");</script>'
+                ),
+            )
+        )
+        cache = AdCache(tmp_path / "ads.sqlite")
+
+        assert BlocketAPI(ad_cache=cache).get_ad(ad, fields=["price"]) == {"price": 100}
+        entry = cache.get(_cache_key(ad))
+        assert entry is not None
+        assert entry.data == {"title": "Lampa", "price": 100}
+
+    @respx.mock
+    def test_ad_types_sharing_a_url(self, tmp_path: Path, corpus_dir: Path) -> None:
+        car, mc = CarAd(1), McAd(1)
+        assert car.url == mc.url
+        respx.get(car.url).mock(
+            return_value=httpx.Response(
+                200, content=(corpus_dir / "car_1.html").read_bytes()
+            )
+        )
+        api = BlocketAPI(ad_cache=AdCache(tmp_path / "ads.sqlite"))
+
+        car_data = api.get_ad(car)
+        mc_data = api.get_ad(mc)
+
+        assert "equipment" in car_data
+        assert "equipment" not in mc_data
+        assert api.get_ad(car) == car_data
+
+    def test_entry_without_validators(self, tmp_path: Path) -> None:
+        cache = AdCache(tmp_path / "ads.sqlite")
+        cache.set("https://example.com/1", {"a": 1}, httpx.Headers())
+        entry = cache.get("https://example.com/1")
+        assert entry is not None
+        assert entry.data == {"a": 1}
+        assert entry.conditional_headers == {}
+        cache.delete("https://example.com/1")
+        assert cache.get("https://example.com/1") is None
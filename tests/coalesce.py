@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+import respx
+
+from blocket_api import AsyncBlocketAPI, BlocketAPI, RecommerceAd
+from blocket_api.coalesce import _AsyncSingleFlight, _SingleFlight
+from blocket_api.constants import SITE_URL
+
+_SEARCH_URL = f"{SITE_URL}/recommerce/forsale/search/api/search/"
+
+
+def _slow(
+    response: httpx.Response, delay: float = 0.1
+) -> Callable[[httpx.Request], httpx.Response]:
+    def _respond(request: httpx.Request) -> httpx.Response:
+        time.sleep(delay)
+        return response
+
+    return _respond
+
+
+class Test_SingleFlight:
+    def test_concurrent_calls_share_one(self) -> None:
+        flights = _SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def _fn() -> object:
+            calls.append(1)
+            release.wait()
+            return object()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(flights.call, "key", _fn) for _ in range(4)]
+            time.sleep(0.05)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert flights.call("key", lambda: 2) == 2
+
+    def test_errors_are_shared(self) -> None:
+        flights = _SingleFlight()
+        release = threading.Event()
+
+        def _fn() -> None:
+            release.wait()
+            raise ValueError("boom")
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(flights.call, "key", _fn) for _ in range(3)]
+            time.sleep(0.05)
+            release.set()
+            for future in futures:
+                with pytest.raises(ValueError):
+                    future.result()
+
+    def test_async_cancelled_caller_does_not_cancel_others(self) -> None:
+        flights = _AsyncSingleFlight()
+        calls = []
+
+        async def _fn() -> int:
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 1
+
+        async def run() -> list:
+            first = asyncio.ensure_future(flights.call("key", _fn))
+            second = asyncio.ensure_future(flights.call("key", _fn))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return [await second, await flights.call("key", _fn)]
+
+        assert asyncio.run(run()) == [1, 1]
+        assert len(calls) == 2
+
+
+class Test_Coalesce:
+    @respx.mock
+    def test_identical_searches_share_a_request(self) -> None:
+        route = respx.get(url__startswith=_SEARCH_URL).mock(
+            side_effect=_slow(httpx.Response(200, json={"docs": [{"id": "1"}]}))
+        )
+        api = BlocketAPI(coalesce=True)
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(executor.map(lambda _: api.search("lampa"), range(6)))
+        assert route.call_count == 1
+        assert all(result is results[0] for result in results)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(api.search, ["lampa", "soffa"]))
+        assert route.call_count == 3
+
+    @respx.mock
+    def test_without_coalesce(self) -> None:
+        route = respx.get(url__startswith=_SEARCH_URL).mock(
+            side_effect=_slow(httpx.Response(200, json={"docs": []}), delay=0.05)
+        )
+        api = BlocketAPI()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(lambda _: api.search("lampa"), range(3)))
+        assert route.call_count == 3
+
+    @respx.mock
+    def test_get_ad_is_keyed_on_fields(self) -> None:
+        content = b"<html><title>x</title></html>"
+        ad = RecommerceAd(1)
+        route = respx.get(ad.url).mock(
+            side_effect=_slow(httpx.Response(200, content=content))
+        )
+        api = BlocketAPI(coalesce=True)
+
+        calls = [None, None, ["title"]]
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(lambda fields: api.get_ad(ad, fields=fields), calls))
+        assert route.call_count == 2
+
+    @respx.mock
+    def test_async(self) -> None:
+        route = respx.get(url__startswith=_SEARCH_URL).mock(
+            return_value=httpx.Response(200, json={"docs": []})
+        )
+
+        async def run() -> list:
+            async with AsyncBlocketAPI(coalesce=True) as api:
+                return await asyncio.gather(*(api.search("lampa") for _ in range(5)))
+
+        results = asyncio.run(run())
+        assert route.call_count == 1
+        assert all(result is results[0] for result in results)
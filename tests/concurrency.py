@@ -0,0 +1,67 @@
+import httpx
+import pytest
+import respx
+
+from blocket_api import AdaptiveConcurrency, BlocketAPI, CarAd
+from blocket_api.constants import SITE_URL
+
+
+def _throttled() -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", SITE_URL)
+    return httpx.HTTPStatusError(
+        "429", request=request, response=httpx.Response(429, request=request)
+    )
+
+
+class Test_AdaptiveConcurrency:
+    def test_additive_increase(self) -> None:
+        limiter = AdaptiveConcurrency(initial=4, max_limit=6)
+        for _ in range(5):
+            limiter.record(0.1)
+        assert limiter.limit == 5
+        for _ in range(100):
+            limiter.record(0.1)
+        assert limiter.limit == 6
+
+    def test_multiplicative_decrease_once_per_window(self) -> None:
+        limiter = AdaptiveConcurrency(initial=16)
+        for _ in range(8):
+            limiter.record(0.1, _throttled())
+        assert limiter.limit == 8
+
+        limiter.record(0.1, httpx.ReadTimeout("timeout"))
+        assert limiter.limit == 4
+
+    def test_latency_spike_decreases(self) -> None:
+        limiter = AdaptiveConcurrency(initial=8, latency_tolerance=2.0)
+        limiter.record(0.1)
+        limit = limiter.limit
+        limiter.record(1.0)
+        assert limiter.limit == limit // 2
+
+    def test_min_limit_and_other_errors(self) -> None:
+        limiter = AdaptiveConcurrency(initial=1, min_limit=1)
+        limiter.record(0.1, _throttled())
+        assert limiter.limit == 1
+        # errors that are not overload signals count as healthy responses
+        limiter.record(0.1, ValueError("not found"))
+        assert limiter.limit == 2
+
+    def test_invalid_bounds(self) -> None:
+        with pytest.raises(ValueError):
+            AdaptiveConcurrency(initial=10, max_limit=5)
+
+
+class Test_AdaptiveGetAds:
+    @respx.mock
+    def test_get_ads_backs_off_on_throttling(self) -> None:
+        respx.get(url__regex=rf"{SITE_URL}/mobility/item/\d+").mock(
+            return_value=httpx.Response(429)
+        )
+        limiter = AdaptiveConcurrency(initial=8)
+        results = list(
+            BlocketAPI().get_ads((CarAd(i) for i in range(20)), concurrency=limiter)
+        )
+        assert len(results) == 20
+        assert not any(r.ok for r in results)
+        assert limiter.limit < 8
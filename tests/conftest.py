@@ -0,0 +1,24 @@
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def corpus_dir() -> Path:
+    """The recorded pages and search results the parsers are tested on."""
+    return Path(__file__).parent / "fixtures" / "corpus"
+
+
+class FakeClock:
+    """A monotonic clock that only moves when a test sets `now`."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
@@ -0,0 +1,230 @@
+import asyncio
+from typing import Any
+
+import httpx
+import pytest
+import respx
+
+from blocket_api import AsyncBlocketAPI, BlocketAPI, CarModel, Location
+from blocket_api.constants import SITE_URL
+from blocket_api.crawl import _Range
+
+_URL = f"{SITE_URL}/mobility/search/api/search/SEARCH_ID_CAR_USED"
+_PAGE_SIZE = 10
+_MAX_PAGES = 3
+_LOCATIONS = list(Location)
+
+
+def _ad(
+    ad_id: int,
+    *,
+    price: int = 100_000,
+    year: int = 2015,
+    location: Location = Location.STOCKHOLM,
+    make: str = CarModel.VOLVO.value,
+) -> dict[str, Any]:
+    return {
+        "id": str(ad_id),
+        "price": price,
+        "year": year,
+        "mileage": 10_000,
+        "location": location.value,
+        "make": make,
+    }
+
+
+def _mock_search(ads: list[dict[str, Any]]) -> respx.Route:
+    """A car search that filters `ads` and pages them up to `_MAX_PAGES`."""
+
+    def _in(ad: dict[str, Any], params: httpx.QueryParams, name: str, key: str) -> bool:
+        low, high = params.get(f"{name}_from"), params.get(f"{name}_to")
+        return (low is None or ad[key] >= int(low)) and (
+            high is None or ad[key] <= int(high)
+        )
+
+    def _page(request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        matches = [
+            ad
+            for ad in ads
+            if _in(ad, params, "price", "price")
+            and _in(ad, params, "year", "year")
+            and _in(ad, params, "milage", "mileage")
+            and ad["location"] in (params.get_list("location") or [ad["location"]])
+            and ad["make"] in (params.get_list("make") or [ad["make"]])
+        ]
+        page = int(params["page"])
+        last = min(-(-len(matches) // _PAGE_SIZE), _MAX_PAGES)
+        docs = (
+            matches[(page - 1) * _PAGE_SIZE : page * _PAGE_SIZE] if page <= last else []
+        )
+        return httpx.Response(
+            200,
+            json={
+                "docs": docs,
+                "metadata": {
+                    "paging": {"current": page, "last": last},
+                    "result_size": {"match_count": len(matches)},
+                },
+            },
+        )
+
+    return respx.get(url__startswith=_URL).mock(side_effect=_page)
+
+
+def _spread(count: int) -> list[dict[str, Any]]:
+    return [
+        _ad(
+            ad_id,
+            price=ad_id * 1_733 % 400_000,
+            year=2000 + ad_id % 20,
+            location=_LOCATIONS[ad_id % len(_LOCATIONS)],
+        )
+        for ad_id in range(count)
+    ]
+
+
+class Test_Crawl:
+    @respx.mock
+    def test_finds_every_ad(self) -> None:
+        ads = _spread(200)
+        _mock_search(ads)
+        api = BlocketAPI()
+
+        assert len(api.search_all(api.search_car)) == _PAGE_SIZE * _MAX_PAGES
+        result = api.crawl(api.search_car, concurrency=4)
+
+        assert sorted(doc["id"] for doc in result.docs) == sorted(
+            ad["id"] for ad in ads
+        )
+        assert result.complete
+        assert result.match_count == 200
+        assert result.queries > 1
+
+    @respx.mock
+    def test_query_within_the_cap_is_not_split(self) -> None:
+        route = _mock_search(_spread(25))
+        api = BlocketAPI()
+
+        result = api.crawl(api.search_car, year_from=2000)
+
+        assert len(result.docs) == 25
+        assert result.queries == 1
+        assert route.call_count == 3
+
+    @respx.mock
+    def test_keeps_the_given_filters(self) -> None:
+        ads = _spread(200)
+        route = _mock_search(ads)
+        api = BlocketAPI()
+
+        result = api.crawl(api.search_car, price_from=100_000, year_to=2010)
+
+        expected = [ad for ad in ads if ad["price"] >= 100_000 and ad["year"] <= 2010]
+        assert len(result.docs) == len(expected)
+        for call in route.calls:
+            params = call.request.url.params
+            assert int(params["price_from"]) >= 100_000
+            assert int(params["year_to"]) <= 2010
+
+    @respx.mock
+    def test_fans_out_over_locations(self) -> None:
+        # same price, year and mileage, only the location tells them apart
+        ads = [
+            _ad(ad_id, location=_LOCATIONS[ad_id % len(_LOCATIONS)])
+            for ad_id in range(60)
+        ]
+        route = _mock_search(ads)
+        api = BlocketAPI()
+
+        result = api.crawl(api.search_car)
+
+        assert len(result.docs) == 60
+        assert result.complete
+        locations = [
+            call.request.url.params.get_list("location") for call in route.calls
+        ]
+        assert [Location.STOCKHOLM.value] in locations
+
+    @respx.mock
+    def test_counts_ads_lost_by_splits(self) -> None:
+        # the make isn't a CarModel, fanning out over models can't find them
+        ads = [_ad(ad_id) for ad_id in range(25)]
+        ads += [_ad(ad_id, make="Unknown") for ad_id in range(25, 35)]
+        _mock_search(ads)
+        api = BlocketAPI()
+
+        result = api.crawl(api.search_car)
+
+        assert len(result.docs) == 25
+        assert result.match_count == 35
+        assert result.missing == 10
+        assert not result.truncated
+        assert not result.complete
+
+    @respx.mock
+    def test_reports_queries_it_cannot_split(self) -> None:
+        _mock_search([_ad(ad_id) for ad_id in range(50)])
+        api = BlocketAPI()
+
+        result = api.crawl(
+            api.search_car,
+            price_from=100_000,
+            price_to=100_000,
+            year_from=2015,
+            year_to=2015,
+            milage_from=10_000,
+            milage_to=10_000,
+            locations=[Location.STOCKHOLM],
+            models=[CarModel.VOLVO],
+        )
+
+        assert not result.complete
+        assert result.truncated[0]["locations"] == [Location.STOCKHOLM]
+        assert len(result.docs) == _PAGE_SIZE * _MAX_PAGES
+        assert result.match_count == 50
+
+    @respx.mock
+    def test_error_is_raised(self) -> None:
+        respx.get(url__startswith=_URL).mock(return_value=httpx.Response(500))
+        api = BlocketAPI()
+
+        with pytest.raises(httpx.HTTPStatusError):
+            api.crawl(api.search_car)
+
+    def test_rejects_page_and_other_methods(self) -> None:
+        api = BlocketAPI()
+        with pytest.raises(ValueError):
+            api.crawl(api.search_car, page=2)
+        with pytest.raises(ValueError):
+            api.crawl(api.get_ad)
+
+    @respx.mock
+    def test_async(self) -> None:
+        ads = _spread(200)
+        _mock_search(ads)
+
+        async def _crawl() -> list[str]:
+            async with AsyncBlocketAPI() as api:
+                result = await api.crawl(api.search_car, concurrency=4)
+            return [doc["id"] for doc in result.docs]
+
+        assert sorted(asyncio.run(_crawl())) == sorted(ad["id"] for ad in ads)
+
+
+class Test_Range:
+    def test_open_range_keeps_growing(self) -> None:
+        price = _Range("price", 0, 1_000_000)
+        assert price.split({"price_from": 2_000_000}) == [
+            {"price_from": 2_000_000, "price_to": 3_000_000},
+            {"price_from": 3_000_001},
+        ]
+
+    def test_closed_range_ends(self) -> None:
+        year = _Range("year", 1950, 2027, open=False)
+        assert year.split({"year_from": 2026}) == [
+            {"year_from": 2026, "year_to": 2026},
+            {"year_from": 2027},
+        ]
+        assert year.split({"year_from": 2027}) is None
+        assert year.split({"year_from": 2010, "year_to": 2010}) is None
@@ -0,0 +1,177 @@
+import json
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+import respx
+
+from blocket_api import BlocketAPI, SearchDoc
+from blocket_api.constants import SITE_URL
+from blocket_api.decoding import (
+    _available_json_backends,
+    _DocStream,
+    _json_decoder,
+)
+
+_BACKENDS = ["orjson", "msgspec", "json"]
+
+
+def _installed(backend: str) -> None:
+    if backend not in _available_json_backends():
+        pytest.skip(f"{backend} is not installed")
+
+
+class Test_JsonDecoder:
+    @pytest.mark.parametrize("backend", _BACKENDS)
+    def test_matches_stdlib(self, backend: str, corpus_dir: Path) -> None:
+        _installed(backend)
+        for path in sorted(corpus_dir.glob("search_*.json")):
+            content = path.read_bytes()
+            assert _json_decoder(backend)(content) == json.loads(content)
+
+    @pytest.mark.parametrize("backend", _BACKENDS)
+    def test_typed_docs(self, backend: str, corpus_dir: Path) -> None:
+        _installed(backend)
+        content = (corpus_dir / "search_car.json").read_bytes()
+        page = json.loads(content)
+
+        typed = _json_decoder(backend, typed=True)(content)
+        assert set(typed) == {"docs", "metadata"}
+        assert typed["metadata"] == page["metadata"]
+        assert typed["docs"] == [SearchDoc.from_dict(doc) for doc in page["docs"]]
+
+        doc = typed["docs"][0]
+        assert doc.id == page["docs"][0]["id"]
+        assert doc.price == page["docs"][0]["price"]["amount"]
+        assert not hasattr(doc, "__dict__")
+
+    @pytest.mark.parametrize("backend", _BACKENDS)
+    def test_typed_sparse_doc(self, backend: str) -> None:
+        _installed(backend)
+        content = b'{"docs": [{"id": 1, "location": {"name": "x"}}]}'
+        assert _json_decoder(backend, typed=True)(content) == {
+            "docs": [SearchDoc(id="1")],
+            "metadata": None,
+        }
+
+    @pytest.mark.parametrize("backend", _BACKENDS)
+    def test_typed_mixed_number_types(self, backend: str) -> None:
+        _installed(backend)
+        docs = [
+            {"id": 1, "price": {"amount": 1500}, "timestamp": 1700000000000},
+            {"id": 2, "price": {"amount": 1499.0}, "timestamp": 1.7e12},
+            {"id": 3, "price": {"amount": "1500"}, "timestamp": "1700000000000"},
+            {"id": 4, "price": {"amount": "pris saknas"}, "timestamp": None},
+            {"id": 5, "price": {"amount": None}, "timestamp": True},
+        ]
+        content = json.dumps({"docs": docs}).encode()
+
+        assert _json_decoder(backend, typed=True)(content)["docs"] == [
+            SearchDoc("1", price=1500, timestamp=1700000000000),
+            SearchDoc("2", price=1499, timestamp=1700000000000),
+            SearchDoc("3", price=1500, timestamp=1700000000000),
+            SearchDoc("4"),
+            SearchDoc("5"),
+        ]
+
+    def test_unknown_backend(self) -> None:
+        with pytest.raises(ValueError):
+            _json_decoder("simdjson")
+
+
+class Test_DocStream:
+    @pytest.mark.parametrize("size", [1, 7, 4096])
+    def test_matches_json_loads(self, size: int, corpus_dir: Path) -> None:
+        for path in sorted(corpus_dir.glob("search_*.json")):
+            content = path.read_bytes()
+            stream = _DocStream(lambda doc: doc)
+            docs = [
+                doc
+                for start in range(0, len(content), size)
+                for doc in stream.feed(content[start : start + size])
+            ]
+            stream.close()
+
+            page = json.loads(content)
+            assert docs == page["docs"]
+            assert stream.metadata == page["metadata"]
+
+    def test_numbers_split_across_chunks(self) -> None:
+        stream = _DocStream(lambda doc: doc)
+        assert stream.feed(b'{"docs": [12') == []
+        assert stream.feed(b'34, "\\u00') == [1234]
+        # a string is complete at its closing quote, a number needs what follows
+        assert stream.feed(b'e5"') == ["å"]
+        assert stream.feed(b"]}") == []
+        stream.close()
+
+    def test_large_page_in_small_chunks(self) -> None:
+        # every chunk is scanned once, a page this size used to take seconds
+        docs = [
+            {"id": str(i), "heading": f'Lampa {i} ]}} \\" {{', "tags": [[i]] * 40}
+            for i in range(1000)
+        ]
+        page = {
+            "docs": docs,
+            "filters": [{"name": "x" * 100}] * 20_000,
+            "metadata": {"x": "]" * 5000},
+        }
+        content = json.dumps(page).encode()
+        assert len(content) > 2_000_000
+        stream = _DocStream(lambda doc: doc)
+
+        start = time.perf_counter()
+        streamed = [
+            doc
+            for index in range(0, len(content), 4096)
+            for doc in stream.feed(content[index : index + 4096])
+        ]
+        stream.close()
+
+        assert streamed == docs
+        assert stream.metadata == {"x": "]" * 5000}
+        assert time.perf_counter() - start < 2
+
+    def test_escapes_split_across_chunks(self) -> None:
+        content = b'{"docs": [{"a": "x\\"}]\\\\"}, "\\\\"], "n": 1}'
+        expected = json.loads(content)["docs"]
+        for size in range(1, 8):
+            stream = _DocStream(lambda doc: doc)
+            docs = [
+                doc
+                for index in range(0, len(content), size)
+                for doc in stream.feed(content[index : index + size])
+            ]
+            stream.close()
+            assert docs == expected
+
+    def test_incomplete(self) -> None:
+        stream = _DocStream(lambda doc: doc)
+        stream.feed(b'{"docs": [{"id": 1}]')
+        with pytest.raises(ValueError):
+            stream.close()
+
+
+class Test_TypedSearch:
+    @respx.mock
+    def test_search_all_typed_docs(self) -> None:
+        def respond(request: httpx.Request) -> httpx.Response:
+            page = int(request.url.params["page"])
+            return httpx.Response(
+                200,
+                json={
+                    "docs": [
+                        {"id": "1", "heading": "Lampa", "price": {"amount": 100}},
+                        {"id": str(page + 1), "heading": "Stol"},
+                    ],
+                    "metadata": {"paging": {"last": 2}},
+                },
+            )
+
+        respx.get(url__regex=rf"{SITE_URL}/recommerce/.*").mock(side_effect=respond)
+        api = BlocketAPI(typed_docs=True, json_backend="json")
+
+        docs: list = api.search_all(api.search, "lampa")
+        assert sorted(doc.id for doc in docs) == ["1", "2", "3"]
+        assert SearchDoc(id="1", heading="Lampa", price=100) in docs
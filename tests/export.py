@@ -0,0 +1,89 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from blocket_api import (
+    CarModel,
+    McModel,
+    SearchDoc,
+    iter_batches,
+    to_arrow,
+    to_numpy,
+    write_parquet,
+)
+
+
+@pytest.fixture(scope="module")
+def docs(corpus_dir: Path) -> list[dict[str, Any]]:
+    return json.loads((corpus_dir / "search_car.json").read_bytes())["docs"]
+
+
+class Test_Arrow:
+    def test_columns(self, docs: list[dict[str, Any]]) -> None:
+        pytest.importorskip("pyarrow")
+        table = to_arrow(docs)
+        assert table.num_rows == len(docs)
+
+        row = table.slice(0, 1).to_pylist()[0]
+        doc = docs[0]
+        assert row["id"] == int(doc["id"])
+        assert row["price"] == doc["price"]["amount"]
+        assert (row["year"], row["mileage"]) == (doc["year"], doc["mileage"])
+        assert row["location"] == doc["location"]
+        assert row["make"] == CarModel.VOLVO.value
+        assert row["published"].timestamp() * 1000 == doc["timestamp"]
+
+    def test_make_codes(self) -> None:
+        pytest.importorskip("pyarrow")
+        docs = [
+            {"id": "1", "make": "Citroën"},
+            {"id": "2", "make": "Mercedes-Benz"},
+            {"id": "3", "make": "Okänd"},
+            {"id": "4"},
+        ]
+        assert to_arrow(docs).column("make").to_pylist() == [
+            CarModel.CITROEN.value,
+            CarModel.MERCEDES_BENZ.value,
+            None,
+            None,
+        ]
+        assert to_arrow([{"id": "1", "make": "Harley-Davidson"}], models=McModel)[
+            "make"
+        ].to_pylist() == [str(McModel.HARLEY_DAVIDSON.value)]
+
+    def test_batches(self, docs: list[dict[str, Any]]) -> None:
+        pytest.importorskip("pyarrow")
+        batches = list(iter_batches(iter(docs), batch_size=16))
+        assert [batch.num_rows for batch in batches] == [16, 16, 16, 2]
+        with pytest.raises(ValueError):
+            list(iter_batches(docs, batch_size=0))
+
+    def test_typed_docs(self, docs: list[dict[str, Any]]) -> None:
+        pytest.importorskip("pyarrow")
+        rows = to_arrow([SearchDoc.from_dict(doc) for doc in docs]).to_pylist()
+        assert rows[0]["price"] == docs[0]["price"]["amount"]
+        assert rows[0]["year"] is None
+
+    def test_write_parquet(self, tmp_path: Path, docs: list[dict[str, Any]]) -> None:
+        parquet = pytest.importorskip("pyarrow.parquet")
+        path = tmp_path / "docs.parquet"
+        assert write_parquet(iter(docs), path, batch_size=16) == len(docs)
+        table = parquet.read_table(path)
+        assert table.schema == to_arrow(docs).schema
+        assert table.to_pylist() == to_arrow(docs).to_pylist()
+
+
+class Test_Numpy:
+    def test_columns(self, docs: list[dict[str, Any]]) -> None:
+        numpy = pytest.importorskip("numpy")
+        columns = to_numpy(docs + [{"id": "1"}])
+        assert columns["price"][0] == docs[0]["price"]["amount"]
+        assert numpy.isnan(columns["price"][-1])
+        assert numpy.nanmean(columns["price"]) == pytest.approx(
+            sum(doc["price"]["amount"] for doc in docs) / len(docs)
+        )
+        assert columns["published"][0] == numpy.datetime64(docs[0]["timestamp"], "ms")
+        assert numpy.isnat(columns["published"][-1])
+        assert columns["make"][-1] is None
@@ -0,0 +1,74 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import blocket_api
+from blocket_api import blocket, constants, filters
+
+_ROOT = Path(__file__).parent.parent
+
+
+def _loaded(code: str) -> set[str]:
+    """Modules loaded after running `code` in a fresh interpreter."""
+    process = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys\nprint(*sys.modules)"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=_ROOT,
+    )
+    return set(process.stdout.split())
+
+
+class Test_LazyImport:
+    def test_import_skips_soup_and_filters(self) -> None:
+        loaded = _loaded("import blocket_api")
+        assert "blocket_api.blocket" in loaded
+        assert not {"bs4", "lxml", "blocket_api.filters", "blocket_api.export"} & (
+            loaded
+        )
+
+    def test_single_pass_parse_skips_soup(self, corpus_dir: Path) -> None:
+        page = corpus_dir / "car_1.html"
+        loaded = _loaded(
+            "import httpx\n"
+            "from blocket_api import CarAd\n"
+            f"content = open({str(page)!r}, 'rb').read()\n"
+            "CarAd(1).parse(httpx.Response(200, content=content), "
+            "backend='html.parser')"
+        )
+        assert "blocket_api.extractor" in loaded
+        assert "bs4" not in loaded
+
+    def test_filters_load_on_access(self) -> None:
+        loaded = _loaded("import blocket_api\nblocket_api.CarModel.VOLVO")
+        assert "blocket_api.filters" in loaded
+        assert "blocket_api.export" not in loaded
+
+    def test_same_enums_everywhere(self) -> None:
+        from blocket_api.constants import CarModel
+
+        assert blocket_api.CarModel is CarModel is filters.CarModel
+        assert constants.Location is blocket_api.Location is filters.Location
+        assert blocket_api.write_parquet.__module__ == "blocket_api.export"
+
+    def test_enums_from_the_client_module(self) -> None:
+        from blocket_api.blocket import CarModel, Location
+
+        assert CarModel is filters.CarModel
+        assert Location is filters.Location
+        loaded = _loaded("import blocket_api.blocket")
+        assert "blocket_api.filters" not in loaded
+
+    def test_unknown_names(self) -> None:
+        with pytest.raises(AttributeError):
+            blocket_api.NotAName  # noqa: B018
+        with pytest.raises(AttributeError):
+            constants.NotAName  # noqa: B018
+        with pytest.raises(AttributeError):
+            blocket.NotAName  # noqa: B018
+
+    def test_dir_lists_lazy_names(self) -> None:
+        assert {"CarModel", "SubCategory", "to_arrow"} <= set(dir(blocket_api))
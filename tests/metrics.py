@@ -0,0 +1,214 @@
+import asyncio
+from pathlib import Path
+
+import httpx
+import pytest
+import respx
+
+from blocket_api import (
+    AsyncBlocketAPI,
+    BlocketAPI,
+    CarAd,
+    Endpoint,
+    Instrumentation,
+    Metrics,
+    ParseEvent,
+    RateLimiter,
+    RecommerceAd,
+    RequestEvent,
+)
+from blocket_api.constants import SITE_URL
+from blocket_api.metrics import _Timer
+
+_CAR_SEARCH_URL = f"{SITE_URL}/mobility/search/api/search/SEARCH_ID_CAR_USED"
+
+
+class _Events(Instrumentation):
+    def __init__(self) -> None:
+        self.requests: list[RequestEvent] = []
+        self.parses: list[ParseEvent] = []
+
+    def on_request(self, event: RequestEvent) -> None:
+        self.requests.append(event)
+
+    def on_parse(self, event: ParseEvent) -> None:
+        self.parses.append(event)
+
+
+class Test_Instrumentation:
+    @respx.mock
+    def test_search_events(self) -> None:
+        respx.get(url__startswith=_CAR_SEARCH_URL).mock(
+            side_effect=[
+                httpx.Response(429),
+                httpx.Response(200, json={"docs": [{"id": "1"}]}),
+            ]
+        )
+        events = _Events()
+        api = BlocketAPI(
+            instrumentation=events, rate_limiter=RateLimiter(backoff_base=0.0)
+        )
+        api.search_car()
+
+        throttled, ok = events.requests
+        assert (throttled.endpoint, throttled.status, throttled.attempt) == (
+            Endpoint.SEARCH_CAR,
+            429,
+            0,
+        )
+        assert isinstance(throttled.error, httpx.HTTPStatusError)
+        assert (ok.status, ok.attempt, ok.error) == (200, 1, None)
+        assert ok.bytes == len(b'{"docs":[{"id":"1"}]}')
+        assert ok.total >= 0
+
+        (parse,) = events.parses
+        assert (parse.endpoint, parse.parser, parse.bytes) == (
+            Endpoint.SEARCH_CAR,
+            "json",
+            ok.bytes,
+        )
+
+    @respx.mock
+    def test_ad_parse_events(self, corpus_dir: Path) -> None:
+        recommerce = (corpus_dir / "recommerce_1.html").read_bytes()
+        car = (corpus_dir / "car_2.html").read_bytes()
+        respx.get(RecommerceAd(1).url).mock(
+            return_value=httpx.Response(200, content=recommerce)
+        )
+        respx.get(CarAd(1).url).mock(return_value=httpx.Response(200, content=car))
+        events = _Events()
+        api = BlocketAPI(instrumentation=events)
+
+        api.get_ad(RecommerceAd(1))
+        api.get_ad(CarAd(1), stream=True)
+
+        assert [(e.endpoint, e.parser) for e in events.parses] == [
+            (Endpoint.AD, "RecommerceAd"),
+            (Endpoint.AD, "CarAd"),
+        ]
+        assert events.parses[0].bytes == len(recommerce)
+        assert events.parses[1].bytes == len(car)
+        assert [e.status for e in events.requests] == [200, 200]
+
+    @respx.mock
+    def test_stream_search_events(self, corpus_dir: Path) -> None:
+        content = (corpus_dir / "search_car.json").read_bytes()
+        respx.get(url__startswith=_CAR_SEARCH_URL).mock(
+            side_effect=[httpx.Response(429), httpx.Response(200, content=content)]
+        )
+        events = _Events()
+        api = BlocketAPI(
+            instrumentation=events, rate_limiter=RateLimiter(backoff_base=0.0)
+        )
+
+        with api.stream_search(api.search_car) as docs:
+            assert list(docs)
+
+        throttled, ok = events.requests
+        assert (throttled.status, throttled.attempt) == (429, 0)
+        assert (ok.status, ok.attempt, ok.error) == (200, 1, None)
+        assert ok.bytes == len(content)
+        (parse,) = events.parses
+        assert (parse.endpoint, parse.parser, parse.bytes) == (
+            Endpoint.SEARCH_CAR,
+            "json",
+            len(content),
+        )
+
+    @respx.mock
+    def test_stream_search_error_events(self) -> None:
+        respx.get(url__startswith=_CAR_SEARCH_URL).mock(
+            return_value=httpx.Response(200, content=b'{"docs": [{"id": "1"}')
+        )
+        events = _Events()
+
+        async def run() -> None:
+            async with (
+                AsyncBlocketAPI(instrumentation=events) as api,
+                api.stream_search(api.search_car) as docs,
+            ):
+                async for _ in docs:
+                    pass
+
+        with pytest.raises(ValueError):
+            asyncio.run(run())
+        (event,) = events.requests
+        assert event.status == 200
+        assert isinstance(event.error, ValueError)
+        assert events.parses == []
+
+    @respx.mock
+    def test_failed_request(self) -> None:
+        respx.get(CarAd(1).url).mock(side_effect=httpx.ConnectError("refused"))
+        events = _Events()
+        with pytest.raises(httpx.ConnectError):
+            BlocketAPI(instrumentation=events).get_ad(CarAd(1))
+        (event,) = events.requests
+        assert (event.status, event.bytes) == (None, 0)
+        assert isinstance(event.error, httpx.ConnectError)
+
+    @respx.mock
+    def test_async(self) -> None:
+        respx.get(url__startswith=_CAR_SEARCH_URL).mock(
+            return_value=httpx.Response(200, json={"docs": []})
+        )
+        events = _Events()
+
+        async def run() -> None:
+            async with AsyncBlocketAPI(instrumentation=events) as api:
+                await api.search_car()
+
+        asyncio.run(run())
+        assert [e.status for e in events.requests] == [200]
+        assert [e.parser for e in events.parses] == ["json"]
+
+    def test_timer_trace(self) -> None:
+        timer = _Timer(Endpoint.AD, CarAd(1).url, 0)
+        for name in (
+            "connection.connect_tcp.started",
+            "connection.connect_tcp.complete",
+            "connection.start_tls.started",
+            "connection.start_tls.complete",
+            "http11.send_request_headers.started",
+            "http11.receive_response_headers.complete",
+        ):
+            timer.trace(name, {})
+        event = timer.event()
+        assert event.connect is not None and event.ttfb is not None
+        assert event.connect <= event.ttfb <= event.total
+
+
+class Test_Metrics:
+    @respx.mock
+    def test_registry(self) -> None:
+        respx.get(url__startswith=_CAR_SEARCH_URL).mock(
+            side_effect=[
+                httpx.Response(503),
+                httpx.Response(200, json={"docs": []}),
+            ]
+        )
+        metrics = Metrics()
+        api = BlocketAPI(
+            instrumentation=metrics, rate_limiter=RateLimiter(backoff_base=0.0)
+        )
+        api.search_car()
+
+        snapshot = metrics.snapshot()
+        car = snapshot["requests"]["SEARCH_ID_CAR_USED"]
+        assert car["statuses"] == {"503": 1, "200": 1}
+        assert car["retries"] == 1
+        assert car["latency"]["total"]["count"] == 2
+        assert car["latency"]["total"]["buckets"][float("inf")] == 2
+        assert snapshot["parse"]["json"]["count"] == 1
+
+        text = metrics.prometheus()
+        assert (
+            'blocket_requests_total{endpoint="SEARCH_ID_CAR_USED",status="503"} 1'
+            in text
+        )
+        assert 'blocket_retries_total{endpoint="SEARCH_ID_CAR_USED"} 1' in text
+        assert (
+            'blocket_request_seconds_count{endpoint="SEARCH_ID_CAR_USED",'
+            'phase="total"} 2' in text
+        )
+        assert 'blocket_parse_seconds_bucket{parser="json",le="+Inf"} 1' in text
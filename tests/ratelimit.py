@@ -0,0 +1,66 @@
+import httpx
+import pytest
+import respx
+
+from blocket_api import BlocketAPI, RateLimit, RateLimiter, RecommerceAd
+from blocket_api.constants import SITE_URL
+from blocket_api.ratelimit import _TokenBucket
+from tests.conftest import FakeClock
+
+SEARCH_URL = f"{SITE_URL}/recommerce/forsale/search/api/search/SEARCH_ID_BAP_COMMON"
+
+
+class Test_TokenBucket:
+    def test_burst_then_rate(self, clock: FakeClock) -> None:
+        bucket = _TokenBucket(RateLimit(rate=2.0, burst=2), clock)
+
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.5)
+        assert bucket.reserve() == pytest.approx(1.0)
+
+        clock.now = 10
+        assert bucket.reserve() == 0
+
+    def test_pause(self, clock: FakeClock) -> None:
+        bucket = _TokenBucket(RateLimit(rate=1.0, burst=5), clock)
+        bucket.pause(3)
+        assert bucket.reserve() == pytest.approx(3)
+        assert bucket.reserve() == pytest.approx(4)
+
+
+class Test_RateLimitedRequests:
+    @respx.mock
+    def test_retries_throttled_request(self) -> None:
+        route = respx.get(url__startswith=SEARCH_URL).mock(
+            side_effect=[
+                httpx.Response(429, headers={"Retry-After": "0"}),
+                httpx.Response(503),
+                httpx.Response(200, json={"docs": []}),
+            ]
+        )
+        api = BlocketAPI(rate_limiter=RateLimiter(backoff_base=0.001))
+
+        assert api.search("lampa") == {"docs": []}
+        assert route.call_count == 3
+
+    @respx.mock
+    def test_gives_up_after_max_retries(self) -> None:
+        route = respx.get(url__startswith=SEARCH_URL).mock(
+            return_value=httpx.Response(429)
+        )
+        api = BlocketAPI(rate_limiter=RateLimiter(max_retries=2, backoff_base=0.001))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            api.search("lampa")
+        assert route.call_count == 3
+
+    @respx.mock
+    def test_client_errors_are_not_retried(self) -> None:
+        ad = RecommerceAd(1)
+        route = respx.get(ad.url).mock(return_value=httpx.Response(404))
+        api = BlocketAPI(rate_limiter=RateLimiter(backoff_base=0.001))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            api.get_ad(ad)
+        assert route.call_count == 1
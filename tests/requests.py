@@ -1,7 +1,13 @@
+from collections.abc import Iterator
+from pathlib import Path
+
 import httpx
+import pytest
 import respx
+from bs4 import BeautifulSoup, Tag
 
 from blocket_api import (
+    AdResult,
     BlocketAPI,
     BoatType,
     CarAd,
@@ -22,6 +28,12 @@ from blocket_api.constants import SITE_URL
 api = BlocketAPI()
 
 
+def _chunked(content: bytes, sent: list[int], size: int = 1024) -> Iterator[bytes]:
+    for start in range(0, len(content), size):
+        sent.append(size)
+        yield content[start : start + size]
+
+
 class Test_Search:
     @respx.mock
     def test_search(self) -> None:
@@ -340,3 +352,242 @@ class Test_GetAd:
             "seller_type": "private",
             "ad_id": "123456",
         }
+
+
+class _SellerAd(CarAd):
+    def extend(self, data: dict, soup: BeautifulSoup, grid: Tag) -> None:
+        data["extended"] = True
+
+
+class Test_GetAdStream:
+    @respx.mock
+    def test_recommerce_stops_after_hydration_script(self, corpus_dir: Path) -> None:
+        content = (corpus_dir / "recommerce_1.html").read_bytes()
+        sent: list[int] = []
+        ad = RecommerceAd(1)
+        respx.get(ad.url).mock(
+            side_effect=lambda request: httpx.Response(
+                200, content=_chunked(content, sent)
+            )
+        )
+
+        result = api.get_ad(ad, stream=True)
+        assert result == ad.parse(httpx.Response(200, content=content))
+        assert sum(sent) < len(content)
+
+    @respx.mock
+    def test_mobility_stops_once_fields_are_complete(self, corpus_dir: Path) -> None:
+        content = (corpus_dir / "car_2.html").read_bytes()
+        sent: list[int] = []
+        ad = CarAd(1)
+        respx.get(ad.url).mock(
+            side_effect=lambda request: httpx.Response(
+                200, content=_chunked(content, sent)
+            )
+        )
+
+        result = api.get_ad(ad, fields=["title", "price"], stream=True)
+        assert result == ad.parse(
+            httpx.Response(200, content=content), fields=["title", "price"]
+        )
+        assert sum(sent) < len(content)
+
+        sent.clear()
+        result = api.get_ad(ad, stream=True)
+        assert result == ad.parse(httpx.Response(200, content=content))
+        assert sum(sent) >= len(content)
+
+    @respx.mock
+    def test_subclass_extend_is_run(self, corpus_dir: Path) -> None:
+        content = (corpus_dir / "car_2.html").read_bytes()
+        ad = _SellerAd(1)
+        respx.get(ad.url).mock(return_value=httpx.Response(200, content=content))
+
+        result = api.get_ad(ad, stream=True)
+        assert result == ad.parse(httpx.Response(200, content=content))
+        assert result["extended"] is True
+
+    @respx.mock
+    def test_stream_raises_for_status(self) -> None:
+        respx.get(f"{SITE_URL}/mobility/item/1").mock(return_value=httpx.Response(404))
+        with pytest.raises(httpx.HTTPStatusError):
+            api.get_ad(CarAd(1), stream=True)
+
+
+class Test_StreamSearch:
+    @respx.mock
+    def test_yields_the_docs_of_search(self, corpus_dir: Path) -> None:
+        content = (corpus_dir / "search_car.json").read_bytes()
+        sent: list[int] = []
+        route = respx.get(url__startswith=f"{SITE_URL}/mobility/search/api").mock(
+            side_effect=lambda request: httpx.Response(
+                200, content=_chunked(content, sent, size=100)
+            )
+        )
+
+        page = api.search_car(models=[CarModel.VOLVO], page=2)
+        sent.clear()
+        with api.stream_search(api.search_car, models=[CarModel.VOLVO], page=2) as docs:
+            assert list(docs) == page["docs"]
+            assert docs.metadata == page["metadata"]
+
+        assert route.calls[0].request.url == route.calls[1].request.url
+        assert sum(sent) >= len(content)
+
+    @respx.mock
+    def test_typed_docs(self, corpus_dir: Path) -> None:
+        content = (corpus_dir / "search_recommerce.json").read_bytes()
+        respx.get(url__startswith=f"{SITE_URL}/recommerce/forsale/search/api").mock(
+            return_value=httpx.Response(200, content=content)
+        )
+
+        typed = BlocketAPI(typed_docs=True)
+        with typed.stream_search(typed.search, "lampa") as docs:
+            assert list(docs) == typed.search("lampa")["docs"]
+
+    @respx.mock
+    def test_raises(self) -> None:
+        respx.get(url__startswith=f"{SITE_URL}/recommerce/forsale/search/api").mock(
+            side_effect=[
+                httpx.Response(500),
+                httpx.Response(200, content=b'{"docs": [{"id": 1}], "meta'),
+            ]
+        )
+
+        with pytest.raises(httpx.HTTPStatusError):
+            list(api.stream_search(api.search, "lampa"))
+        with pytest.raises(ValueError):
+            list(api.stream_search(api.search, "lampa"))
+        with pytest.raises(ValueError):
+            api.stream_search(api.get_ad, RecommerceAd(1))
+
+
+class Test_Client:
+    @respx.mock
+    def test_client_reused_between_calls(self) -> None:
+        route = respx.get(
+            f"{SITE_URL}/recommerce/forsale/search/api/search/SEARCH_ID_BAP_COMMON"
+        ).mock(return_value=httpx.Response(200, json={"status": "ok"}))
+
+        with BlocketAPI(timeout=5.0) as client:
+            pooled = client._client
+            client.search("audi q5")
+            client.search("audi q5", page=2)
+            assert client._client is pooled
+            assert route.call_count == 2
+
+        assert pooled.is_closed
+
+
+class Test_GetAds:
+    @respx.mock
+    def test_get_ads_ordered_with_errors(self) -> None:
+        for ad_id in (1, 3):
+            respx.get(f"{SITE_URL}/recommerce/forsale/item/{ad_id}").mock(
+                return_value=httpx.Response(
+                    200,
+                    content=(
+                        b"<script>window.__staticRouterHydrationData = "
+                        b'JSON.parse("{"id": %d}");</script>' % ad_id
+                    ),
+                )
+            )
+        respx.get(f"{SITE_URL}/recommerce/forsale/item/2").mock(
+            return_value=httpx.Response(404)
+        )
+
+        ads = [RecommerceAd(1), RecommerceAd(2), RecommerceAd(3)]
+        results = list(api.get_ads(ads, concurrency=2, ordered=True))
+
+        assert [r.ad for r in results] == ads
+        assert results[0] == AdResult(RecommerceAd(1), data={"id": 1})
+        assert not results[1].ok
+        assert isinstance(results[1].error, httpx.HTTPStatusError)
+        assert results[2].data == {"id": 3}
+
+    @respx.mock
+    def test_get_ads_unordered(self) -> None:
+        respx.get(url__regex=rf"{SITE_URL}/mobility/item/\d+").mock(
+            return_value=httpx.Response(200, content=b"<html></html>")
+        )
+        results = list(api.get_ads((CarAd(i) for i in range(10)), concurrency=3))
+        assert sorted(r.ad.id for r in results) == list(range(10))
+        assert all(r.ok and r.data == {} for r in results)
+
+    @respx.mock
+    def test_get_ads_fields(self) -> None:
+        respx.get(url__regex=rf"{SITE_URL}/recommerce/forsale/item/\d+").mock(
+            return_value=httpx.Response(
+                200,
+                content=(
+                    b"<script>window.__staticRouterHydrationData = "
+                    b'JSON.parse("{"id": 1, "title": "Lampa"}");</script>'
+                ),
+            )
+        )
+        ads = [RecommerceAd(1), RecommerceAd(2)]
+        results = list(api.get_ads(ads, ordered=True, fields=["title"]))
+        assert [r.data for r in results] == [{"title": "Lampa"}] * 2
+
+    def test_get_ads_invalid_concurrency(self) -> None:
+        with pytest.raises(ValueError):
+            list(api.get_ads([CarAd(1)], concurrency=0))
+
+
+class Test_IterDocs:
+    @respx.mock
+    def test_iter_docs_stops_at_last_page(self) -> None:
+        url = f"{SITE_URL}/mobility/search/api/search/SEARCH_ID_CAR_USED"
+        route = respx.get(url__startswith=url).mock(
+            side_effect=lambda request: httpx.Response(
+                200,
+                json={
+                    "docs": [{"id": int(request.url.params["page"]) * 10}],
+                    "metadata": {"paging": {"current": 1, "last": 3}},
+                },
+            )
+        )
+
+        docs = list(api.iter_docs(api.search_car, models=[CarModel.AUDI], prefetch=2))
+
+        assert docs == [{"id": 10}, {"id": 20}, {"id": 30}]
+        assert route.call_count == 3
+        assert all(call.request.url.params["make"] == "0.744" for call in route.calls)
+
+    @respx.mock
+    def test_iter_docs_without_metadata_stops_at_empty_page(self) -> None:
+        url = f"{SITE_URL}/recommerce/forsale/search/api/search/SEARCH_ID_BAP_COMMON"
+        respx.get(url__startswith=url).mock(
+            side_effect=lambda request: httpx.Response(
+                200,
+                json={
+                    "docs": [{"id": 1}] if int(request.url.params["page"]) <= 2 else []
+                },
+            )
+        )
+        docs = list(api.iter_docs(api.search, "lampa", prefetch=0))
+        assert docs == [{"id": 1}, {"id": 1}]
+
+
+class Test_SearchAll:
+    @respx.mock
+    def test_search_all_fans_out_and_dedups(self) -> None:
+        url = f"{SITE_URL}/mobility/search/api/search/SEARCH_ID_BOAT_USED"
+        route = respx.get(url__startswith=url).mock(
+            side_effect=lambda request: httpx.Response(
+                200,
+                json={
+                    # every page repeats the last doc of the previous page
+                    "docs": [
+                        {"id": str(int(request.url.params["page"]) - 1)},
+                        {"id": request.url.params["page"]},
+                    ],
+                    "metadata": {"paging": {"current": 1, "last": 5}},
+                },
+            )
+        )
+
+        docs = api.search_all(api.search_boat, "Mercury", concurrency=3)
+
+        assert [doc["id"] for doc in docs] == ["0", "1", "2", "3", "4", "5"]
+        assert route.call_count == 5
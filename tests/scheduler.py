@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+import respx
+
+from blocket_api import (
+    AsyncBlocketAPI,
+    AsyncSearchScheduler,
+    BlocketAPI,
+    CarModel,
+    SavedSearch,
+    SearchResult,
+    SearchScheduler,
+)
+from blocket_api.bulk import _Outcome
+from blocket_api.constants import SITE_URL
+from blocket_api.scheduler import _Schedule
+from tests.conftest import FakeClock
+
+_SEARCH_URL = f"{SITE_URL}/recommerce/forsale/search/api/search/"
+
+
+class Test_Schedule:
+    def test_searches_are_spread_over_the_interval(self, clock: FakeClock) -> None:
+        schedule = _Schedule(BlocketAPI(), 100, clock)
+        for name in "abcdefgh":
+            schedule.add(SavedSearch(name, args=(name,), interval=60))
+
+        dues = sorted(entry.due for entry in schedule.entries.values())
+        assert dues == [i * 7.5 for i in range(8)]
+
+        clock.now = 60
+        assert len(schedule.take_due()) == 8
+        assert schedule.timeout() is None
+
+    def test_removed_phases_are_reused(self, clock: FakeClock) -> None:
+        schedule = _Schedule(BlocketAPI(), 100, clock)
+        for name in "abcd":
+            schedule.add(SavedSearch(name, args=(name,), interval=60))
+        schedule.remove("b")
+        schedule.add(SavedSearch("e", args=("e",), interval=60))
+        schedule.add(SavedSearch("f", args=("f",), interval=10))
+
+        assert schedule.entries["e"].due == 30
+        assert schedule.entries["f"].due == 0
+
+    def test_priority_and_budget(self, clock: FakeClock) -> None:
+        schedule = _Schedule(BlocketAPI(), 1, clock)
+        schedule.add(SavedSearch("low", "search_car", interval=10, priority=1))
+        schedule.add(
+            SavedSearch(
+                "high",
+                "search_car",
+                filters={"models": [CarModel.VOLVO]},
+                interval=10,
+                priority=0,
+            )
+        )
+
+        clock.now = 10
+        (first,) = schedule.take_due()
+        assert first.search.name == "high"
+        assert schedule.take_due() == []
+        # nothing is waiting to become due, but "low" is held back
+        assert schedule.timeout() == 1.0
+
+        result = schedule.finish(first, _Outcome(first.search, value={"docs": []}))
+        assert result == SearchResult(first.search, data={"docs": []})
+        (second,) = schedule.take_due()
+        assert second.search.name == "low"
+
+    def test_late_runs_keep_their_phase(self, clock: FakeClock) -> None:
+        schedule = _Schedule(BlocketAPI(), 4, clock)
+        schedule.add(SavedSearch("a", args=("a",), interval=10))
+        phase = schedule.entries["a"].due
+
+        clock.now = phase + 35
+        (entry,) = schedule.take_due()
+        schedule.finish(entry, _Outcome(entry.search, value={}))
+        assert entry.due == phase + 40
+        assert schedule.timeout() == pytest.approx(5)
+
+    def test_removed_searches_stop(self, clock: FakeClock) -> None:
+        schedule = _Schedule(BlocketAPI(), 4, clock)
+        schedule.add(SavedSearch("a", args=("a",), interval=10))
+        schedule.remove("a")
+        clock.now = 10
+        assert schedule.take_due() == []
+
+    def test_unknown_search(self, clock: FakeClock) -> None:
+        with pytest.raises(ValueError):
+            _Schedule(BlocketAPI(), 4, clock).add(SavedSearch("a", "get_ad"))
+        with pytest.raises(ValueError):
+            SavedSearch("a", interval=0)
+
+
+class Test_SearchScheduler:
+    @respx.mock
+    def test_run(self) -> None:
+        in_flight, peak = [0], [0]
+        lock = threading.Lock()
+
+        def _search(request: httpx.Request) -> httpx.Response:
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+            return httpx.Response(200, json={"docs": [{"id": request.url.params["q"]}]})
+
+        respx.get(url__startswith=_SEARCH_URL).mock(side_effect=_search)
+        results: list[SearchResult] = []
+
+        def _on_result(result: SearchResult) -> None:
+            results.append(result)
+            if len(results) == 12:
+                scheduler.stop()
+
+        scheduler = SearchScheduler(
+            BlocketAPI(),
+            _on_result,
+            searches=[
+                SavedSearch(str(i), args=(f"q{i}",), interval=0.02) for i in range(6)
+            ],
+            max_in_flight=2,
+        )
+        thread = threading.Thread(target=scheduler.run)
+        thread.start()
+        thread.join(timeout=10)
+
+        assert not thread.is_alive()
+        assert all(result.ok for result in results)
+        assert {result.data["docs"][0]["id"] for result in results if result.data} == {
+            f"q{i}" for i in range(6)
+        }
+        assert peak[0] <= 2
+
+
+class Test_AsyncSearchScheduler:
+    @respx.mock
+    def test_run(self) -> None:
+        respx.get(url__startswith=_SEARCH_URL).mock(
+            side_effect=[httpx.Response(200, json={"docs": []}), httpx.Response(500)]
+        )
+        results: list[SearchResult] = []
+
+        async def run() -> None:
+            async with AsyncBlocketAPI() as api:
+
+                async def _on_result(result: SearchResult) -> None:
+                    results.append(result)
+                    if len(results) == 2:
+                        scheduler.stop()
+
+                scheduler = AsyncSearchScheduler(
+                    api,
+                    _on_result,
+                    searches=[SavedSearch("lampa", args=("lampa",), interval=0.01)],
+                )
+                await asyncio.wait_for(scheduler.run(), 5)
+
+        asyncio.run(run())
+        assert [result.ok for result in results] == [True, False]
+        assert isinstance(results[1].error, httpx.HTTPStatusError)
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+
+from blocket_api import AdResult, CarAd, SearchDoc, SeenIds
+
+
+class Test_SeenIds:
+    def test_add_and_contains(self) -> None:
+        seen = SeenIds()
+        assert seen.add(30000000)
+        assert not seen.add("30000000")
+        assert "30000000" in seen
+        assert 30000001 not in seen
+        assert 30000000 + (1 << 16) not in seen
+        assert len(seen) == 1
+        with pytest.raises(ValueError):
+            seen.add(-1)
+
+    def test_dense_block_becomes_bitmap(self) -> None:
+        seen = SeenIds()
+        ids = range(1 << 16, (1 << 16) + 10000, 2)
+        for ad_id in ids:
+            seen.add(ad_id)
+        assert len(seen) == len(ids)
+        assert all(ad_id in seen for ad_id in ids)
+        assert not any(ad_id + 1 in seen for ad_id in ids)
+        assert not seen.add(ids[-1])
+        assert seen.add(ids[-1] + 1)
+
+    def test_persists(self, tmp_path: Path) -> None:
+        path = tmp_path / "seen.bin"
+        ids = [1, 2, 65537, *range(200000, 210000)]
+        with SeenIds(path) as seen:
+            for ad_id in ids:
+                seen.add(ad_id)
+
+        loaded = SeenIds(path)
+        assert len(loaded) == len(ids)
+        assert all(ad_id in loaded for ad_id in ids)
+        assert 3 not in loaded
+
+    def test_save_merges_other_writers(self, tmp_path: Path) -> None:
+        path = tmp_path / "seen.bin"
+        first, second = SeenIds(path), SeenIds(path)
+        first.add(1)
+        first.add(5)
+        second.add(5)
+        second.add(70000)
+        first.save()
+        second.save()
+
+        assert [ad_id in second for ad_id in (1, 5, 70000)] == [True] * 3
+        assert len(second) == 3
+        assert len(SeenIds(path)) == 3
+
+    def test_unseen(self) -> None:
+        seen = SeenIds()
+        docs = [{"id": "1"}, {"id": "2"}, {"id": "1"}]
+        assert list(seen.unseen(docs)) == [{"id": "1"}, {"id": "2"}]
+        assert list(seen.unseen([SearchDoc(id="2"), SearchDoc(id="3")])) == [
+            SearchDoc(id="3")
+        ]
+        results = [AdResult(CarAd(3)), AdResult(CarAd(4))]
+        assert list(seen.unseen(results)) == results[1:]
+
+    def test_not_a_seen_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "seen.bin"
+        path.write_bytes(b"nope")
+        with pytest.raises(ValueError):
+            SeenIds(path)
@@ -0,0 +1,136 @@
+import asyncio
+from typing import Any
+
+import httpx
+import pytest
+import respx
+
+from blocket_api import (
+    AsyncBlocketAPI,
+    AsyncSearchWatcher,
+    BlocketAPI,
+    CarModel,
+    SearchWatcher,
+    SeenIds,
+)
+from blocket_api.constants import SITE_URL
+
+_URL = f"{SITE_URL}/mobility/search/api/search/SEARCH_ID_CAR_USED"
+_PAGE_SIZE = 2
+
+
+def _ad(ad_id: int) -> dict[str, Any]:
+    return {"id": str(ad_id), "timestamp": 1_790_000_000_000 + ad_id}
+
+
+def _mock_newest_first(ads: list[dict[str, Any]]) -> respx.Route:
+    def _page(request: httpx.Request) -> httpx.Response:
+        assert request.url.params["sort"] == "PUBLISHED_DESC"
+        page = int(request.url.params["page"])
+        newest_first = sorted(ads, key=lambda ad: -ad["timestamp"])
+        last = -(-len(ads) // _PAGE_SIZE)
+        return httpx.Response(
+            200,
+            json={
+                "docs": newest_first[(page - 1) * _PAGE_SIZE : page * _PAGE_SIZE],
+                "metadata": {"paging": {"current": page, "last": last}},
+            },
+        )
+
+    return respx.get(url__startswith=_URL).mock(side_effect=_page)
+
+
+class Test_SearchWatcher:
+    @respx.mock
+    def test_poll_returns_only_new_ads(self) -> None:
+        ads = [_ad(ad_id) for ad_id in range(10)]
+        route = _mock_newest_first(ads)
+        api = BlocketAPI()
+        watcher = SearchWatcher()
+
+        assert watcher.poll(api.search_car, models=[CarModel.VOLVO]) == []
+        assert route.call_count == 1
+
+        ads.extend(_ad(ad_id) for ad_id in range(10, 13))
+        route.reset()
+        new = watcher.poll(api.search_car, models=[CarModel.VOLVO])
+        assert [doc["id"] for doc in new] == ["12", "11", "10"]
+        assert route.call_count == 2
+
+        route.reset()
+        assert watcher.poll(api.search_car, models=[CarModel.VOLVO]) == []
+        assert route.call_count == 1
+
+    @respx.mock
+    def test_queries_are_watched_apart(self) -> None:
+        ads = [_ad(1)]
+        _mock_newest_first(ads)
+        api = BlocketAPI()
+        watcher = SearchWatcher()
+
+        watcher.poll(api.search_car, models=[CarModel.VOLVO])
+        ads.append(_ad(2))
+        assert watcher.poll(api.search_car, models=[CarModel.AUDI]) == []
+        assert watcher.poll(api.search_car, models=[CarModel.VOLVO]) == [_ad(2)]
+        assert len(watcher.states) == 2
+
+    @respx.mock
+    def test_empty_first_poll(self) -> None:
+        ads: list[dict[str, Any]] = []
+        _mock_newest_first(ads)
+        api = BlocketAPI()
+        watcher = SearchWatcher()
+
+        assert watcher.poll(api.search_car, models=[CarModel.VOLVO]) == []
+        ads.append(_ad(42))
+        assert watcher.poll(api.search_car, models=[CarModel.VOLVO]) == [_ad(42)]
+        assert watcher.poll(api.search_car, models=[CarModel.VOLVO]) == []
+
+    @respx.mock
+    def test_stops_at_older_ads_when_seen_ids_are_gone(self) -> None:
+        ads = [_ad(ad_id) for ad_id in range(6)]
+        route = _mock_newest_first(ads)
+        api = BlocketAPI()
+        watcher = SearchWatcher(memory=1)
+
+        watcher.poll(api.search_car)
+        del ads[4:]  # the two newest ads were removed
+        ads.append(_ad(7))
+        route.reset()
+        assert watcher.poll(api.search_car) == [_ad(7)]
+        assert route.call_count == 1
+
+    @respx.mock
+    def test_shared_seen_ids(self) -> None:
+        ads = [_ad(1)]
+        _mock_newest_first(ads)
+        api = BlocketAPI()
+        watcher = SearchWatcher(seen=SeenIds())
+
+        watcher.poll(api.search_car, models=[CarModel.VOLVO])
+        watcher.poll(api.search_car, models=[CarModel.AUDI])
+        ads.append(_ad(2))
+        assert watcher.poll(api.search_car, models=[CarModel.VOLVO]) == [_ad(2)]
+        assert watcher.poll(api.search_car, models=[CarModel.AUDI]) == []
+
+    def test_rejects_page_and_sort_order(self) -> None:
+        with pytest.raises(ValueError):
+            SearchWatcher().poll(BlocketAPI().search_car, page=2)
+        with pytest.raises(ValueError):
+            SearchWatcher().poll(BlocketAPI().get_ad)
+
+
+class Test_AsyncSearchWatcher:
+    @respx.mock
+    def test_poll(self) -> None:
+        ads = [_ad(ad_id) for ad_id in range(4)]
+        _mock_newest_first(ads)
+        watcher = AsyncSearchWatcher()
+
+        async def run() -> list:
+            async with AsyncBlocketAPI() as api:
+                await watcher.poll(api.search_car)
+                ads.append(_ad(4))
+                return await watcher.poll(api.search_car)
+
+        assert asyncio.run(run()) == [_ad(4)]